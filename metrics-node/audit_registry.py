@@ -0,0 +1,220 @@
+from collections import OrderedDict, namedtuple
+
+from columnar import factorize, float_column, group_totals, group_values
+from sketches import merge_sketches, sketch_of
+
+# Units of the registered values. Scalars are summarized over runs (median, CI) and charted
+# on an axis per unit; TABLE values are dicts combined over runs by the spec's merge.
+SECONDS = "s"
+UNITLESS = "unitless"
+PERCENT = "%"
+KILOBYTES = "KB"
+TABLE = "table"
+
+# One value of a scenario run taken from report.json:
+#   key      name in the extracted record (and in summaries, history, exports)
+#   path     keys leading to the raw value, e.g. ("audits", "speed-index", "numericValue")
+#   unit     one of the units above
+#   convert  raw value -> value in unit (None: as is); not called for a missing value
+#   reduce   details items -> value, for paths ending in a details table (None: plain value)
+#   merge    list of per-run TABLE values -> one value for the scenario
+#   fmt      bar label format of a scalar
+AuditSpec = namedtuple("AuditSpec", "key path unit convert reduce merge fmt")
+
+AUDITS = OrderedDict()
+
+_FORMATS = {SECONDS: "{:.2f}s", UNITLESS: "{:.4f}", PERCENT: "{:.0f}%", KILOBYTES: "{:.0f} KB"}
+
+
+def register(key, path, unit, convert=None, reduce=None, merge=None, fmt=None):
+    """
+    Add (or replace) an extracted value. It is then read by extract() in the same pass as
+    every other registered audit and shows up in the summaries, charts, history and exports.
+    Registering changes the shape of the cached extraction records: bump
+    report_cache.SCHEMA_VERSION along with it.
+    """
+    if unit == TABLE and merge is None:
+        raise ValueError(f"{key}: a {TABLE} audit needs a merge function")
+    AUDITS[key] = AuditSpec(key, tuple(path), unit, convert, reduce, merge, fmt or _FORMATS.get(unit, "{:.4g}"))
+    return AUDITS[key]
+
+
+def specs(*units):
+    """The registered specs, in registration order; only those of the given units if any."""
+    return [s for s in AUDITS.values() if not units or s.unit in units]
+
+
+def scalar_keys(*units):
+    """Keys of the registered scalar values (of the given units, or all of them)."""
+    return [s.key for s in specs(*units) if s.unit != TABLE]
+
+
+def report_selection(selected=None):
+    """
+    The json_stream selection of every registered path, so the streaming parser collects all
+    of them in a single walk of report.json and skips everything else.
+    """
+    selection = {}
+    for spec in selected or specs():
+        node = selection
+        for part in spec.path[:-1]:
+            child = node.setdefault(part, {})
+            if child is True:
+                break  # an enclosing value is selected whole already
+            node = child
+        else:
+            node[spec.path[-1]] = True
+    return selection
+
+
+def _lookup(data, path):
+    for part in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(part)
+    return data
+
+
+def extract(data, selected=None):
+    """The value of every registered spec (or of selected) in a decoded report; None where missing."""
+    results = {}
+    for spec in selected or specs():
+        raw = _lookup(data, spec.path)
+        if spec.reduce is not None:
+            raw = spec.reduce(raw or [])
+        if raw is not None and spec.convert is not None:
+            raw = spec.convert(raw)
+        results[spec.key] = raw
+    return results
+
+
+def merge_tables(runs):
+    """Combine the TABLE values of a scenario's runs with their specs' merge functions."""
+    return {spec.key: spec.merge([run.get(spec.key) or {} for run in runs]) for spec in specs(TABLE)}
+
+
+def ms_to_s(v):
+    return v / 1000.0
+
+
+def fraction_to_pct(v):
+    return v * 100
+
+
+def bytes_to_kb(v):
+    return v / 1024.0
+
+
+def _numbers(items, key):
+    values = (it.get(key) for it in items)
+    return float_column([v if isinstance(v, (int, float)) else None for v in values])
+
+
+def aggregate_requests(items):
+    """Group Lighthouse network-requests items by mimeType with a vectorized group-by (first-seen order)."""
+    if not items:
+        return {}
+    import numpy as np
+
+    codes, mimes = factorize([it.get("mimeType") or "unknown" for it in items])
+    transfer = np.array([it.get("transferSize") or 0 for it in items])
+    start = _numbers(items, "networkRequestTime")
+    end = _numbers(items, "networkEndTime")
+    duration = np.where(end >= start, end - start, 0.0)  # NaN compares False
+
+    counts, (transfers, durations) = group_totals(codes, len(mimes), transfer, duration)
+    per_group = group_values(codes, counts, duration)
+    as_transfer = int if transfer.dtype.kind in "iub" else float
+    return {
+        mime: {
+            "count": int(counts[i]),
+            "total_transfer_size": as_transfer(transfers[i]),
+            "total_duration": float(durations[i]),
+            "duration_sketch": sketch_of(per_group[i]),
+        }
+        for i, mime in enumerate(mimes)
+    }
+
+
+def merge_network_requests(aggregates):
+    """Sum aggregate_requests() results of several runs, keeping first-seen mime order."""
+    merged = {}
+    sketches = {}
+    for agg in aggregates:
+        for mime, a in agg.items():
+            m = merged.setdefault(mime, {"count": 0, "total_transfer_size": 0, "total_duration": 0.0})
+            m["count"] += a["count"]
+            m["total_transfer_size"] += a["total_transfer_size"]
+            m["total_duration"] += a["total_duration"]
+            sketches.setdefault(mime, []).append(a.get("duration_sketch"))
+    for mime, m in merged.items():
+        m["duration_sketch"] = merge_sketches(sketches[mime])
+    return merged
+
+
+def mean_per_run(tables):
+    """Per-run mean of {row: {column: ms}} tables; a row missing from a run counts as 0 there."""
+    tables = list(tables)
+    total = {}
+    for table in tables:
+        for name, row in table.items():
+            acc = total.setdefault(name, {})
+            for column, v in row.items():
+                acc[column] = acc.get(column, 0.0) + v
+    return {name: {column: v / len(tables) for column, v in row.items()} for name, row in total.items()}
+
+
+def _ms(v):
+    return float(v) if isinstance(v, (int, float)) else 0.0
+
+
+def bootup_by_script(items):
+    """
+    bootup-time items as {script: {total, scripting, scriptParseCompile}} in ms, the script
+    being its URL without query or fragment, so cache-busting parameters still line up runs
+    while same-path scripts from different origins (CDN vs app) stay apart.
+    """
+    scripts = {}
+    for it in items:
+        url = (it.get("url") or "Unattributable").split("#", 1)[0].split("?", 1)[0]
+        row = scripts.setdefault(url, {"total": 0.0, "scripting": 0.0, "scriptParseCompile": 0.0})
+        for column in row:
+            row[column] += _ms(it.get(column))
+    return scripts
+
+
+def mainthread_by_category(items):
+    """mainthread-work-breakdown items as {category label: {duration}} in ms."""
+    groups = {}
+    for it in items:
+        label = it.get("groupLabel") or it.get("group") or "Other"
+        row = groups.setdefault(label, {"duration": 0.0})
+        row["duration"] += _ms(it.get("duration"))
+    return groups
+
+
+def wasted_bytes(items):
+    """Sum of wastedBytes over an opportunity audit's items (unused-javascript, unused-css-rules, ...)."""
+    values = [it.get("wastedBytes") for it in items]
+    values = [v for v in values if isinstance(v, (int, float))]
+    return sum(values) if values else None
+
+
+for _audit in ("first-contentful-paint", "largest-contentful-paint", "total-blocking-time"):
+    register(_audit, ("audits", _audit, "numericValue"), SECONDS, ms_to_s)
+register("cumulative-layout-shift", ("audits", "cumulative-layout-shift", "numericValue"), UNITLESS)
+for _audit in ("speed-index", "interactive"):
+    register(_audit, ("audits", _audit, "numericValue"), SECONDS, ms_to_s)
+register("total-byte-weight", ("audits", "total-byte-weight", "numericValue"), KILOBYTES, bytes_to_kb)
+register("unused-javascript", ("audits", "unused-javascript", "details", "items"), KILOBYTES, bytes_to_kb,
+         reduce=wasted_bytes)
+
+for _category in ("performance", "accessibility", "best-practices", "seo"):
+    register(_category.replace("-", "_") + "_score", ("categories", _category, "score"), PERCENT, fraction_to_pct)
+
+register("network_requests", ("audits", "network-requests", "details", "items"), TABLE,
+         reduce=aggregate_requests, merge=merge_network_requests)
+register("bootup_time", ("audits", "bootup-time", "details", "items"), TABLE,
+         reduce=bootup_by_script, merge=mean_per_run)
+register("mainthread_work", ("audits", "mainthread-work-breakdown", "details", "items"), TABLE,
+         reduce=mainthread_by_category, merge=mean_per_run)
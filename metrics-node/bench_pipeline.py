@@ -0,0 +1,197 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from functools import partial
+
+import collect_metrics
+import collect_metrics_bootstrap
+import endpoints
+from history_store import git_revision
+import timeline
+from report_cache import ExtractionCache
+from scenario_index import ScenarioIndex
+from synth_reports import add_generator_arguments, generate
+
+BENCH_FORMAT = 1
+
+
+class Bench:
+    """Times named stages; each stage runs `repeat` times and keeps every sample."""
+
+    def __init__(self, repeat=1, quiet=True):
+        self.repeat = repeat
+        self.quiet = quiet
+        self.stages = {}
+
+    def run(self, name, fn, *args, **kwargs):
+        """
+        Time fn(*args, **kwargs); returns the result of its last call, or None if it raised.
+        Stages without a result (text and figure output) return None as well, so callers
+        that use the result treat None as empty.
+        """
+        samples, result, error = [], None, None
+        for _ in range(self.repeat):
+            out = io.StringIO()
+            start = time.perf_counter()
+            try:
+                with contextlib.redirect_stdout(out) if self.quiet else contextlib.nullcontext():
+                    result = fn(*args, **kwargs)
+            except Exception as e:  # a stage that breaks at this scale is a result too
+                error = f"{type(e).__name__}: {e}"
+                result = None
+                break
+            finally:
+                samples.append(time.perf_counter() - start)
+        self.stages[name] = {
+            "seconds": [round(s, 6) for s in samples],
+            "min": round(min(samples), 6),
+            "median": round(statistics.median(samples), 6),
+        }
+        if error:
+            self.stages[name]["error"] = error
+        print(f"{name:40} {self.stages[name]['median']:>10.4f} s" + (f"  [{error}]" if error else ""), file=sys.stderr)
+        return result
+
+
+def _limit(mapping, n):
+    return type(mapping)((k, v) for i, (k, v) in enumerate(mapping.items()) if i < n)
+
+
+def bench_metrics(bench, reports, work_dir, jobs, render_limit):
+    index = bench.run("discover", ScenarioIndex.scan, reports)
+    dirs = index.names(has="metrics.json") if index is not None else []
+    load = partial(collect_metrics.load_scenarios, dirs, reports, index=index, jobs=jobs)
+
+    scenarios = bench.run("metrics.load", load) or {}
+    cache_path = os.path.join(work_dir, "bench-cache.sqlite")
+    with ExtractionCache(cache_path) as cache:
+        collect_metrics.load_scenarios(dirs, reports, cache=cache, index=index, jobs=jobs)
+    with ExtractionCache(cache_path) as cache:
+        bench.run("metrics.load_cached", load, cache=cache)
+    if not scenarios:
+        return {"scenarios": 0, "requests": 0}
+
+    stats = bench.run("metrics.webvitals_stats", collect_metrics.webvitals_stats, scenarios) or {}
+    wv = collect_metrics.webvitals_from_scenarios(scenarios, stats)
+    agg = bench.run("metrics.aggregate_content_types", collect_metrics.aggregate_network_requests, scenarios) or {}
+    endpoint_idx = bench.run("metrics.endpoint_index", endpoints.endpoint_index, scenarios) or {}
+    timelines = bench.run("metrics.timeline_index", timeline.timeline_index, scenarios) or {}
+
+    out = partial(os.path.join, work_dir)
+    bench.run("text.webvitals_summary", collect_metrics.print_webvitals_summary, wv, stats)
+    bench.run("text.aggregates_table", collect_metrics.write_aggregates_table, agg, out("aggregates.txt"))
+    bench.run("text.endpoints_table", endpoints.write_endpoints_table, endpoint_idx, out("endpoints.txt"))
+    bench.run("text.timeline_table", timeline.write_timeline_table, timelines, out("timeline.txt"))
+
+    if render_limit:
+        wv_r, stats_r, agg_r = _limit(wv, render_limit), _limit(stats, render_limit), _limit(agg, render_limit)
+        bench.run("render.webvitals_chart", collect_metrics.generate_webvitals_chart, wv_r, out("wv.png"), stats_r)
+        bench.run("render.aggregates_heatmap", collect_metrics.plot_aggregates_heatmap, agg_r, out("heatmap.png"))
+        bench.run("render.aggregates_table_image", collect_metrics.generate_table_image, agg_r, out("table.png"))
+        for d, t in _limit(timelines, 1).items():
+            bench.run("render.waterfall", timeline.generate_waterfall_chart,
+                      scenarios[d][t["representative"]]["network_requests"], out("waterfall.png"), d)
+
+    return {
+        "scenarios": len(scenarios),
+        "runs": sum(len(runs) for runs in scenarios.values()),
+        "requests": sum(len(run["network_requests"]["url"]) for runs in scenarios.values() for run in runs),
+    }
+
+
+def bench_lighthouse(bench, reports, work_dir, jobs, render_limit):
+    index = ScenarioIndex.scan(reports)
+    dirs = index.names(has="report.json")
+    if not dirs:
+        return {"scenarios": 0}
+    for stream in (False, True):
+        label = "stream" if stream else "json"
+        runs_by_dir = bench.run(f"lighthouse.load_{label}", collect_metrics_bootstrap.load_lighthouse_runs,
+                                dirs, reports, None, jobs, stream, index) or {}
+    bench.run("lighthouse.load_csv_scores", collect_metrics_bootstrap.load_lighthouse_runs,
+              dirs, reports, None, jobs, False, index, from_csv=True, network=False)
+    bench.run("lighthouse.load_csv_network", collect_metrics_bootstrap.load_lighthouse_runs,
+              dirs, reports, None, jobs, False, index, from_csv=True, network=True)
+    reduced = bench.run("lighthouse.reduce_runs",
+                        lambda: {d: collect_metrics_bootstrap.reduce_runs(r) for d, r in runs_by_dir.items()}) or {}
+    all_metrics = {d: m for d, (m, _s) in reduced.items()}
+    stats_by_dir = {d: s for d, (_m, s) in reduced.items() if s is not None}
+
+    if render_limit:
+        out = partial(os.path.join, work_dir)
+        bench.run("render.lighthouse_bar_chart", collect_metrics_bootstrap.generate_grouped_bar_chart,
+                  _limit(all_metrics, render_limit), out("metrics_chart.png"), stats_by_dir)
+        bench.run("render.network_requests_table", collect_metrics_bootstrap.generate_network_requests_table,
+                  _limit(all_metrics, render_limit), out("network_requests.png"))
+        bench.run("render.bootup_scripts_table", collect_metrics_bootstrap.generate_bootup_table,
+                  _limit(all_metrics, render_limit), out("bootup_scripts.png"))
+        bench.run("render.cpu_breakdown_chart", collect_metrics_bootstrap.generate_cpu_breakdown_chart,
+                  _limit(all_metrics, render_limit), out("cpu_breakdown_chart.png"))
+    return {"scenarios": len(runs_by_dir), "runs": sum(len(r) for r in runs_by_dir.values())}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Time every pipeline stage (load, aggregate, text output, each figure) and write JSON results"
+    )
+    parser.add_argument("--reports", help="existing reports root to benchmark; default: generate a synthetic one")
+    parser.add_argument("--output", metavar="FILE", help="write the JSON results here (default: stdout)")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per stage; min and median are reported")
+    parser.add_argument("-j", "--jobs", type=int, default=1, metavar="N", help="worker processes for loading")
+    parser.add_argument("--render-limit", type=int, default=64, metavar="N",
+                        help="pass at most N scenarios to the figure functions (0 = skip rendering, default: 64)")
+    parser.add_argument("--keep", action="store_true", help="keep the generated tree and outputs")
+    generator = parser.add_argument_group("synthetic data (without --reports)")
+    add_generator_arguments(generator)
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix="metrics-bench-")
+    try:
+        dataset = {"source": args.reports}
+        reports = args.reports
+        if reports is None:
+            reports = os.path.join(work_dir, "reports")
+            start = time.perf_counter()
+            dataset = generate(reports, args.scenarios, args.requests, args.lighthouse, args.lighthouse_requests,
+                               args.runs, args.filler_kb, args.total_requests, args.seed)
+            dataset["generate_seconds"] = round(time.perf_counter() - start, 3)
+
+        bench = Bench(args.repeat)
+        metrics = bench_metrics(bench, reports, work_dir, args.jobs, args.render_limit)
+        lighthouse = bench_lighthouse(bench, reports, work_dir, args.jobs, args.render_limit)
+        result = {
+            "format": BENCH_FORMAT,
+            "git_revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "settings": {"repeat": args.repeat, "jobs": args.jobs, "render_limit": args.render_limit},
+            "dataset": dict(dataset, metrics=metrics, lighthouse=lighthouse),
+            "stages": bench.stages,
+        }
+    finally:
+        if args.keep:
+            print(f"kept {work_dir}", file=sys.stderr)
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"Saved benchmark results -> {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,58 +1,164 @@
+import time
+
+_STARTED = time.perf_counter()
+
+import argparse
 import os
 import json
 import math
-from collections import defaultdict, OrderedDict
-
-import matplotlib
-from matplotlib.ticker import FuncFormatter
-
-matplotlib.use("Agg")  
-import matplotlib.pyplot as plt
-import numpy as np
-
-directories = [
-    "blazor-desktop-anniversaries",
-    "blazor-desktop-members",
-    "blazor-desktop-myothergroups",
-    "blazor-desktop-settings",
-    "blazor-mobile-anniversaries",
-    "blazor-mobile-members",
-    "blazor-mobile-myothergroups",
-    "blazor-mobile-settings",
-    "react-desktop-anniversaries",
-    "react-desktop-members",
-    "react-desktop-myothergroups",
-    "react-desktop-settings",
-    "react-mobile-anniversaries",
-    "react-mobile-members",
-    "react-mobile-myothergroups",
-    "react-mobile-settings",
-]
-
+from collections import OrderedDict
+
+from columnar import factorize, float_column, group_totals, group_values, int_column, normalize_content_type
+from compressed import open_binary
+from endpoints import endpoint_index, write_endpoints_table
+from history_store import WEBVITALS_SOURCE, add_history_arguments, record_history
+from parallel import add_jobs_argument, ingest
+from profiling import add_profile_arguments, finish_profile, stage, start_profile
+from render_stage import RenderJob, add_render_arguments, open_render_cache, pyplot, render_all
+from report_cache import add_cache_arguments, open_cache, report_cache_stats
+from run_stats import error_bar, has_repeats, medians, run_paths, summarize_runs
+from scenario_index import add_scenario_arguments, discover, scenario_filters
+from sketches import QUANTILES, merge_sketches, sketch_of, sketch_quantiles
+from startup import add_timings_argument, report_timings
+from table_render import add_table_format_argument, render_table, table_output
+from timeline import timeline_index, waterfall_jobs, write_timeline_table
+
+# matplotlib and numpy are imported inside the functions that need them: the summary and
+# aggregate commands should not pay for loading them.
+_IMPORTED = time.perf_counter()
+
+WEB_VITALS = ["FCP", "TTFB", "LCP", "FID"]
+
+
+def request_columns(raw_requests):
+    """
+    Turn metrics.json networkRequests into parallel columns:
+      {url, method, content_type, start, end, duration, size} -> list per column
+    duration falls back to endTime - startTime (NaN when neither is known). Content types
+    are normalized once per distinct raw value instead of once per request. Columns stay
+    plain lists so the record remains JSON (and cache) friendly.
+    """
+    import numpy as np
+
+    start = float_column([req.get("startTime") for req in raw_requests])
+    end = float_column([req.get("endTime") for req in raw_requests])
+    duration = float_column([req.get("duration") for req in raw_requests])
+    duration = np.where(np.isnan(duration), end - start, duration)
+    codes, raw_types = factorize([req.get("contentType") or "" for req in raw_requests])
+    content_types = np.array([normalize_content_type(ct) for ct in raw_types], dtype=object)
+    return {
+        "url": [req.get("url", "") for req in raw_requests],
+        "method": [req.get("method", "") for req in raw_requests],
+        "content_type": content_types[codes].tolist(),
+        "start": start.tolist(),
+        "end": end.tolist(),
+        "duration": duration.tolist(),
+        "size": int_column([req.get("size", 0) or 0 for req in raw_requests]).tolist(),
+    }
+
+
+def aggregate_by_content_type(columns):
+    """
+    Aggregate request columns by content-type with a vectorized group-by; requests without
+    a known duration are left out. Ordered by total duration.
+    Returns OrderedDict[contentType] -> {count, total_duration_ms, total_size_bytes, duration_sketch}
+    duration_sketch is a serialized sketches.LogHistogram of the request durations.
+    """
+    import numpy as np
 
-def read_webvitals_metrics(dirs, reports_root="reports"):
-    results = {}
+    duration = float_column(columns["duration"])
+    known = ~np.isnan(duration)
+    codes, content_types = factorize(np.asarray(columns["content_type"], dtype=object)[known])
+    counts, (durations, sizes) = group_totals(
+        codes, len(content_types), duration[known], int_column(columns["size"])[known]
+    )
+    per_group = group_values(codes, counts, duration[known])
+    by_ct = {
+        ct: {
+            "count": int(counts[i]),
+            "total_duration_ms": float(durations[i]),
+            "total_size_bytes": int(sizes[i]),
+            "duration_sketch": sketch_of(per_group[i]),
+        }
+        for i, ct in enumerate(content_types)
+    }
+    return OrderedDict(sorted(by_ct.items(), key=lambda kv: (-kv[1]["total_duration_ms"], kv[0])))
+
+
+def load_scenario(path):
+    """
+    Parse one metrics.json (or metrics.json.gz / .zst) into a normalized scenario record:
+      {"web_vitals": {FCP, TTFB, LCP, FID},
+       "network_requests": request_columns(networkRequests),
+       "content_types": aggregate_by_content_type(network_requests)}
+    """
+    with stage("metrics.decode"), open_binary(path) as f:
+        data = json.load(f)
+    with stage("metrics.extract"):
+        wv = data.get("webVitals", {}) or {}
+        requests = request_columns(data.get("networkRequests", []) or [])
+        return {
+            "web_vitals": {metric: wv.get(metric) for metric in WEB_VITALS},
+            "network_requests": requests,
+            "content_types": aggregate_by_content_type(requests),
+        }
+
+
+def load_scenarios(dirs, reports_root="reports", cache=None, jobs=1, index=None):
+    """
+    Load every run of every dir: reports/<dir>/metrics.json and/or reports/<dir>/run-XXX/metrics.json.
+    Returns OrderedDict[dir] -> [run record, ...] in run order.
+    Every output (summary, charts, aggregates) is built from these records, so each file is
+    decoded only once per run, and not at all when an unchanged copy is in the extraction
+    cache. With jobs > 1 the files are parsed in a process pool; records and messages still
+    come out in dirs order. A ScenarioIndex of reports_root supplies the run files without
+    touching the filesystem again.
+    """
+    if index is not None:
+        run_files = {d: index.run_files(d, "metrics.json") for d in dirs}
+    else:
+        run_files = {d: run_paths(reports_root, d, "metrics.json") for d in dirs}
+    all_paths = [path for d in dirs for path in run_files[d]]
+    loaded = dict(zip(all_paths, ingest(all_paths, load_scenario, "metrics", cache, jobs)))
+
+    scenarios = OrderedDict()
     for d in dirs:
-        path = os.path.join(reports_root, d, "metrics.json")
-        if not os.path.isfile(path):
-            print(f"[MISS] {path} not found")
+        if not run_files[d]:
+            print(f"[MISS] {os.path.join(reports_root, d, 'metrics.json')} not found")
             continue
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            wv = data.get("webVitals", {})
-            results[d] = {
-                "FCP": wv.get("FCP"),
-                "TTFB": wv.get("TTFB"),
-                "LCP": wv.get("LCP"),
-                "FID": wv.get("FID"),
-            }
-        except Exception as e:
-            print(f"[ERR ] failed reading {path}: {e}")
+        runs = []
+        for path in run_files[d]:
+            record, error = loaded[path]
+            if error is not None:
+                print(f"[ERR ] failed reading {path}: {error}")
+                continue
+            runs.append(record)
+        if runs:
+            scenarios[d] = runs
+    return scenarios
+
+
+def webvitals_stats(scenarios):
+    """dict[folder] -> {metric: {n, median, p75, p95, std, ci_low, ci_high}} across the folder's runs."""
+    return {d: summarize_runs([run["web_vitals"] for run in runs], WEB_VITALS) for d, runs in scenarios.items()}
+
+
+def webvitals_from_scenarios(scenarios, stats=None):
+    """One value per metric and folder: the run itself for single runs, the median across repeated runs."""
+    results = {}
+    for d, runs in scenarios.items():
+        if len(runs) == 1:
+            results[d] = dict(runs[0]["web_vitals"])
+        else:
+            results[d] = medians(stats[d] if stats else webvitals_stats({d: runs})[d])
     return results
 
 
-def print_webvitals_summary(wv_results):
+def read_webvitals_metrics(dirs, reports_root="reports"):
+    return webvitals_from_scenarios(load_scenarios(dirs, reports_root))
+
+
+def print_webvitals_summary(wv_results, stats=None):
     if not wv_results:
         print("No metrics collected.")
         return
@@ -60,18 +166,38 @@ def print_webvitals_summary(wv_results):
     print("\nWeb Vitals Summary")
     print(header)
     print("-" * len(header))
+    def fmt(v):
+        return f"{v:.2f}" if isinstance(v, (int, float)) else "-"
     for d in sorted(wv_results.keys()):
         m = wv_results[d]
-        def fmt(v):
-            return f"{v:.2f}" if isinstance(v, (int, float)) else "-"
         print(f"{d:35} {fmt(m['FCP']):>10} {fmt(m['TTFB']):>10} {fmt(m['LCP']):>10} {fmt(m['FID']):>10}")
 
+    if not stats or not has_repeats(stats):
+        return
+    header = (f"{'Directory':35} {'Metric':6} {'Runs':>5} {'Median':>10} {'95% CI':>21} "
+              f"{'p75':>10} {'p95':>10} {'Std':>10}")
+    print("\nWeb Vitals across repeated runs (ms)")
+    print(header)
+    print("-" * len(header))
+    for d in sorted(stats.keys()):
+        for metric in WEB_VITALS:
+            st = stats[d].get(metric)
+            if not st or st["n"] < 2:
+                continue
+            ci = f"[{fmt(st['ci_low'])}, {fmt(st['ci_high'])}]"
+            print(f"{d:35} {metric:6} {st['n']:>5} {fmt(st['median']):>10} {ci:>21} "
+                  f"{fmt(st['p75']):>10} {fmt(st['p95']):>10} {fmt(st['std']):>10}")
+
 
-def generate_webvitals_chart(wv_results, output_path="webvitals_chart.png"):
+def generate_webvitals_chart(wv_results, output_path="webvitals_chart.png", stats=None):
+    """Grouped bars per metric; with repeated runs (stats) each bar is the median with a 95% CI error bar."""
     if not wv_results:
         return
+    import numpy as np
+    from matplotlib.ticker import FuncFormatter
+    plt = pyplot()
 
-    metrics = ["FCP", "TTFB", "LCP", "FID"]
+    metrics = WEB_VITALS
     dirs = sorted(wv_results.keys())
     n_dirs = len(dirs)
     n_metrics = len(metrics)
@@ -83,6 +209,13 @@ def generate_webvitals_chart(wv_results, output_path="webvitals_chart.png"):
             if isinstance(val, (int, float)) and not math.isnan(val):
                 data[i, j] = val
 
+    # (below, above) distance of the CI bounds from the median; NaN = no error bar.
+    errors = np.full((n_dirs, n_metrics, 2), np.nan)
+    if stats:
+        for i, d in enumerate(dirs):
+            for j, metric in enumerate(metrics):
+                errors[i, j] = error_bar(stats.get(d, {}).get(metric))
+
     x = np.arange(n_metrics)
     total_group_width = 0.945  
     bar_width = total_group_width / max(n_dirs, 1)
@@ -94,13 +227,16 @@ def generate_webvitals_chart(wv_results, output_path="webvitals_chart.png"):
     bars = []
     
     original_values = []  # list of (rect, value)
+    error_above = {}  # rect -> upper error bar length
     for i, d in enumerate(dirs):
         offset = (i - (n_dirs - 1) / 2) * bar_width
         bar_positions = x + offset
         series = ax.bar(bar_positions, data[i], width=bar_width * 0.55, label=d, color=cmap(i % 20))
         bars.append(series)
-        for rect, val in zip(series, data[i]):
+        for rect, val, err in zip(series, data[i], errors[i]):
             original_values.append((rect, val))
+            if not np.isnan(err).any():
+                error_above[rect] = err
 
     
     fig.canvas.draw()
@@ -114,8 +250,18 @@ def generate_webvitals_chart(wv_results, output_path="webvitals_chart.png"):
         if not np.isnan(val):
             rect.set_height((val if val>0 else 0) + data_offset)
 
-    
+    if error_above:
+        rects = list(error_above)
+        ax.errorbar(
+            [r.get_x() + r.get_width() / 2 for r in rects],
+            [r.get_height() for r in rects],
+            yerr=np.array([error_above[r] for r in rects]).T,
+            fmt='none', ecolor='black', elinewidth=0.8, capsize=2,
+        )
+
     current_top = ax.get_ylim()[1]
+    if error_above:
+        current_top = max(current_top, max(r.get_height() + e[1] for r, e in error_above.items()))
     ax.set_ylim(0, current_top + data_offset * 0.3)
 
     
@@ -143,6 +289,8 @@ def generate_webvitals_chart(wv_results, output_path="webvitals_chart.png"):
         if np.isnan(val):
             continue
         display_height = rect.get_height()
+        if rect in error_above:
+            display_height += error_above[rect][1]
         base_offset = ( (val+data_offset) * 0.02 if val else data_offset * 0.4)
         stagger = extra_label_offset if (shown_count % 2 == 1) else 0
         ax.text(
@@ -176,73 +324,52 @@ def generate_webvitals_chart(wv_results, output_path="webvitals_chart.png"):
         right_limit = x[-1] + (total_group_width / 2) + 0.05
         ax.set_xlim(left_limit, right_limit)
     fig.tight_layout()
-    fig.savefig(output_path, dpi=150)
+    with stage("render.savefig"):
+        fig.savefig(output_path, dpi=150)
     plt.close(fig)
     print(f"Saved chart -> {output_path}")
 
 
-def _normalize_content_type(ct: str) -> str:
-    if not ct:
-        return "unknown"
-    return ct.split(";", 1)[0].strip().lower() or "unknown"
+def merge_content_types(aggregates):
+    """Sum content-type buckets of several runs into one OrderedDict, ordered by total duration."""
+    merged = {}
+    sketches = {}
+    for by_ct in aggregates:
+        for ct, v in by_ct.items():
+            bucket = merged.setdefault(ct, {"count": 0, "total_duration_ms": 0.0, "total_size_bytes": 0})
+            bucket["count"] += v["count"]
+            bucket["total_duration_ms"] += v["total_duration_ms"]
+            bucket["total_size_bytes"] += v["total_size_bytes"]
+            sketches.setdefault(ct, []).append(v.get("duration_sketch"))
+    for ct, bucket in merged.items():
+        bucket["duration_sketch"] = merge_sketches(sketches[ct])
+    return OrderedDict(sorted(merged.items(), key=lambda kv: (-kv[1]["total_duration_ms"], kv[0])))
 
 
-def read_network_aggregates(dirs, reports_root="reports"):
+def aggregate_network_requests(scenarios):
     """
-    Read reports/<dir>/metrics.json for each dir and aggregate networkRequests by content-type.
+    Per-folder content-type aggregates of the loaded scenario records, summed over all runs.
     Returns:
-      agg_by_folder: dict[folder] -> OrderedDict[contentType] -> {count, total_duration_ms, total_size_bytes}
+      agg_by_folder: dict[folder] -> OrderedDict[contentType] -> {count, total_duration_ms, total_size_bytes,
+                                                                   duration_sketch}
     """
-    agg_by_folder = {}
-    for d in dirs:
-        path = os.path.join(reports_root, d, "metrics.json")
-        if not os.path.isfile(path):
-            continue
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        except Exception as e:
-            print(f"[ERR ] failed reading {path}: {e}")
-            continue
+    return {d: merge_content_types(run["content_types"] for run in runs) for d, runs in scenarios.items()}
 
-        by_ct = defaultdict(lambda: {"count": 0, "total_duration_ms": 0.0, "total_size_bytes": 0})
-        for req in data.get("networkRequests", []):
-            ct = _normalize_content_type(req.get("contentType", ""))
-            start = req.get("startTime")
-            end = req.get("endTime")
-            duration = req.get("duration")
-            if duration is None and start is not None and end is not None:
-                try:
-                    duration = float(end) - float(start)
-                except Exception:
-                    duration = None
-            if duration is None:
-                continue
-            size = req.get("size", 0) or 0
 
-            bucket = by_ct[ct]
-            bucket["count"] += 1
-            bucket["total_duration_ms"] += float(duration)
-            try:
-                bucket["total_size_bytes"] += int(size)
-            except Exception:
-                try:
-                    bucket["total_size_bytes"] += int(float(size))
-                except Exception:
-                    pass
+def read_network_aggregates(dirs, reports_root="reports"):
+    return aggregate_network_requests(load_scenarios(dirs, reports_root))
 
-        ordered = OrderedDict(sorted(by_ct.items(), key=lambda kv: (-kv[1]["total_duration_ms"], kv[0])))
-        agg_by_folder[d] = ordered
 
-    return agg_by_folder
+def _fmt_quantile(v):
+    return "-" if math.isnan(v) else f"{round(v, 2)}"
 
 
 def write_aggregates_table(agg_by_folder, output_path="network-aggregates-all.txt"):
     lines = []
     lines.append("# Network aggregates across all folders (by content-type)")
-    lines.append("Folder\tContent-Type\tCount\tTotal Duration (ms)\tTotal Size (KB)\tAvg Duration (ms)\tAvg Size (KB)")
-    for folder in directories:
-        folder_aggr = agg_by_folder.get(folder, {})
+    lines.append("Folder\tContent-Type\tCount\tTotal Duration (ms)\tTotal Size (KB)\tAvg Duration (ms)\tAvg Size (KB)\t"
+                 + "\t".join(f"p{q} Duration (ms)" for q in QUANTILES))
+    for folder, folder_aggr in agg_by_folder.items():
         if not folder_aggr:
             continue
         for ct, v in folder_aggr.items():
@@ -251,7 +378,8 @@ def write_aggregates_table(agg_by_folder, output_path="network-aggregates-all.tx
             total_kb = round(v["total_size_bytes"] / 1024.0, 2)
             avg_dur = round(total_dur / count, 2) if count else 0.0
             avg_kb = round(total_kb / count, 2) if count else 0.0
-            lines.append(f"{folder}\t{ct}\t{count}\t{total_dur}\t{total_kb}\t{avg_dur}\t{avg_kb}")
+            quantiles = "\t".join(_fmt_quantile(p) for p in sketch_quantiles(v.get("duration_sketch")))
+            lines.append(f"{folder}\t{ct}\t{count}\t{total_dur}\t{total_kb}\t{avg_dur}\t{avg_kb}\t{quantiles}")
 
     with open(output_path, "w", encoding="utf-8") as f:
         f.write("\n".join(lines) + "\n")
@@ -259,6 +387,9 @@ def write_aggregates_table(agg_by_folder, output_path="network-aggregates-all.tx
 
 
 def plot_aggregates_heatmap(agg_by_folder, output_path="network-aggregates-all.png"):
+    import numpy as np
+    plt = pyplot()
+
     ct_set = set()
     for v in agg_by_folder.values():
         ct_set.update(v.keys())
@@ -267,7 +398,7 @@ def plot_aggregates_heatmap(agg_by_folder, output_path="network-aggregates-all.p
         print("No network request aggregates to plot.")
         return
 
-    rows = [d for d in directories if d in agg_by_folder]
+    rows = list(agg_by_folder)
     if not rows:
         print("No folders with aggregates to plot.")
         return
@@ -334,12 +465,17 @@ def plot_aggregates_heatmap(agg_by_folder, output_path="network-aggregates-all.p
         pass
 
     fig.suptitle('Network Aggregates (rows = folders, columns = content types)')
-    fig.savefig(output_path, dpi=150)
+    with stage("render.savefig"):
+        fig.savefig(output_path, dpi=150)
     plt.close(fig)
     print(f"Saved network aggregates heatmap -> {output_path}")
 
 
 def generate_table_image(agg_by_folder, output_path="network-aggregates-all-table.png"):
+    """
+    The aggregates table as PNG pages (paginated past table_render.ROWS_PER_PAGE rows), or as
+    one HTML/SVG file when output_path ends in .html/.svg.
+    """
     headers = [
         "Folder",
         "Content-Type",
@@ -348,11 +484,10 @@ def generate_table_image(agg_by_folder, output_path="network-aggregates-all-tabl
         "Total Size (KB)",
         "Avg Duration (ms)",
         "Avg Size (KB)",
-    ]
+    ] + [f"p{q} Duration (ms)" for q in QUANTILES]
 
     rows = []
-    for folder in directories:
-        folder_aggr = agg_by_folder.get(folder, {})
+    for folder, folder_aggr in agg_by_folder.items():
         for ct, v in folder_aggr.items():
             count = v["count"]
             total_dur = round(v["total_duration_ms"], 2)
@@ -367,53 +502,83 @@ def generate_table_image(agg_by_folder, output_path="network-aggregates-all-tabl
                 f"{total_kb}",
                 f"{avg_dur}",
                 f"{avg_kb}",
-            ])
+            ] + [_fmt_quantile(p) for p in sketch_quantiles(v.get("duration_sketch"))])
 
     if not rows:
         print("No rows to render for table image.")
         return
-
-    n_rows = len(rows) + 1  
-    n_cols = len(headers)
-    col_w = 2.2
-    row_h = 0.3
-    fig_w = max(10, n_cols * col_w)
-    fig_h = max(4, n_rows * row_h)
-
-    fig, ax = plt.subplots(figsize=(fig_w, fig_h))
-    ax.axis('off')
-
-    the_table = ax.table(
-        cellText=rows,
-        colLabels=headers,
-        loc='center',
-        cellLoc='left',
-        colLoc='left',
-    )
-    the_table.auto_set_font_size(False)
-    the_table.set_fontsize(8)
-    the_table.scale(1, 1.2)
-
-    for (row, col), cell in the_table.get_celld().items():
-        if row == 0:
-            cell.set_text_props(weight='bold')
-            cell.set_facecolor('#f0f0f0')
-
-    fig.tight_layout()
-    fig.savefig(output_path, dpi=150)
-    plt.close(fig)
-    print(f"Saved aggregates table image -> {output_path}")
-
-
-def main():
-    wv = read_webvitals_metrics(directories)
-    print_webvitals_summary(wv)
-    generate_webvitals_chart(wv)
-
-    agg = read_network_aggregates(directories)
-    write_aggregates_table(agg, output_path="network-aggregates-all.txt")
-    plot_aggregates_heatmap(agg, output_path="network-aggregates-all.png")
-    generate_table_image(agg, output_path="network-aggregates-all-table.png")
+    pages = render_table(headers, rows, output_path)
+    print(f"Saved aggregates table image -> {output_path}" + (f" (+{len(pages) - 1} pages)" if len(pages) > 1 else ""))
+
+
+COMMANDS = ("summary", "aggregate", "render", "all")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Collect web vitals and network aggregates from reports/*/metrics.json")
+    parser.add_argument("command", nargs="?", choices=COMMANDS, default="all",
+                        help="summary: print the Web Vitals tables; aggregate: write network-aggregates-all.txt, "
+                             "network-endpoints.txt and network-timeline.txt; render: draw the charts and "
+                             "per-scenario waterfalls; all (default): everything")
+    parser.add_argument("--reports", default="reports", help="reports root directory (default: reports)")
+    add_scenario_arguments(parser)
+    add_jobs_argument(parser)
+    add_cache_arguments(parser)
+    add_render_arguments(parser)
+    add_table_format_argument(parser)
+    add_history_arguments(parser)
+    add_timings_argument(parser)
+    add_profile_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    command = args.command
+    profiler = start_profile(args)
+    with stage("discover"):
+        index, dirs = discover(args.reports, "metrics.json", scenario_filters(args))
+    cache = open_cache(args, args.reports)
+    try:
+        with stage("load"):
+            scenarios = load_scenarios(dirs, args.reports, cache=cache, jobs=args.jobs, index=index)
+    finally:
+        if cache is not None:
+            cache.close()
+    report_cache_stats(cache)
+
+    if command in ("summary", "render", "all"):
+        with stage("webvitals_stats"):
+            stats = webvitals_stats(scenarios)
+            wv = webvitals_from_scenarios(scenarios, stats)
+    if command in ("summary", "all"):
+        with stage("summary"):
+            print_webvitals_summary(wv, stats)
+        record_history(args, WEBVITALS_SOURCE, wv, {d: len(runs) for d, runs in scenarios.items()})
+
+    if command in ("aggregate", "render", "all"):
+        with stage("aggregate"):
+            agg = aggregate_network_requests(scenarios)
+        with stage("timeline"):
+            timelines = timeline_index(scenarios)
+    if command in ("aggregate", "all"):
+        with stage("write_tables"):
+            write_aggregates_table(agg, output_path="network-aggregates-all.txt")
+            write_endpoints_table(endpoint_index(scenarios), output_path="network-endpoints.txt")
+            write_timeline_table(timelines, output_path="network-timeline.txt")
+
+    if command in ("render", "all"):
+        with stage("render"):
+            render_all([
+                RenderJob(generate_webvitals_chart, (wv,), {"output_path": "webvitals_chart.png", "stats": stats}),
+                RenderJob(plot_aggregates_heatmap, (agg,), {"output_path": "network-aggregates-all.png"}),
+                RenderJob(generate_table_image, (agg,),
+                          {"output_path": table_output("network-aggregates-all-table.png", args.table_format)}),
+            ] + waterfall_jobs(timelines, scenarios), open_render_cache(args, args.reports), args.jobs)
+
+    finish_profile(profiler, args, command)
+    if args.timings:
+        report_timings(_STARTED, _IMPORTED, command)
 
 
 if __name__ == "__main__":
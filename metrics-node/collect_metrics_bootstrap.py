@@ -1,100 +1,202 @@
-from collections import defaultdict
+import time
+
+_STARTED = time.perf_counter()
+
+from collections import defaultdict, OrderedDict
+from functools import partial
+import argparse
+import csv
 import json
 import os
-import matplotlib
-
-matplotlib.use("Agg")
-
-import matplotlib.pyplot as plt
-import numpy as np
-
-directories = [
-    "react-desktop-bootstrap",
-    "react-mobile-bootstrap",
-    "blazor-desktop-bootstrap",
-    "blazor-mobile-bootstrap"
-]
-
-audit_metrics = [
-    "first-contentful-paint",      # ms
-    "largest-contentful-paint",    # ms
-    "total-blocking-time",         # ms
-    "cumulative-layout-shift",
-    "speed-index",                 # ms
-    "interactive"                  # ms
-]
-
-audit_metrics_ms = [
-    "first-contentful-paint",
-    "largest-contentful-paint",
-    "total-blocking-time",
-    "speed-index",
-    "interactive"
-]
-
-
-category_scores = [
-    "performance_score",
-    "accessibility_score",
-    "best_practices_score",
-    "seo_score"
-]
-
-def extract_metrics(report_path):
-    with open(report_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+import re
+
+import audit_registry
+from audit_registry import AUDITS, PERCENT, SECONDS, TABLE, UNITLESS, merge_tables, report_selection, scalar_keys
+from compressed import existing, open_binary, open_text, strip_suffix
+from history_store import LIGHTHOUSE_SOURCE, add_history_arguments, record_history
+from json_stream import load_selected
+from parallel import add_jobs_argument, ingest
+from profiling import add_profile_arguments, finish_profile, stage, start_profile
+from render_stage import RenderJob, add_render_arguments, open_render_cache, pyplot, render_all
+from report_cache import add_cache_arguments, open_cache, report_cache_stats
+from run_stats import error_bar, medians, run_paths, summarize_runs
+from scenario_index import add_scenario_arguments, discover, scenario_filters
+from sketches import QUANTILES, sketch_quantiles
+from startup import add_timings_argument, report_timings
+from table_render import add_table_format_argument, render_table, table_output
+
+# matplotlib and numpy load inside the functions that use them, so the summary command
+# starts without them.
+_IMPORTED = time.perf_counter()
+
+# What is read from report.json is declared in audit_registry; these are the registered
+# scalars by kind, for the scripts that treat timings and scores differently.
+audit_metrics = [spec.key for spec in audit_registry.specs() if spec.path[0] == "audits" and spec.unit != TABLE]
+audit_metrics_ms = scalar_keys(SECONDS)
+category_scores = scalar_keys(PERCENT)
+
+# Parts of report.json that extract_metrics reads; everything else (screenshots,
+# i18n strings, audit descriptions) is skipped by the streaming parser.
+REPORT_SELECTION = report_selection()
+
+# report.csv has the category scores and the displayValue of every audit, which is a number
+# only for timings and CLS; the other registered values need report.json.
+CSV_SPECS = [spec for spec in audit_registry.specs()
+             if spec.path[0] == "categories" or (spec.path[0] == "audits" and spec.path[2:] == ("numericValue",)
+                                                 and spec.unit in (SECONDS, UNITLESS))]
+JSON_SPECS = [spec for spec in audit_registry.specs() if spec not in CSV_SPECS]
+# What is still read from report.json next to a report.csv (with --stream), when it is opened at all.
+NETWORK_SELECTION = report_selection(JSON_SPECS)
+
+REPORT_CSV = "report.csv"
+# Lighthouse displayValue of the timing audits: "3.0 s", "1,230 ms", "0 ms", or a bare number for CLS.
+_DISPLAY_VALUE = re.compile(r"^([\d,]*\.?\d+)\s*(ms|s)?$")
+
+
+def load_report(report_path, stream=False):
+    if stream:
+        return load_selected(report_path, REPORT_SELECTION)
+    # Compressed reports (report.json.gz / .zst) are decompressed as they are read.
+    with open_binary(report_path) as f:
+        return json.load(f)
+
+
+def extract_metrics(report_path, stream=False):
+    with stage("lighthouse.decode"):
+        data = load_report(report_path, stream=stream)
+    with stage("lighthouse.extract"):
+        return audit_registry.extract(data)
+
+
+def parse_display_value(text):
+    """Seconds of a "3.0 s" / "120 ms" displayValue, the number itself when it has no unit, None otherwise."""
+    m = _DISPLAY_VALUE.match(text.replace("\xa0", " ").strip())
+    if m is None:
+        return None
+    v = float(m.group(1).replace(",", ""))
+    return v / 1000.0 if m.group(2) == "ms" else v
+
+
+def read_report_csv(csv_path):
+    """
+    The CSV_SPECS values of extract_metrics() from a Lighthouse report.csv. Audits only carry their
+    displayValue there, so timings are rounded ("3.0 s" -> 3.0) where report.json has
+    numericValue. Reading stops once every audit has been seen.
+    """
+    audits = {spec.path[1]: spec for spec in CSV_SPECS if spec.path[0] == "audits"}
+    scores, display = {}, {}
+    header = None
+    with open_text(csv_path) as f:
+        for row in csv.reader(f):
+            if not row:
+                header = None
+            elif row[0] == "category":
+                header = row
+            elif header == ["category", "score"]:
+                scores[row[0]] = json.loads(row[1])  # "0.66", "1" or "null", as in report.json
+            elif header is not None and "audit" in header and "displayValue" in header:
+                audit = row[header.index("audit")]
+                if audit in audits:
+                    display[audit] = row[header.index("displayValue")]
+                    if len(display) == len(audits) and scores:
+                        break
+
     results = {}
-    audits = data.get("audits", {})
-
-    for metric in audit_metrics:
-        v = audits.get(metric, {}).get("numericValue")
-        if metric in audit_metrics_ms:
-            v = v / 1000.0 if v is not None else None  # ms -> s
-        results[metric] = v
-
-    categories = data.get("categories", {})
-    def pct(cat_id):
-        raw = categories.get(cat_id, {}).get("score")
-        return raw * 100 if raw is not None else None
-
-    results["performance_score"]    = pct("performance")
-    results["accessibility_score"]  = pct("accessibility")
-    results["best_practices_score"] = pct("best-practices")
-    results["seo_score"]            = pct("seo")
-
-    net_items = (
-        audits.get("network-requests", {})
-              .get("details", {})
-              .get("items", [])
-    )
-    results["network_requests"] = aggregate_requests(net_items)
+    for spec in CSV_SPECS:
+        if spec.path[0] == "audits":
+            results[spec.key] = parse_display_value(display.get(spec.path[1], ""))
+        else:
+            raw = scores.get(spec.path[1])
+            results[spec.key] = spec.convert(raw) if raw is not None else None
     return results
 
-def aggregate_requests(items):
-    agg = {}
-    for it in items:
-        mime = it.get("mimeType") or "unknown"
-        transfer = it.get("transferSize") or 0
-        start = it.get("networkRequestTime")
-        end = it.get("networkEndTime")
-        if isinstance(start, (int, float)) and isinstance(end, (int, float)) and end >= start:
-            duration = end - start
-        else:
-            duration = 0.0
-        if mime not in agg:
-            agg[mime] = {
-                "count": 0,
-                "total_transfer_size": 0,
-                "total_duration": 0.0
-            }
-        a = agg[mime]
-        a["count"] += 1
-        a["total_transfer_size"] += transfer
-        a["total_duration"] += duration
-    return agg
-
-def generate_grouped_bar_chart(all_metrics_by_dir, output_path="metrics_chart.png"):
-    metric_order = audit_metrics + category_scores
+
+def extract_csv_metrics(csv_path, network=False, stream=False):
+    """
+    extract_metrics() from report.csv. The CSV has no details tables (network-requests, ...):
+    with network the JSON_SPECS values come from the report.json next to it (the streaming
+    parser, with stream, reads those audits only); without, the report.json is not opened,
+    tables are empty and the other values None.
+    """
+    with stage("lighthouse.csv"):
+        results = read_report_csv(csv_path)
+    if not network:
+        results.update((spec.key, {} if spec.unit == TABLE else None) for spec in JSON_SPECS)
+    else:
+        report_path = existing(os.path.join(os.path.dirname(csv_path), "report.json"))
+        if report_path is None:
+            raise FileNotFoundError(f"no report.json next to {csv_path} for the audits report.csv lacks")
+        with stage("lighthouse.decode"):
+            data = load_selected(report_path, NETWORK_SELECTION) if stream else load_report(report_path)
+        with stage("lighthouse.extract"):
+            results.update(audit_registry.extract(data, JSON_SPECS))
+    return {spec.key: results[spec.key] for spec in audit_registry.specs()}  # same order as extract_metrics()
+
+
+def extract_run(path, stream=False, network=True):
+    """extract_csv_metrics() for a report.csv, extract_metrics() for a report.json."""
+    if strip_suffix(path).endswith(".csv"):
+        return extract_csv_metrics(path, network, stream)
+    return extract_metrics(path, stream)
+
+
+def reduce_runs(runs):
+    """
+    Combine the extract_metrics() results of a scenario's runs.
+    Returns (metrics, stats): metrics holds the median of every registered scalar plus the
+    tables (network aggregates, ...) merged over all runs; stats is the summarize_runs() output (None for one run).
+    """
+    if len(runs) == 1:
+        return runs[0], None
+    stats = summarize_runs(runs, scalar_keys())
+    metrics = medians(stats)
+    metrics.update(merge_tables(runs))
+    return metrics, stats
+
+
+def _value_panel(ax, all_metrics_by_dir, stats_by_dir, keys, unit):
+    """Grouped bars of the registered scalars of one further unit (KB, ...), one bar per directory."""
+    import numpy as np
+    plt = pyplot()
+
+    directories = list(all_metrics_by_dir)
+    x = np.arange(len(keys))
+    bar_width = 0.8 / len(directories)
+    for dir_index, d in enumerate(directories):
+        values = [all_metrics_by_dir[d].get(k) for k in keys]
+        values = [v if isinstance(v, (int, float)) else np.nan for v in values]
+        dir_stats = stats_by_dir.get(d)
+        yerr = np.array([error_bar(dir_stats.get(k)) for k in keys]).reshape(-1, 2).T if dir_stats else None
+        bars = ax.bar(x - 0.4 + (dir_index + 0.5) * bar_width, values, width=bar_width, label=d,
+                      color=plt.get_cmap('tab10')(dir_index), yerr=yerr, capsize=2)
+        for bar, key, value in zip(bars, keys, values):
+            if not np.isnan(value):
+                ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height(), AUDITS[key].fmt.format(value),
+                        ha="center", va="bottom", rotation=45, fontsize=9, clip_on=False)
+    ax.set_xticks(x)
+    ax.set_xticklabels([k.replace("-", " ").title() for k in keys])
+    ax.set_ylabel(unit)
+    ax.set_ylim(0, max([ax.get_ylim()[1], 1.0]) * 1.15)
+
+
+def generate_grouped_bar_chart(all_metrics_by_dir, output_path="metrics_chart.png", stats_by_dir=None):
+    """
+    The registered scalars per directory: timings/CLS and category scores on the main axes,
+    every further unit (KB, ...) with values in a panel below. Repeated runs get 95% CI error
+    bars on the medians.
+    """
+    import numpy as np
+    plt = pyplot()
+
+    timing_metrics = scalar_keys(SECONDS, UNITLESS)
+    metric_order = timing_metrics + category_scores
+    stats_by_dir = stats_by_dir or {}
+    directories = list(all_metrics_by_dir)
+    panels = OrderedDict()  # unit -> keys with a value in some directory
+    for spec in audit_registry.specs():
+        if spec.unit not in (TABLE, SECONDS, UNITLESS, PERCENT) and any(
+                isinstance(m.get(spec.key), (int, float)) for m in all_metrics_by_dir.values()):
+            panels.setdefault(spec.unit, []).append(spec.key)
 
     data_matrix = []
     for metric in metric_order:
@@ -110,18 +212,12 @@ def generate_grouped_bar_chart(all_metrics_by_dir, output_path="metrics_chart.pn
     total_group_width = 0.8
     bar_width = total_group_width / num_dirs
 
-    fig, ax_time = plt.subplots(figsize=(max(16, num_metrics * 0.95), 8))
+    fig, axes = plt.subplots(1 + len(panels), 1, figsize=(max(16, num_metrics * 0.95), 8 + 3.5 * len(panels)),
+                             squeeze=False, gridspec_kw={"height_ratios": [8] + [3.5] * len(panels)})
+    ax_time = axes[0][0]
     ax_score = ax_time.twinx()
 
     legend_handles = {}
-    timing_metric_names = {
-        "first-contentful-paint",
-        "largest-contentful-paint",
-        "total-blocking-time",
-        "speed-index",
-        "interactive",
-        "cumulative-layout-shift"
-    }
 
     label_entries = []  # (axis, bar, metric_name, value, is_score)
 
@@ -138,6 +234,12 @@ def generate_grouped_bar_chart(all_metrics_by_dir, output_path="metrics_chart.pn
                 heights_time.append(v)
                 heights_score.append(np.nan)
 
+        dir_stats = stats_by_dir.get(d)
+        def errors(indices):
+            if not dir_stats:
+                return None
+            return np.array([error_bar(dir_stats.get(metric_order[i])) for i in indices]).reshape(-1, 2).T
+
         timing_indices = [i for i, h in enumerate(heights_time) if not np.isnan(h)]
         timing_offsets = [offsets[i] for i in timing_indices]
         timing_values = [heights_time[i] for i in timing_indices]
@@ -146,7 +248,9 @@ def generate_grouped_bar_chart(all_metrics_by_dir, output_path="metrics_chart.pn
             timing_values,
             width=bar_width,
             label=d,
-            color=plt.get_cmap('tab10')(dir_index)
+            color=plt.get_cmap('tab10')(dir_index),
+            yerr=errors(timing_indices),
+            capsize=2
         )
 
         score_indices = [i for i, h in enumerate(heights_score) if not np.isnan(h)]
@@ -157,7 +261,9 @@ def generate_grouped_bar_chart(all_metrics_by_dir, output_path="metrics_chart.pn
             score_values,
             width=bar_width,
             label=d,
-            color=plt.get_cmap('tab10')(dir_index)
+            color=plt.get_cmap('tab10')(dir_index),
+            yerr=errors(score_indices),
+            capsize=2
         )
 
         handle = bars_time.patches[0] if bars_time.patches else bars_score.patches[0]
@@ -186,7 +292,7 @@ def generate_grouped_bar_chart(all_metrics_by_dir, output_path="metrics_chart.pn
 
 
     max_time_val = 0.0
-    for metric in timing_metric_names:
+    for metric in timing_metrics:
         for d in directories:
             v = all_metrics_by_dir.get(d, {}).get(metric)
             if isinstance(v, (int, float)):
@@ -200,19 +306,11 @@ def generate_grouped_bar_chart(all_metrics_by_dir, output_path="metrics_chart.pn
     for axis, bar, metric_name, value, is_score in label_entries:
         if value is None or np.isnan(value):
             continue
-        if is_score:
-            text = f"{value:.0f}%"
-            voffset = max_time_val * 0.01  
-        else:
-            if metric_name == "cumulative-layout-shift":
-                text = f"{value:.4f}"
-            else:
-                text = f"{value:.2f}s"
-            voffset = max_time_val * 0.01
+        voffset = max_time_val * 0.01
         axis.text(
             bar.get_x() + bar.get_width() / 2,
             bar.get_height() + voffset,
-            text,
+            AUDITS[metric_name].fmt.format(value),
             ha="center",
             va="bottom",
             rotation=45,
@@ -221,12 +319,16 @@ def generate_grouped_bar_chart(all_metrics_by_dir, output_path="metrics_chart.pn
         )
 
     ax_time.legend(legend_handles.values(), legend_handles.keys(), loc="upper left")
+    for (unit, keys), row in zip(panels.items(), axes[1:]):
+        _value_panel(row[0], all_metrics_by_dir, stats_by_dir, keys, unit)
     fig.subplots_adjust(top=0.90)  
     fig.tight_layout()
-    fig.savefig(output_path, dpi=150)
+    with stage("render.savefig"):
+        fig.savefig(output_path, dpi=150)
     plt.close(fig)
 
 def generate_network_requests_table(all_metrics_by_dir, output_path="network_requests.png"):
+    """Per-directory, per-mime network aggregates as PNG pages, or one HTML/SVG file by output_path's extension."""
     rows = []
     for directory in sorted(all_metrics_by_dir.keys()):
         net = all_metrics_by_dir[directory].get("network_requests", {}) or {}
@@ -238,69 +340,263 @@ def generate_network_requests_table(all_metrics_by_dir, output_path="network_req
                 stats["count"],
                 stats["total_transfer_size"],
                 f"{stats['total_duration']:.3f}"
-            ])
+            ] + ["-" if p != p else f"{p:.1f}" for p in sketch_quantiles(stats.get("duration_sketch"))])
 
     if not rows:
         print("No network request data to tabulate.")
         return
 
-    col_labels = ["Directory", "Content Type", "Count", "Transfer (bytes)", "Duration (s)"]
-
-
-    n_rows = len(rows)
-    fig_height = max(3, min(0.2 * n_rows + 1, 40))  
-    fig, ax = plt.subplots(figsize=(11, fig_height))
-    ax.axis('off')
-
-    table = ax.table(
-        cellText=rows,
-        colLabels=col_labels,
-        loc='upper left',
-        cellLoc='left'
-    )
-
-    table.auto_set_font_size(False)
-    table.set_fontsize(9)
-
-
-    col_widths = {
-        0: 0.18,
-        1: 0.32,
-        2: 0.08,
-        3: 0.18,
-        4: 0.14
-    }
-    for (row, col), cell in table.get_celld().items():
-        if row == 0:
-            cell.set_text_props(weight='bold')
-            cell.set_facecolor("#f0f0f0")
-        if col in col_widths:
-            cell.set_width(col_widths[col])
-
-    plt.title("Aggregated Network Requests by Directory and Content Type", pad=12)
-    plt.tight_layout()
-    plt.savefig(output_path, dpi=150)
+    col_labels = ["Directory", "Content Type", "Count", "Transfer (bytes)", "Duration (s)"] + [
+        f"p{q} (ms)" for q in QUANTILES
+    ]
+    render_table(col_labels, rows, output_path, title="Aggregated Network Requests by Directory and Content Type")
+
+def _ranked(table, column):
+    """(name, row) pairs of a per-run-mean table, largest column first."""
+    return sorted(table.items(), key=lambda item: -item[1][column])
+
+
+def generate_bootup_table(all_metrics_by_dir, output_path="bootup_scripts.png"):
+    """
+    Per directory, the scripts of the bootup-time audit ranked by CPU time (mean per run),
+    split into evaluation, parse/compile and the rest, with each script's share of the total.
+    """
+    rows = []
+    for directory in sorted(all_metrics_by_dir.keys()):
+        scripts = all_metrics_by_dir[directory].get("bootup_time") or {}
+        total = sum(row["total"] for row in scripts.values()) or 1.0
+        for rank, (script, row) in enumerate(_ranked(scripts, "total"), 1):
+            other = max(row["total"] - row["scripting"] - row["scriptParseCompile"], 0.0)
+            rows.append([directory, rank, script, f"{row['total']:.1f}", f"{row['scripting']:.1f}",
+                         f"{row['scriptParseCompile']:.1f}", f"{other:.1f}", f"{100 * row['total'] / total:.1f}"])
+
+    if not rows:
+        print("No bootup-time data to tabulate.")
+        return
+
+    col_labels = ["Directory", "Rank", "Script", "CPU Time (ms)", "Evaluation (ms)", "Parse/Compile (ms)",
+                  "Other (ms)", "Share (%)"]
+    render_table(col_labels, rows, output_path, title="Main-Thread CPU Time per Script (bootup-time, mean per run)")
+
+
+def generate_mainthread_table(all_metrics_by_dir, output_path="mainthread_categories.png"):
+    """Per directory, the mainthread-work-breakdown categories ranked by time (mean per run)."""
+    rows = []
+    for directory in sorted(all_metrics_by_dir.keys()):
+        groups = all_metrics_by_dir[directory].get("mainthread_work") or {}
+        total = sum(row["duration"] for row in groups.values()) or 1.0
+        for rank, (label, row) in enumerate(_ranked(groups, "duration"), 1):
+            rows.append([directory, rank, label, f"{row['duration']:.1f}", f"{100 * row['duration'] / total:.1f}"])
+
+    if not rows:
+        print("No main-thread work data to tabulate.")
+        return
+
+    col_labels = ["Directory", "Rank", "Category", "Time (ms)", "Share (%)"]
+    render_table(col_labels, rows, output_path, title="Main-Thread Work by Category (mean per run)")
+
+
+def _stacked_bars(ax, directories, tables, column, top, rest_label):
+    """
+    Horizontal bars of each directory's table total, stacked by row: the top rows over all
+    directories get their own segment (same colour everywhere), the others share rest_label.
+    """
+    import numpy as np
+    plt = pyplot()
+
+    overall = defaultdict(float)
+    for table in tables:
+        for name, row in table.items():
+            overall[name] += row[column]
+    names = sorted(overall, key=lambda name: -overall[name])
+    shown, rest = names[:top], names[top:]
+    segments = [(name, [t.get(name, {}).get(column, 0.0) for t in tables]) for name in shown]
+    if rest:
+        segments.append((rest_label, [sum(t.get(name, {}).get(column, 0.0) for name in rest) for t in tables]))
+
+    y = np.arange(len(directories))
+    left = np.zeros(len(directories))
+    cmap = plt.get_cmap("tab20")
+    for k, (name, widths) in enumerate(segments):
+        color = "#bbbbbb" if name == rest_label else cmap(k % 20)
+        ax.barh(y, widths, left=left, color=color, label=name, edgecolor="white", linewidth=0.5)
+        left += widths
+    for yi, total in zip(y, left):
+        ax.text(total, yi, f" {total:.0f} ms", va="center", fontsize=8)
+    ax.set_yticks(y)
+    ax.set_yticklabels(directories)
+    ax.invert_yaxis()
+    ax.set_xlim(0, max(left.max(initial=0.0), 1.0) * 1.12)
+    ax.set_xlabel("Time (ms, mean per run)")
+    ax.legend(loc="upper left", bbox_to_anchor=(1.01, 1.0), fontsize=8)
+
+
+def generate_cpu_breakdown_chart(all_metrics_by_dir, output_path="cpu_breakdown_chart.png", top_scripts=8):
+    """
+    Stacked bars per directory: main-thread time by category (mainthread-work-breakdown) and
+    CPU time by script (bootup-time, the top_scripts heaviest over all directories, the rest
+    as one segment), so framework runtimes and bundles can be compared side by side.
+    """
+    plt = pyplot()
+
+    directories = [d for d in sorted(all_metrics_by_dir)
+                   if all_metrics_by_dir[d].get("mainthread_work") or all_metrics_by_dir[d].get("bootup_time")]
+    if not directories:
+        print("No main-thread data to chart.")
+        return
+
+    fig, (ax_groups, ax_scripts) = plt.subplots(2, 1, figsize=(14, 4 + 0.8 * len(directories)))
+    _stacked_bars(ax_groups, directories, [all_metrics_by_dir[d].get("mainthread_work") or {} for d in directories],
+                  "duration", 10, "other categories")
+    ax_groups.set_title("Main-Thread Work by Category")
+    _stacked_bars(ax_scripts, directories, [all_metrics_by_dir[d].get("bootup_time") or {} for d in directories],
+                  "total", top_scripts, "other scripts")
+    ax_scripts.set_title("Main-Thread CPU Time by Script (bootup-time)")
+    fig.tight_layout()
+    with stage("render.savefig"):
+        fig.savefig(output_path, dpi=150)
     plt.close(fig)
 
-def main():
-    all_metrics = {}
-    for directory in directories:
-        report_path = os.path.join("reports", directory, "report.json")
-        if not os.path.isfile(report_path):
-            print(f"[{directory}] report.json not found.")
+
+def render_jobs(all_metrics, stats_by_dir, table_format="png"):
+    """The RenderJobs of every figure and table drawn from the reduced metrics."""
+    return [
+        RenderJob(generate_grouped_bar_chart, (all_metrics,),
+                  {"output_path": "metrics_chart.png", "stats_by_dir": stats_by_dir}),
+        RenderJob(generate_network_requests_table, (all_metrics,),
+                  {"output_path": table_output("network_requests.png", table_format)}),
+        RenderJob(generate_bootup_table, (all_metrics,),
+                  {"output_path": table_output("bootup_scripts.png", table_format)}),
+        RenderJob(generate_mainthread_table, (all_metrics,),
+                  {"output_path": table_output("mainthread_categories.png", table_format)}),
+        RenderJob(generate_cpu_breakdown_chart, (all_metrics,), {"output_path": "cpu_breakdown_chart.png"}),
+    ]
+
+
+def load_lighthouse_runs(dirs, reports_root="reports", cache=None, jobs=1, stream=False, index=None,
+                         from_csv=False, network=True):
+    """
+    extract_metrics() of every run of every dir (reports/<dir>/report.json and/or
+    reports/<dir>/run-XXX/report.json). Returns OrderedDict[dir] -> [metrics per run].
+    With a ScenarioIndex of reports_root the run files come from the index. from_csv reads
+    each run's report.csv instead where there is one (see extract_csv_metrics); network=False
+    then leaves report.json unopened.
+    """
+    if index is not None:
+        run_files = {d: index.run_files(d, "report.json") for d in dirs}
+    else:
+        run_files = {d: run_paths(reports_root, d, "report.json") for d in dirs}
+    kind = "lighthouse"
+    if from_csv:
+        kind = "lighthouse-csv" if network else "lighthouse-csv-scores"
+        run_files = {d: [existing(os.path.join(os.path.dirname(p), REPORT_CSV)) or p for p in paths]
+                     for d, paths in run_files.items()}
+    all_paths = [path for d in dirs for path in run_files[d]]
+    extracted = ingest(all_paths, partial(extract_run, stream=stream, network=network), kind, cache, jobs)
+    extracted = dict(zip(all_paths, extracted))
+
+    runs_by_dir = OrderedDict()
+    for d in dirs:
+        if not run_files[d]:
+            print(f"[{d}] report.json not found.")
             continue
-        metrics = extract_metrics(report_path)
+        runs = []
+        for path in run_files[d]:
+            metrics, error = extracted[path]
+            if error is not None:
+                print(f"[ERR ] failed reading {path}: {error}")
+                continue
+            runs.append(metrics)
+        if runs:
+            runs_by_dir[d] = runs
+    return runs_by_dir
+
+
+COMMANDS = ("summary", "render", "all")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Collect Lighthouse bootstrap metrics from reports/*/report.json")
+    parser.add_argument("command", nargs="?", choices=COMMANDS, default="all",
+                        help="summary: print the per-scenario results; render: draw the charts; all (default): both")
+    parser.add_argument("--stream", action="store_true",
+                        help="walk report.json with the selective streaming parser instead of json.load; "
+                             "peak memory then depends on the extracted fields, not on the report size")
+    parser.add_argument("--from-csv", action="store_true",
+                        help="take scores and timing audits from each run's report.csv (displayValue precision, "
+                             "e.g. 3.0 s); report.json is then only read for the network table, so the summary "
+                             "command does not open it at all")
+    parser.add_argument("--reports", default="reports", help="reports root directory (default: reports)")
+    add_scenario_arguments(parser)
+    add_jobs_argument(parser)
+    add_cache_arguments(parser)
+    add_render_arguments(parser)
+    add_table_format_argument(parser)
+    add_history_arguments(parser)
+    add_timings_argument(parser)
+    add_profile_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    profiler = start_profile(args)
+    with stage("discover"):
+        index, dirs = discover(args.reports, "report.json", scenario_filters(args))
+    cache = open_cache(args, args.reports)
+    try:
+        with stage("load"):
+            runs_by_dir = load_lighthouse_runs(dirs, args.reports, cache, args.jobs, args.stream, index,
+                                               from_csv=args.from_csv, network=args.command != "summary")
+    finally:
+        if cache is not None:
+            cache.close()
+    report_cache_stats(cache)
+
+    all_metrics = {}
+    stats_by_dir = {}
+    for directory, runs in runs_by_dir.items():
+        with stage("reduce_runs"):
+            metrics, stats = reduce_runs(runs)
         all_metrics[directory] = metrics
+        if stats is not None:
+            stats_by_dir[directory] = stats
+        if args.command == "render":
+            continue
 
-        print(f"\nResults for {directory}:")
-        for k, v in metrics.items():
-            if k == "network_requests":
+        if stats is None:
+            print(f"\nResults for {directory}:")
+            for k, v in metrics.items():
+                if k not in AUDITS or AUDITS[k].unit == TABLE:
+                    continue
+                print(f"  {k}: {v}")
+            continue
+
+        print(f"\nResults for {directory} (median of {len(runs)} runs):")
+        for k, st in stats.items():
+            if not st:
+                print(f"  {k}: None")
                 continue
-            print(f"  {k}: {v}")
+            print(f"  {k}: {st['median']:.4g} (p75 {st['p75']:.4g}, p95 {st['p95']:.4g}, std {st['std']:.3g}, "
+                  f"95% CI [{st['ci_low']:.4g}, {st['ci_high']:.4g}], n={st['n']})")
+
+    if args.command in ("summary", "all"):
+        if args.from_csv:
+            # displayValue precision (3.8 s vs 3.75 s) would mix two precisions in one trend series.
+            if not args.no_history:
+                print("[HIST] --from-csv values are not recorded in the history")
+        else:
+            record_history(args, LIGHTHOUSE_SOURCE, all_metrics, {d: len(runs) for d, runs in runs_by_dir.items()})
+
+    if all_metrics and args.command in ("render", "all"):
+        with stage("render"):
+            render_all(render_jobs(all_metrics, stats_by_dir, args.table_format),
+                       open_render_cache(args, args.reports), args.jobs)
+
+    finish_profile(profiler, args, args.command)
 
-    if all_metrics:
-        generate_grouped_bar_chart(all_metrics)
-        generate_network_requests_table(all_metrics)  
+    if args.timings:
+        report_timings(_STARTED, _IMPORTED, args.command)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,89 @@
+# numpy is imported inside each function so that importing this module stays cheap for
+# the text-only commands; it loads on the first column actually built.
+
+
+def normalize_content_type(ct):
+    """Lower-cased MIME type without parameters ("text/html; charset=utf-8" -> "text/html"); "unknown" when empty."""
+    if not ct:
+        return "unknown"
+    return ct.split(";", 1)[0].strip().lower() or "unknown"
+
+
+def to_float(v):
+    """float(v), or None when v is not a number or numeric string."""
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def to_int(v):
+    """int(v), truncating floats and numeric strings; 0 when v is not a number."""
+    try:
+        return int(v)
+    except (TypeError, ValueError):
+        try:
+            return int(float(v))
+        except (TypeError, ValueError, OverflowError):
+            return 0
+
+
+def float_column(values):
+    """values as a float64 array; None and non-numeric entries become NaN."""
+    import numpy as np
+
+    try:
+        return np.array(values, dtype=float)
+    except (TypeError, ValueError):
+        # Only reached for malformed logs; the common case converts in one call.
+        return np.array([to_float(v) for v in values], dtype=float)
+
+
+def int_column(values):
+    """values as an int64 array, truncating floats and numeric strings; anything else becomes 0."""
+    import numpy as np
+
+    try:
+        return np.array(values, dtype=np.int64)
+    except (TypeError, ValueError, OverflowError):
+        return np.array([to_int(v) for v in values], dtype=np.int64)
+
+
+def factorize(values):
+    """
+    Encode values as integer codes.
+    Returns (codes, uniques) with uniques in order of first appearance, so codes index uniques.
+    """
+    import numpy as np
+
+    if not len(values):
+        return np.zeros(0, dtype=np.intp), []
+    uniques, first, inverse = np.unique(np.asarray(values, dtype=str), return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return rank[inverse.ravel()], uniques[order].tolist()
+
+
+def group_totals(codes, n_groups, *weights):
+    """
+    Per-group row count and per-group sum of each weight column.
+    bincount adds rows in input order, so sums match a sequential Python loop exactly.
+    """
+    import numpy as np
+
+    counts = np.bincount(codes, minlength=n_groups)
+    sums = [np.bincount(codes, weights=w, minlength=n_groups) for w in weights]
+    return counts, sums
+
+
+def group_values(codes, counts, values):
+    """
+    values split into one array per group, in group order and input order within a group.
+    counts is the per-group row count (group_totals output): one stable sort by code plus
+    a split at the group offsets, rather than a boolean mask per group.
+    """
+    import numpy as np
+
+    order = np.argsort(codes, kind="stable")
+    return np.split(np.asarray(values)[order], np.cumsum(counts)[:-1])
@@ -0,0 +1,201 @@
+import argparse
+import fnmatch
+import json
+import math
+import statistics
+import sys
+
+import collect_metrics
+import collect_metrics_bootstrap
+from parallel import add_jobs_argument
+from report_cache import add_cache_arguments, open_cache, report_cache_stats
+from run_stats import mann_whitney_min_p, mann_whitney_u
+from scenario_index import ScenarioIndex, add_scenario_arguments, scenario_filters
+
+# Metrics where a higher value is an improvement; everything else regresses upwards.
+HIGHER_IS_BETTER = set(collect_metrics_bootstrap.category_scores)
+
+DEFAULT_THRESHOLD_PCT = 10.0
+DEFAULT_ALPHA = 0.05
+MIN_RUNS_FOR_TEST = 3
+
+
+def collect_samples(reports_root, cache=None, jobs=1, stream=False, filters=None):
+    """
+    Per-run samples of every comparable metric in one reports tree:
+      dict[(source, scenario, metric)] -> [value per run]
+    source is "webvitals", "lighthouse", "network" (metrics.json content types) or
+    "lighthouse-network" (Lighthouse network-requests mime types).
+    """
+    samples = {}
+    filters = filters or {}
+    index = ScenarioIndex.scan(reports_root)
+
+    dirs = index.names(has="metrics.json", **filters)
+    scenarios = collect_metrics.load_scenarios(dirs, reports_root, cache, jobs, index)
+    for d, runs in scenarios.items():
+        for metric in collect_metrics.WEB_VITALS:
+            samples[("webvitals", d, metric)] = [run["web_vitals"].get(metric) for run in runs]
+        content_types = sorted({ct for run in runs for ct in run["content_types"]})
+        for ct in content_types:
+            buckets = [run["content_types"].get(ct) or {} for run in runs]
+            samples[("network", d, f"{ct} size (KB)")] = [b.get("total_size_bytes", 0) / 1024.0 for b in buckets]
+            samples[("network", d, f"{ct} duration (ms)")] = [b.get("total_duration_ms", 0.0) for b in buckets]
+
+    dirs = index.names(has="report.json", **filters)
+    lighthouse = collect_metrics_bootstrap.load_lighthouse_runs(dirs, reports_root, cache, jobs, stream, index)
+    for d, runs in lighthouse.items():
+        for metric in collect_metrics_bootstrap.audit_metrics + collect_metrics_bootstrap.category_scores:
+            samples[("lighthouse", d, metric)] = [run.get(metric) for run in runs]
+        mimes = sorted({m for run in runs for m in run.get("network_requests", {})})
+        for mime in mimes:
+            buckets = [run.get("network_requests", {}).get(mime) or {} for run in runs]
+            samples[("lighthouse-network", d, f"{mime} transfer (KB)")] = [
+                b.get("total_transfer_size", 0) / 1024.0 for b in buckets
+            ]
+            samples[("lighthouse-network", d, f"{mime} duration (ms)")] = [b.get("total_duration", 0.0) for b in buckets]
+
+    return {key: [float(v) for v in values if isinstance(v, (int, float))] for key, values in samples.items()}
+
+
+def load_budgets(path, overrides):
+    """
+    Budgets map a metric name or fnmatch pattern to the largest allowed regression:
+      {"LCP": 10, "performance_score": {"max_pct": 5}, "* duration (ms)": {"max_pct": 25, "min_abs": 20}}
+    max_pct is relative to the baseline median; min_abs ignores changes smaller than that
+    absolute amount. --budget METRIC=PCT entries override the file.
+    """
+    budgets = {}
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            budgets.update(json.load(f))
+    for entry in overrides:
+        metric, _, pct = entry.partition("=")
+        budgets[metric] = float(pct)
+    return {k: (v if isinstance(v, dict) else {"max_pct": float(v)}) for k, v in budgets.items()}
+
+
+def budget_for(metric, budgets, default_pct):
+    if metric in budgets:
+        return budgets[metric]
+    for pattern, budget in budgets.items():
+        if fnmatch.fnmatchcase(metric, pattern):
+            return budget
+    return {"max_pct": default_pct}
+
+
+def compare(baseline, candidate, budgets, default_pct=DEFAULT_THRESHOLD_PCT, alpha=DEFAULT_ALPHA,
+            min_runs=MIN_RUNS_FOR_TEST):
+    """
+    Compare baseline and candidate samples metric by metric. With at least min_runs runs
+    on both sides a change only counts when Mann-Whitney U is significant at alpha; with
+    fewer runs, or too few for any p-value to reach alpha (3 vs 3 bottoms out at 0.1),
+    the budget threshold alone decides. Returns rows ranked worst first.
+    """
+    rows = []
+    for key in sorted(set(baseline) & set(candidate)):
+        base, cand = baseline[key], candidate[key]
+        if not base or not cand:
+            continue
+        source, scenario, metric = key
+        base_med = statistics.median(base)
+        cand_med = statistics.median(cand)
+        sign = -1.0 if metric in HIGHER_IS_BETTER else 1.0
+        worse_abs = sign * (cand_med - base_med) + 0.0  # no -0.0 for unchanged scores
+        if base_med != 0:
+            worse_pct = 100.0 * worse_abs / abs(base_med)
+        else:
+            worse_pct = math.inf if worse_abs > 0 else (-math.inf if worse_abs < 0 else 0.0)
+
+        tested = (len(base) >= min_runs and len(cand) >= min_runs
+                  and mann_whitney_min_p(len(base), len(cand)) < alpha)
+        p_value = mann_whitney_u(base, cand)[1] if tested else None
+        budget = budget_for(metric, budgets, default_pct)
+        over_budget = worse_pct > budget.get("max_pct", default_pct) and worse_abs > budget.get("min_abs", 0.0)
+        rows.append({
+            "source": source,
+            "scenario": scenario,
+            "metric": metric,
+            "baseline": base_med,
+            "candidate": cand_med,
+            "worse_pct": worse_pct,
+            "p_value": p_value,
+            "runs": (len(base), len(cand)),
+            "regression": over_budget and (p_value is None or p_value < alpha),
+        })
+    rows.sort(key=lambda r: (not r["regression"], -r["worse_pct"], r["source"], r["scenario"], r["metric"]))
+    return rows
+
+
+def format_table(rows, limit=None):
+    def num(v):
+        return f"{v:.4g}" if isinstance(v, float) and math.isfinite(v) else str(v)
+
+    lines = ["Status\tSource\tScenario\tMetric\tBaseline\tCandidate\tWorse (%)\tp-value\tRuns (base/cand)"]
+    for r in rows[:limit] if limit else rows:
+        status = "REGRESSION" if r["regression"] else ("worse" if r["worse_pct"] > 0 else "ok")
+        p = "-" if r["p_value"] is None else f"{r['p_value']:.4f}"
+        pct = f"{r['worse_pct']:+.2f}" if math.isfinite(r["worse_pct"]) else ("+inf" if r["worse_pct"] > 0 else "-inf")
+        lines.append(
+            f"{status}\t{r['source']}\t{r['scenario']}\t{r['metric']}\t{num(r['baseline'])}\t"
+            f"{num(r['candidate'])}\t{pct}\t{p}\t{r['runs'][0]}/{r['runs'][1]}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare two reports trees and fail when a metric regresses beyond its budget"
+    )
+    parser.add_argument("baseline", help="baseline reports root (e.g. a copy of reports/ from main)")
+    parser.add_argument("candidate", help="candidate reports root")
+    parser.add_argument("--budgets", metavar="FILE", help="JSON file with per-metric budgets")
+    parser.add_argument("--budget", action="append", default=[], metavar="METRIC=PCT",
+                        help="allowed regression in percent for one metric or pattern (repeatable)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD_PCT,
+                        help=f"allowed regression in percent for metrics without a budget (default: {DEFAULT_THRESHOLD_PCT})")
+    parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA,
+                        help=f"significance level of the Mann-Whitney U test (default: {DEFAULT_ALPHA})")
+    parser.add_argument("--min-runs", type=int, default=MIN_RUNS_FOR_TEST,
+                        help=f"runs per side needed to use the statistical test, which is also skipped while it cannot "
+                             f"reach --alpha (default: {MIN_RUNS_FOR_TEST})")
+    parser.add_argument("--top", type=int, help="print only the N worst rows")
+    parser.add_argument("--output", metavar="FILE", help="also write the full ranked table as TSV")
+    parser.add_argument("--stream", action="store_true", help="use the streaming report.json parser")
+    add_scenario_arguments(parser)
+    add_jobs_argument(parser)
+    add_cache_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Exit status: 0 = within budget, 1 = at least one regression, 2 = usage error."""
+    args = parse_args(argv)
+    budgets = load_budgets(args.budgets, args.budget)
+    cache = open_cache(args, args.baseline)
+    try:
+        filters = scenario_filters(args)
+        baseline = collect_samples(args.baseline, cache, args.jobs, args.stream, filters)
+        candidate = collect_samples(args.candidate, cache, args.jobs, args.stream, filters)
+    finally:
+        if cache is not None:
+            cache.close()
+    report_cache_stats(cache)
+
+    rows = compare(baseline, candidate, budgets, args.threshold, args.alpha, args.min_runs)
+    if not rows:
+        print("No metrics present in both baseline and candidate.")
+        return 2
+    print(format_table(rows, args.top))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(format_table(rows) + "\n")
+        print(f"Saved comparison table -> {args.output}")
+
+    regressions = sum(r["regression"] for r in rows)
+    print(f"\n{regressions} regression(s) over budget out of {len(rows)} compared metrics")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+import argparse
+import fnmatch
+import gzip
+import hashlib
+import io
+import os
+
+# Compression suffixes understood by open_text(); zstd needs the optional zstandard package.
+GZIP_SUFFIX = ".gz"
+ZSTD_SUFFIX = ".zst"
+SUFFIXES = (GZIP_SUFFIX, ZSTD_SUFFIX)
+
+# What archive_tree() compresses by default: the report files, not screenshots (already compressed).
+ARCHIVE_PATTERNS = ("*.json", "*.html", "*.har", "*.ndjson", "*.csv")
+COPY_CHUNK = 1 << 20
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("reading or writing .zst files needs the zstandard package (pip install zstandard)") from None
+    return zstandard
+
+
+def strip_suffix(path):
+    """path without a compression suffix: reports/x/requests.ndjson.gz -> reports/x/requests.ndjson."""
+    for suffix in SUFFIXES:
+        if path.endswith(suffix):
+            return path[:-len(suffix)]
+    return path
+
+
+def with_suffixes(filename):
+    """filename followed by its compressed variants, in lookup order."""
+    return (filename,) + tuple(filename + suffix for suffix in SUFFIXES)
+
+
+def existing(path):
+    """path if it is a file, else its first compressed variant that is, else None."""
+    for candidate in with_suffixes(path):
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def open_binary(path, mode="r", level=None):
+    """
+    Open a file for streaming binary reads ("r") or writes ("w"), decompressing or compressing
+    by suffix. json.load() accepts the binary stream directly, which skips the text layer.
+    """
+    if mode not in ("r", "w"):
+        raise ValueError(f"unsupported mode {mode!r}")
+    if path.endswith(GZIP_SUFFIX):
+        return gzip.open(path, mode + "b", compresslevel=level or 6)
+    if path.endswith(ZSTD_SUFFIX):
+        zstandard = _zstandard()
+        raw = open(path, mode + "b")
+        try:
+            if mode == "r":
+                return zstandard.ZstdDecompressor().stream_reader(raw)
+            return zstandard.ZstdCompressor(level=level or 3).stream_writer(raw)
+        except Exception:
+            raw.close()
+            raise
+    return open(path, mode + "b")
+
+
+def open_text(path, mode="r", level=None, encoding="utf-8"):
+    """
+    Open a text file for streaming reads ("r") or writes ("w"), decompressing or compressing
+    by suffix: .gz via gzip, .zst via zstandard, anything else as plain text.
+    """
+    if mode not in ("r", "w"):
+        raise ValueError(f"unsupported mode {mode!r}")
+    if path.endswith(GZIP_SUFFIX):
+        return gzip.open(path, mode + "t", encoding=encoding, compresslevel=level or 6)
+    if path.endswith(ZSTD_SUFFIX):
+        return io.TextIOWrapper(open_binary(path, mode, level), encoding=encoding)
+    return open(path, mode, encoding=encoding)
+
+
+def _digest_of(stream):
+    h = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(COPY_CHUNK), b""):
+        h.update(chunk)
+    return h.hexdigest()
+
+
+def compress_file(path, suffix=GZIP_SUFFIX, level=None, keep=False):
+    """
+    Write path + suffix next to path, keeping its mtime, and remove path unless keep is set.
+    The original is only removed after the compressed copy has been read back and matched
+    its sha256. Returns (original bytes, compressed bytes).
+    """
+    out = path + suffix
+    tmp = f"{path}.tmp{os.getpid()}{suffix}"  # the suffix selects the compressor
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as src, open_binary(tmp, "w", level) as dst:
+            for chunk in iter(lambda: src.read(COPY_CHUNK), b""):
+                h.update(chunk)
+                dst.write(chunk)
+        with open_binary(tmp) as check:
+            if _digest_of(check) != h.hexdigest():
+                raise OSError(f"{tmp} does not decompress to {path}")
+        st = os.stat(path)
+        os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+        os.replace(tmp, out)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    if not keep:
+        os.remove(path)
+    return st.st_size, os.path.getsize(out)
+
+
+class _Compress:
+    # Picklable job for parallel.map_ordered: (path) -> ((before, after), error).
+    def __init__(self, suffix, level, keep):
+        self.suffix, self.level, self.keep = suffix, level, keep
+
+    def __call__(self, path):
+        try:
+            return compress_file(path, self.suffix, self.level, self.keep), None
+        except Exception as e:
+            return None, e
+
+
+def archive_candidates(reports_root, patterns=ARCHIVE_PATTERNS, min_size=0):
+    """Uncompressed files under reports_root matching patterns, sorted; files already archived are skipped."""
+    found = []
+    for dirpath, _dirnames, filenames in os.walk(reports_root):
+        names = set(filenames)
+        for name in filenames:
+            if name.endswith(SUFFIXES) or ".tmp" in name or not any(fnmatch.fnmatch(name, p) for p in patterns):
+                continue
+            if any(name + suffix in names for suffix in SUFFIXES):
+                continue  # an earlier, interrupted --keep run; leave the pair alone
+            path = os.path.join(dirpath, name)
+            if os.path.getsize(path) >= min_size:
+                found.append(path)
+    return sorted(found)
+
+
+def archive_tree(reports_root, suffix=GZIP_SUFFIX, level=None, keep=False, patterns=ARCHIVE_PATTERNS, min_size=0,
+                 jobs=1):
+    """Compress every archive_candidates() file; returns (files, bytes before, bytes after, errors)."""
+    from parallel import map_ordered
+
+    paths = archive_candidates(reports_root, patterns, min_size)
+    before = after = errors = 0
+    for path, (sizes, error) in zip(paths, map_ordered(_Compress(suffix, level, keep), paths, jobs)):
+        if error is not None:
+            errors += 1
+            print(f"[ERR ] compressing {path} failed: {error}")
+            continue
+        before += sizes[0]
+        after += sizes[1]
+    return len(paths) - errors, before, after, errors
+
+
+def main(argv=None):
+    from parallel import add_jobs_argument
+
+    parser = argparse.ArgumentParser(
+        description="Compress a reports tree in place (report.json -> report.json.gz, ...); the collect_metrics* "
+                    "scripts read the compressed files transparently")
+    parser.add_argument("--reports", default="reports", help="reports root directory (default: reports)")
+    parser.add_argument("--format", choices=("gzip", "zstd"), default="gzip",
+                        help="gzip (default, standard library) or zstd (needs zstandard; faster to read)")
+    parser.add_argument("--level", type=int, help="compression level (default: 6 for gzip, 3 for zstd)")
+    parser.add_argument("--pattern", action="append", metavar="GLOB",
+                        help=f"file names to compress (repeatable; default: {' '.join(ARCHIVE_PATTERNS)})")
+    parser.add_argument("--min-size", type=int, default=4096, metavar="BYTES",
+                        help="leave smaller files uncompressed (default: 4096)")
+    parser.add_argument("--keep", action="store_true", help="keep the uncompressed originals")
+    parser.add_argument("--dry-run", action="store_true", help="only list the files that would be compressed")
+    add_jobs_argument(parser)
+    args = parser.parse_args(argv)
+
+    patterns = tuple(args.pattern or ARCHIVE_PATTERNS)
+    if args.dry_run:
+        paths = archive_candidates(args.reports, patterns, args.min_size)
+        for path in paths:
+            print(path)
+        print(f"{len(paths)} file(s), {sum(map(os.path.getsize, paths)) / 1e6:.1f} MB")
+        return 0
+    suffix = GZIP_SUFFIX if args.format == "gzip" else ZSTD_SUFFIX
+    if suffix == ZSTD_SUFFIX:
+        _zstandard()
+    files, before, after, errors = archive_tree(args.reports, suffix, args.level, args.keep, patterns, args.min_size,
+                                                args.jobs)
+    ratio = f"{after / before:.1%}" if before else "-"
+    print(f"Compressed {files} file(s): {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB ({ratio})")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,179 @@
+import argparse
+import math
+import re
+from collections import OrderedDict
+from functools import lru_cache
+
+from sketches import sketch_of
+
+# Path segments that identify a resource rather than a route. Checked per segment, in order.
+_SEGMENT_PATTERNS = [
+    (re.compile(r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$"), "{guid}"),
+    (re.compile(r"^\d+$"), "{id}"),
+    (re.compile(r"^[0-9a-fA-F]{24,}$"), "{hex}"),
+]
+# Cheap pre-check so plain route words ("api", "members") skip the pattern list.
+_MAY_BE_ID = re.compile(r"[\d-]")
+
+TEMPLATE_CACHE_SIZE = 1 << 16
+
+
+def _segment_template(segment):
+    if not _MAY_BE_ID.search(segment):
+        return segment
+    for pattern, placeholder in _SEGMENT_PATTERNS:
+        if pattern.match(segment):
+            return placeholder
+    return segment
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def url_template(url):
+    """
+    Route template of a request URL: the path with GUIDs, numeric IDs and long hex tokens
+    replaced by {guid}/{id}/{hex}; scheme, host and query string are dropped.
+      http://localhost:7004/api/v1/group/9cc3...0f01/members -> /api/v1/group/{guid}/members
+    Cached, since a request log repeats the same URLs many times.
+    """
+    if url.startswith("data:"):
+        return url.split(",", 1)[0].split(";", 1)[0]  # data:image/png, not the payload
+    if url.startswith("blob:"):
+        return "blob:"
+    start = url.find("://")
+    if start >= 0:
+        start = url.find("/", start + 3)
+        url = url[start:] if start >= 0 else "/"
+    end = len(url)
+    for sep in "?#":
+        i = url.find(sep, 0, end)
+        if i >= 0:
+            end = i
+    return "/".join(map(_segment_template, url[:end].split("/"))) or "/"
+
+
+def percentile(sorted_values, q):
+    """q-th percentile (0-100) of an ascending list, linear interpolation (numpy's default)."""
+    if not sorted_values:
+        return math.nan
+    pos = (len(sorted_values) - 1) * q / 100.0
+    lo = math.floor(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def endpoint_stats(columns_list):
+    """
+    Per-(method, template) latency and size statistics over the request columns of one or
+    more runs (collect_metrics.request_columns output):
+      OrderedDict[(method, template)] -> {count, p50_ms, p90_ms, p95_ms, p99_ms, max_ms, total_bytes,
+                                          avg_bytes, duration_sketch}
+    Requests without a known duration count and add bytes but are left out of the
+    duration percentiles. The percentiles are exact; duration_sketch (sketches.LogHistogram)
+    lets buckets be merged across runs and scenarios. Ordered by p95 duration, slowest first.
+    """
+    durations, counts, sizes = {}, {}, {}
+    for columns in columns_list:
+        for method, url, duration, size in zip(
+            columns["method"], columns["url"], columns["duration"], columns["size"]
+        ):
+            key = (method or "GET", url_template(url or ""))
+            counts[key] = counts.get(key, 0) + 1
+            sizes[key] = sizes.get(key, 0) + (size or 0)
+            bucket = durations.setdefault(key, [])
+            if duration is not None and not math.isnan(duration):
+                bucket.append(duration)
+
+    stats = {}
+    for key, values in durations.items():
+        values.sort()
+        stats[key] = {
+            "count": counts[key],
+            "p50_ms": percentile(values, 50),
+            "p90_ms": percentile(values, 90),
+            "p95_ms": percentile(values, 95),
+            "p99_ms": percentile(values, 99),
+            "max_ms": values[-1] if values else math.nan,
+            "total_bytes": sizes[key],
+            "avg_bytes": sizes[key] / counts[key],
+            "duration_sketch": sketch_of(values),
+        }
+
+    def rank(item):
+        p95 = item[1]["p95_ms"]
+        return (math.isnan(p95), -p95 if not math.isnan(p95) else 0.0, item[0])
+
+    return OrderedDict(sorted(stats.items(), key=rank))
+
+
+def endpoint_index(scenarios):
+    """dict[scenario] -> endpoint_stats() over all runs of the scenario (collect_metrics.load_scenarios output)."""
+    return OrderedDict(
+        (d, endpoint_stats([run["network_requests"] for run in runs])) for d, runs in scenarios.items()
+    )
+
+
+def _fmt(v):
+    return "-" if isinstance(v, float) and math.isnan(v) else round(v, 2)
+
+
+def write_endpoints_table(index, output_path="network-endpoints.txt"):
+    lines = ["# Network requests by endpoint (method + route template)"]
+    lines.append("Folder\tMethod\tTemplate\tCount\tp50 Duration (ms)\tp90 Duration (ms)\tp95 Duration (ms)"
+                 "\tp99 Duration (ms)\tMax Duration (ms)\tTotal Size (KB)\tAvg Size (KB)")
+    for folder, by_endpoint in index.items():
+        for (method, template), s in by_endpoint.items():
+            lines.append(
+                f"{folder}\t{method}\t{template}\t{s['count']}\t{_fmt(s['p50_ms'])}\t{_fmt(s['p90_ms'])}"
+                f"\t{_fmt(s['p95_ms'])}\t{_fmt(s['p99_ms'])}\t{_fmt(s['max_ms'])}"
+                f"\t{round(s['total_bytes'] / 1024.0, 2)}\t{round(s['avg_bytes'] / 1024.0, 2)}"
+            )
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    print(f"Saved endpoints table -> {output_path}")
+
+
+def print_endpoints(index, top=10, api_only=False):
+    header = f"{'Method':7} {'Template':60} {'Count':>6} {'p50(ms)':>9} {'p95(ms)':>9} {'Max(ms)':>9} {'KB':>9}"
+    for folder, by_endpoint in index.items():
+        rows = [(k, s) for k, s in by_endpoint.items() if not api_only or "/api/" in k[1]]
+        if not rows:
+            continue
+        print(f"\n{folder}")
+        print(header)
+        print("-" * len(header))
+        for (method, template), s in rows[:top] if top else rows:
+            print(f"{method:7} {template[:60]:60} {s['count']:>6} {_fmt(s['p50_ms']):>9} {_fmt(s['p95_ms']):>9} "
+                  f"{_fmt(s['max_ms']):>9} {round(s['total_bytes'] / 1024.0, 2):>9}")
+
+
+def main(argv=None):
+    from collect_metrics import load_scenarios
+    from report_cache import add_cache_arguments, open_cache, report_cache_stats
+    from scenario_index import add_scenario_arguments, discover, scenario_filters
+
+    parser = argparse.ArgumentParser(description="Latency and size per API endpoint (method + route template)")
+    parser.add_argument("--reports", default="reports", help="reports root directory (default: reports)")
+    parser.add_argument("--top", type=int, default=10, help="endpoints per scenario, slowest p95 first (0 = all)")
+    parser.add_argument("--api", action="store_true", help="only URLs containing /api/")
+    parser.add_argument("--output", metavar="FILE", help="also write the full index as TSV")
+    add_scenario_arguments(parser)
+    add_cache_arguments(parser)
+    args = parser.parse_args(argv)
+
+    index, dirs = discover(args.reports, "metrics.json", scenario_filters(args))
+    cache = open_cache(args, args.reports)
+    try:
+        scenarios = load_scenarios(dirs, args.reports, cache=cache, index=index)
+    finally:
+        if cache is not None:
+            cache.close()
+    report_cache_stats(cache)
+
+    endpoints = endpoint_index(scenarios)
+    print_endpoints(endpoints, args.top, args.api)
+    if args.output:
+        write_endpoints_table(endpoints, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+import argparse
+import json
+import os
+import shutil
+from collections import OrderedDict, namedtuple
+
+from columnar import factorize
+from scenario_index import add_scenario_arguments, discover, scenario_filters
+
+EXPORT_VERSION = 1
+FORMATS = ("npy", "npz", "parquet", "arrow")
+SCHEMA_FILENAME = "schema.json"
+
+# Low-cardinality / repeated string column stored as int32 codes into a values array.
+DictColumn = namedtuple("DictColumn", ["codes", "values"])
+
+
+def dict_column(strings):
+    import numpy as np
+
+    codes, values = factorize(strings)
+    return DictColumn(np.asarray(codes, dtype=np.int32), np.array(values, dtype=object))
+
+
+def _pack_strings(values):
+    # Variable-length strings as one UTF-8 buffer plus end offsets (the Arrow layout); a
+    # fixed-width numpy string array would pad every URL to the longest one.
+    import numpy as np
+
+    encoded = [v.encode("utf-8") for v in values]
+    offsets = np.cumsum([len(b) for b in encoded], dtype=np.int64)
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _unpack_strings(data, offsets):
+    import numpy as np
+
+    raw = bytes(data)
+    starts = [0] + offsets[:-1].tolist()
+    return np.array([raw[a:b].decode("utf-8") for a, b in zip(starts, offsets.tolist())], dtype=object)
+
+
+def decode(column):
+    """Plain array of a column; DictColumns are expanded to their string values."""
+    if isinstance(column, DictColumn):
+        return column.values[column.codes]
+    return column
+
+
+def row_count(columns):
+    first = next(iter(columns.values()), None)
+    if first is None:
+        return 0
+    return len(first.codes if isinstance(first, DictColumn) else first)
+
+
+def _column(values, dtype):
+    import numpy as np
+
+    return np.asarray(values, dtype=dtype)
+
+
+def build_tables(scenarios, lighthouse_runs, index):
+    """
+    The normalized dataset as OrderedDict[table] -> OrderedDict[column] -> numpy array or
+    DictColumn. Every row table references scenarios.scenario_id and a run number (position
+    among the scenario's readable runs).
+      scenarios           one row per scenario folder
+      web_vitals          one row per metrics.json run
+      requests            one row per network request of a metrics.json run
+      audits              one row per report.json run, one column per registered audit (s, CLS unitless, KB)
+      category_scores     one row per report.json run, scores 0-100
+      lighthouse_network  one row per (report.json run, mime type) network aggregate
+    """
+    import numpy as np
+
+    from collect_metrics import WEB_VITALS
+    from collect_metrics_bootstrap import audit_metrics, category_scores
+    from endpoints import url_template
+
+    names = sorted(set(scenarios) | set(lighthouse_runs))
+    scenario_id = {name: i for i, name in enumerate(names)}
+    parsed = [index.get(name) for name in names]
+    tables = OrderedDict()
+    tables["scenarios"] = OrderedDict([
+        ("scenario_id", _column(range(len(names)), np.int32)),
+        ("name", dict_column(names)),
+        ("framework", dict_column([s.framework for s in parsed])),
+        ("device", dict_column([s.device for s in parsed])),
+        ("page", dict_column([s.page for s in parsed])),
+        ("metrics_runs", _column([len(scenarios.get(n, ())) for n in names], np.int32)),
+        ("lighthouse_runs", _column([len(lighthouse_runs.get(n, ())) for n in names], np.int32)),
+    ])
+
+    ids, runs, n_requests, vitals = [], [], [], {m: [] for m in WEB_VITALS}
+    for name, records in scenarios.items():
+        for run, record in enumerate(records):
+            ids.append(scenario_id[name])
+            runs.append(run)
+            n_requests.append(len(record["network_requests"]["url"]))
+            for m in WEB_VITALS:
+                vitals[m].append(record["web_vitals"].get(m))
+    ids, runs = _column(ids, np.int32), _column(runs, np.int16)
+    tables["web_vitals"] = OrderedDict(
+        [("scenario_id", ids), ("run", runs)]
+        + [(m, _column([np.nan if v is None else v for v in vitals[m]], np.float64)) for m in WEB_VITALS]
+    )
+
+    columns = [run["network_requests"] for records in scenarios.values() for run in records]
+
+    def concat(key, dtype):
+        return np.concatenate([np.asarray(c[key], dtype=dtype) for c in columns]) if columns else np.zeros(0, dtype)
+
+    urls = [u for c in columns for u in c["url"]]
+    tables["requests"] = OrderedDict([
+        ("scenario_id", np.repeat(ids, n_requests)),
+        ("run", np.repeat(runs, n_requests)),
+        ("method", dict_column([m for c in columns for m in c["method"]])),
+        ("url", dict_column(urls)),
+        ("url_template", dict_column([url_template(u or "") for u in urls])),
+        ("content_type", dict_column([ct for c in columns for ct in c["content_type"]])),
+        ("start_ms", concat("start", np.float64)),
+        ("end_ms", concat("end", np.float64)),
+        ("duration_ms", concat("duration", np.float64)),
+        ("size_bytes", concat("size", np.int64)),
+    ])
+
+    lh_ids, lh_runs, values = [], [], {k: [] for k in audit_metrics + category_scores}
+    net = {"scenario_id": [], "run": [], "mime_type": [], "count": [], "transfer_bytes": [], "duration_ms": []}
+    for name, records in lighthouse_runs.items():
+        for run, metrics in enumerate(records):
+            lh_ids.append(scenario_id[name])
+            lh_runs.append(run)
+            for k in values:
+                v = metrics.get(k)
+                values[k].append(np.nan if v is None else v)
+            for mime, agg in (metrics.get("network_requests") or {}).items():
+                net["scenario_id"].append(scenario_id[name])
+                net["run"].append(run)
+                net["mime_type"].append(mime)
+                net["count"].append(agg["count"])
+                net["transfer_bytes"].append(agg["total_transfer_size"])
+                net["duration_ms"].append(agg["total_duration"])
+
+    def keyed(keys):
+        return OrderedDict(
+            [("scenario_id", _column(lh_ids, np.int32)), ("run", _column(lh_runs, np.int16))]
+            + [(k.replace("-", "_"), _column(values[k], np.float64)) for k in keys]
+        )
+
+    tables["audits"] = keyed(audit_metrics)
+    tables["category_scores"] = keyed(category_scores)
+    tables["lighthouse_network"] = OrderedDict([
+        ("scenario_id", _column(net["scenario_id"], np.int32)),
+        ("run", _column(net["run"], np.int16)),
+        ("mime_type", dict_column(net["mime_type"])),
+        ("count", _column(net["count"], np.int64)),
+        ("transfer_bytes", _column(net["transfer_bytes"], np.float64)),
+        ("duration_ms", _column(net["duration_ms"], np.float64)),
+    ])
+    return tables
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("parquet/arrow export needs the pyarrow package (pip install pyarrow); "
+                          "--format npy or npz works with numpy alone") from None
+    return pyarrow
+
+
+def _arrow_table(pa, columns):
+    arrays = [
+        pa.DictionaryArray.from_arrays(pa.array(c.codes), pa.array(c.values.tolist(), pa.string()))
+        if isinstance(c, DictColumn) else pa.array(c)
+        for c in columns.values()
+    ]
+    return pa.Table.from_arrays(arrays, names=list(columns))
+
+
+def _schema(tables, fmt):
+    return {
+        "version": EXPORT_VERSION,
+        "format": fmt,
+        "tables": {
+            name: {
+                "rows": row_count(cols),
+                "columns": {
+                    col: {"dtype": "string", "dictionary": True} if isinstance(c, DictColumn)
+                    else {"dtype": str(c.dtype), "dictionary": False}
+                    for col, c in cols.items()
+                },
+            }
+            for name, cols in tables.items()
+        },
+    }
+
+
+def write_tables(tables, out_dir, fmt="npy", compress=False):
+    """
+    Write every table under out_dir plus schema.json:
+      npy      <table>/<column>.npy; dictionary columns as <column>.codes.npy plus their distinct
+               strings in <column>.utf8.npy / <column>.offsets.npy. Plain arrays, so
+               np.load(..., mmap_mode="r") maps them without reading
+      npz      <table>.npz with the same member names (compress=True deflates them)
+      parquet  <table>.parquet, dictionary columns as Arrow dictionaries (needs pyarrow)
+      arrow    <table>.arrow, Arrow IPC / Feather v2, memory-mappable (needs pyarrow)
+    out_dir is replaced as a whole.
+    """
+    import numpy as np
+
+    pa = _pyarrow() if fmt in ("parquet", "arrow") else None
+    tmp = out_dir.rstrip(os.sep) + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for name, columns in tables.items():
+        members = OrderedDict()
+        for col, c in columns.items():
+            if isinstance(c, DictColumn):
+                members[f"{col}.codes"] = c.codes
+                members[f"{col}.utf8"], members[f"{col}.offsets"] = _pack_strings(c.values)
+            else:
+                members[col] = c
+        if fmt == "npy":
+            os.makedirs(os.path.join(tmp, name))
+            for member, array in members.items():
+                np.save(os.path.join(tmp, name, f"{member}.npy"), array)
+        elif fmt == "npz":
+            (np.savez_compressed if compress else np.savez)(os.path.join(tmp, f"{name}.npz"), **members)
+        elif fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            pq.write_table(_arrow_table(pa, columns), os.path.join(tmp, f"{name}.parquet"),
+                           compression="zstd" if compress else "none")
+        else:
+            import pyarrow.feather as feather
+
+            feather.write_feather(_arrow_table(pa, columns), os.path.join(tmp, f"{name}.arrow"),
+                                  compression="zstd" if compress else "uncompressed")
+    with open(os.path.join(tmp, SCHEMA_FILENAME), "w", encoding="utf-8") as f:
+        json.dump(_schema(tables, fmt), f, indent=2)
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp, out_dir)
+
+
+def load_table(out_dir, table, columns=None, mmap_mode="r"):
+    """
+    Read one table of an npy or npz export: OrderedDict[column] -> array or DictColumn,
+    limited to `columns` when given. npy columns are memory-mapped (mmap_mode=None reads
+    them into memory instead); only the distinct strings of dictionary columns are decoded.
+    """
+    import numpy as np
+
+    with open(os.path.join(out_dir, SCHEMA_FILENAME), "r", encoding="utf-8") as f:
+        schema = json.load(f)
+    fmt = schema["format"]
+    if fmt == "npy":
+        def member(name):
+            return np.load(os.path.join(out_dir, table, f"{name}.npy"), mmap_mode=mmap_mode)
+    elif fmt == "npz":
+        archive = np.load(os.path.join(out_dir, f"{table}.npz"))
+
+        def member(name):
+            return archive[name]
+    else:
+        raise ValueError(f"{fmt} exports are read with pyarrow (pyarrow.parquet.read_table / pyarrow.feather)")
+
+    loaded = OrderedDict()
+    for col, spec in schema["tables"][table]["columns"].items():
+        if columns is not None and col not in columns:
+            continue
+        if spec["dictionary"]:
+            loaded[col] = DictColumn(member(f"{col}.codes"),
+                                     _unpack_strings(member(f"{col}.utf8"), member(f"{col}.offsets")))
+        else:
+            loaded[col] = member(col)
+    return loaded
+
+
+def main(argv=None):
+    from collect_metrics import load_scenarios
+    from collect_metrics_bootstrap import load_lighthouse_runs
+    from parallel import add_jobs_argument
+    from report_cache import add_cache_arguments, open_cache, report_cache_stats
+
+    parser = argparse.ArgumentParser(
+        description="Export scenarios, web vitals, network requests, Lighthouse audits and category scores "
+                    "as typed columnar files"
+    )
+    parser.add_argument("--reports", default="reports", help="reports root directory (default: reports)")
+    parser.add_argument("--output", default="dataset", help="output directory, replaced as a whole (default: dataset)")
+    parser.add_argument("--format", choices=FORMATS, default="npy",
+                        help="npy: memory-mappable .npy per column (default); npz: one archive per table; "
+                             "parquet / arrow: need pyarrow")
+    parser.add_argument("--compress", action="store_true", help="compress npz/parquet/arrow output")
+    add_scenario_arguments(parser)
+    add_jobs_argument(parser)
+    add_cache_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if args.format in ("parquet", "arrow"):
+        _pyarrow()  # fail before any parsing
+    filters = scenario_filters(args)
+    index, metric_dirs = discover(args.reports, "metrics.json", filters)
+    lighthouse_dirs = index.names(has="report.json", **filters)
+    cache = open_cache(args, args.reports)
+    try:
+        scenarios = load_scenarios(metric_dirs, args.reports, cache=cache, jobs=args.jobs, index=index)
+        lighthouse_runs = load_lighthouse_runs(lighthouse_dirs, args.reports, cache, args.jobs, index=index)
+    finally:
+        if cache is not None:
+            cache.close()
+    report_cache_stats(cache)
+
+    tables = build_tables(scenarios, lighthouse_runs, index)
+    write_tables(tables, args.output, args.format, args.compress)
+    sizes = ", ".join(f"{name} {row_count(cols)}" for name, cols in tables.items())
+    print(f"Saved {args.format} dataset ({sizes} rows) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
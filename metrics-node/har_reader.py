@@ -0,0 +1,207 @@
+import argparse
+import math
+import os
+from collections import OrderedDict
+from datetime import datetime
+
+from compressed import open_text
+from json_stream import CHUNK_SIZE, JsonScanner, select
+
+# A scenario's HAR capture: reports/<scenario>/network.har or reports/<scenario>/run-XXX/network.har.
+HAR_FILENAME = "network.har"
+
+# The parts of a HAR entry the aggregates use. Response bodies (content.text), headers,
+# cookies and initiator stacks are skipped without being decoded.
+ENTRY_SELECTION = {
+    "startedDateTime": True,
+    "time": True,
+    "timings": True,
+    "_transferSize": True,
+    "request": {"method": True, "url": True},
+    "response": {
+        "_transferSize": True,
+        "headersSize": True,
+        "bodySize": True,
+        "content": {"mimeType": True, "size": True},
+    },
+}
+
+
+def _epoch_ms(started):
+    if not started:
+        return math.nan
+    if started.endswith("Z"):
+        started = started[:-1] + "+00:00"
+    try:
+        return datetime.fromisoformat(started).timestamp() * 1000.0
+    except ValueError:
+        return math.nan
+
+
+def _number(v):
+    return v if isinstance(v, (int, float)) and not isinstance(v, bool) else None
+
+
+def _duration(entry):
+    total = _number(entry.get("time"))
+    if total is not None and total >= 0:
+        return total
+    # Phases that do not apply are -1 in HAR.
+    phases = [_number(v) for v in (entry.get("timings") or {}).values()]
+    phases = [v for v in phases if v is not None and v > 0]
+    return sum(phases) if phases else None
+
+
+def _transfer_size(entry):
+    response = entry.get("response", {})
+    for size in (response.get("_transferSize"), entry.get("_transferSize")):
+        size = _number(size)
+        if size is not None and size >= 0:
+            return int(size)
+    headers, body = _number(response.get("headersSize")), _number(response.get("bodySize"))
+    return int(max(headers or 0, 0) + max(body or 0, 0))
+
+
+def har_request(entry):
+    """One selected HAR entry as a metrics.json networkRequests item (main.js field names)."""
+    request = entry.get("request", {})
+    start = _epoch_ms(entry.get("startedDateTime"))
+    duration = _duration(entry)
+    return {
+        "url": request.get("url", ""),
+        "method": request.get("method", ""),
+        "startTime": None if math.isnan(start) else start,
+        "endTime": None if math.isnan(start) or duration is None else start + duration,
+        "duration": duration,
+        "contentType": entry.get("response", {}).get("content", {}).get("mimeType") or "",
+        "size": _transfer_size(entry),
+    }
+
+
+def iter_har_entries(stream, chunk_size=CHUNK_SIZE):
+    """
+    Yield the entries of a HAR document (log.entries[]) one at a time, reduced to
+    ENTRY_SELECTION. The document is scanned once; memory stays at one read chunk plus
+    the current entry's selected fields, whatever the size of the response bodies.
+    """
+    scanner = JsonScanner(stream, chunk_size)
+    for key in scanner.iter_object():
+        if key != "log" or scanner.peek() != "{":
+            scanner.skip_value()
+            continue
+        for log_key in scanner.iter_object():
+            if log_key != "entries" or scanner.peek() != "[":
+                scanner.skip_value()
+                continue
+            for _ in scanner.iter_array():
+                if scanner.peek() == "{":
+                    yield select(scanner, ENTRY_SELECTION)
+                else:
+                    scanner.skip_value()
+
+
+def read_har_requests(path, chunk_size=CHUNK_SIZE):
+    """Every entry of a .har file as a networkRequests item, in file order."""
+    with open_text(path, encoding="utf-8-sig") as f:
+        return [har_request(entry) for entry in iter_har_entries(f, chunk_size)]
+
+
+def load_har(path):
+    """
+    A HAR capture as a collect_metrics scenario record. HAR has no Web Vitals, so those are
+    None; network_requests and content_types have the same shape as for metrics.json, so
+    the content-type, endpoint and timeline aggregates work on it unchanged.
+    """
+    from collect_metrics import WEB_VITALS, aggregate_by_content_type, request_columns
+
+    requests = request_columns(read_har_requests(path))
+    return {
+        "web_vitals": {metric: None for metric in WEB_VITALS},
+        "network_requests": requests,
+        "content_types": aggregate_by_content_type(requests),
+    }
+
+
+def load_har_scenarios(dirs, reports_root="reports", cache=None, jobs=1, index=None):
+    """load_scenarios() for network.har captures: OrderedDict[dir] -> [run record, ...]."""
+    from parallel import ingest
+    from run_stats import run_paths
+
+    if index is not None:
+        run_files = {d: index.run_files(d, HAR_FILENAME) for d in dirs}
+    else:
+        run_files = {d: run_paths(reports_root, d, HAR_FILENAME) for d in dirs}
+    all_paths = [path for d in dirs for path in run_files[d]]
+    loaded = dict(zip(all_paths, ingest(all_paths, load_har, "har", cache, jobs)))
+
+    scenarios = OrderedDict()
+    for d in dirs:
+        runs = []
+        for path in run_files[d]:
+            record, error = loaded[path]
+            if error is not None:
+                print(f"[ERR ] failed reading {path}: {error}")
+                continue
+            runs.append(record)
+        if runs:
+            scenarios[d] = runs
+    return scenarios
+
+
+def read_har_aggregates(dirs, reports_root="reports"):
+    """read_network_aggregates() with network.har as the source."""
+    from collect_metrics import aggregate_network_requests
+
+    return aggregate_network_requests(load_har_scenarios(dirs, reports_root))
+
+
+def main(argv=None):
+    from collect_metrics import aggregate_network_requests, write_aggregates_table
+    from endpoints import endpoint_index, print_endpoints, write_endpoints_table
+    from report_cache import add_cache_arguments, open_cache, report_cache_stats
+    from scenario_index import add_scenario_arguments, discover, scenario_filters
+
+    parser = argparse.ArgumentParser(
+        description="Content-type and endpoint aggregates from HAR captures (DevTools / proxy exports)"
+    )
+    parser.add_argument("files", nargs="*", metavar="HAR",
+                        help=f"HAR files to read, one scenario each (named after the file); "
+                             f"default: every reports/<scenario>/{HAR_FILENAME}")
+    parser.add_argument("--reports", default="reports", help="reports root directory (default: reports)")
+    parser.add_argument("--output", default="network-aggregates-har.txt",
+                        help="content-type aggregates TSV (default: network-aggregates-har.txt)")
+    parser.add_argument("--endpoints", metavar="FILE", help="also write the per-endpoint TSV")
+    parser.add_argument("--top", type=int, default=10, help="endpoints printed per scenario (0 = all)")
+    add_scenario_arguments(parser)
+    add_cache_arguments(parser)
+    args = parser.parse_args(argv)
+
+    cache = open_cache(args, args.reports)
+    try:
+        if args.files:
+            scenarios = OrderedDict()
+            for path in args.files:
+                try:
+                    scenarios[os.path.splitext(os.path.basename(path))[0]] = [load_har(path)]
+                except (OSError, ValueError) as e:
+                    print(f"[ERR ] failed reading {path}: {e}")
+        else:
+            index, dirs = discover(args.reports, HAR_FILENAME, scenario_filters(args))
+            scenarios = load_har_scenarios(dirs, args.reports, cache=cache, index=index)
+    finally:
+        if cache is not None:
+            cache.close()
+    report_cache_stats(cache)
+    if not scenarios:
+        print("No HAR captures found.")
+        return
+
+    write_aggregates_table(aggregate_network_requests(scenarios), output_path=args.output)
+    endpoints = endpoint_index(scenarios)
+    print_endpoints(endpoints, args.top)
+    if args.endpoints:
+        write_endpoints_table(endpoints, args.endpoints)
+
+
+if __name__ == "__main__":
+    main()
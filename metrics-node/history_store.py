@@ -0,0 +1,382 @@
+import argparse
+import math
+import os
+import sqlite3
+import subprocess
+import time
+from datetime import datetime, timezone
+
+from profiling import stage
+
+HISTORY_FILENAME = "metrics-history.sqlite"
+
+# The history is never rewritten, so unlike the extraction cache a newer schema is an
+# error rather than a reason to start over.
+HISTORY_VERSION = 1
+
+# Sources as named by compare_metrics: metrics.json web vitals and Lighthouse report.json values.
+WEBVITALS_SOURCE = "webvitals"
+LIGHTHOUSE_SOURCE = "lighthouse"
+
+DEFAULT_LAST = 30
+DEFAULT_TREND_METRICS = ("LCP",)
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS runs ("
+    " id INTEGER PRIMARY KEY,"
+    " recorded_at REAL NOT NULL,"  # unix seconds
+    " git_revision TEXT,"
+    " source TEXT NOT NULL,"
+    " reports_root TEXT,"
+    " samples INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS samples ("
+    " run_id INTEGER NOT NULL REFERENCES runs (id),"
+    " scenario TEXT NOT NULL,"
+    " metric TEXT NOT NULL,"
+    " value REAL NOT NULL,"
+    " n INTEGER NOT NULL)",  # report runs the value was reduced from (median when > 1)
+    # Trend queries select one metric, optionally some scenarios, over the newest runs.
+    "CREATE INDEX IF NOT EXISTS samples_metric ON samples (metric, scenario, run_id)",
+    "CREATE INDEX IF NOT EXISTS samples_scenario ON samples (scenario, run_id)",
+    "CREATE INDEX IF NOT EXISTS runs_source ON runs (source, recorded_at)",
+    # Append-only: rows can be added, never changed or removed.
+    "CREATE TRIGGER IF NOT EXISTS runs_no_update BEFORE UPDATE ON runs"
+    " BEGIN SELECT RAISE(ABORT, 'the history is append-only'); END",
+    "CREATE TRIGGER IF NOT EXISTS runs_no_delete BEFORE DELETE ON runs"
+    " BEGIN SELECT RAISE(ABORT, 'the history is append-only'); END",
+    "CREATE TRIGGER IF NOT EXISTS samples_no_update BEFORE UPDATE ON samples"
+    " BEGIN SELECT RAISE(ABORT, 'the history is append-only'); END",
+    "CREATE TRIGGER IF NOT EXISTS samples_no_delete BEFORE DELETE ON samples"
+    " BEGIN SELECT RAISE(ABORT, 'the history is append-only'); END",
+)
+
+
+def default_history_path(reports_root="reports"):
+    """The history lives next to the reports/ directory, like the caches."""
+    return os.path.join(os.path.dirname(os.path.abspath(reports_root)), HISTORY_FILENAME)
+
+
+def git_revision(path=None):
+    """Short HEAD revision of the git checkout containing path (default: this directory), or None."""
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=path or os.path.dirname(os.path.abspath(__file__)), timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _number(v):
+    if isinstance(v, bool) or not isinstance(v, (int, float)) or math.isnan(v):
+        return None
+    return float(v)
+
+
+class HistoryStore:
+    """
+    Append-only record of the per-scenario metrics of every pipeline run: one `runs` row
+    (timestamp, git revision, source) and one `samples` row per scenario and metric.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._init_schema()
+
+    def _init_schema(self):
+        conn = self._conn
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        row = conn.execute("SELECT value FROM meta WHERE key = 'history_version'").fetchone()
+        if row is None:
+            conn.execute("INSERT INTO meta (key, value) VALUES ('history_version', ?)", (str(HISTORY_VERSION),))
+        elif int(row[0]) > HISTORY_VERSION:
+            raise RuntimeError(f"{self.path} has history version {row[0]}, this tool reads up to {HISTORY_VERSION}")
+        for statement in _SCHEMA:
+            conn.execute(statement)
+        conn.commit()
+
+    def record(self, source, values_by_scenario, run_counts=None, revision=None, recorded_at=None,
+               reports_root=None):
+        """
+        Append one run: values_by_scenario is dict[scenario] -> {metric: value}; values that
+        are not numbers (None, NaN, nested aggregates) are left out. Returns (run id, samples).
+        """
+        rows = self.sample_rows(values_by_scenario, run_counts)
+        with self._conn:
+            run_id = self._conn.execute(
+                "INSERT INTO runs (recorded_at, git_revision, source, reports_root, samples) VALUES (?, ?, ?, ?, ?)",
+                (time.time() if recorded_at is None else recorded_at, revision, source, reports_root, len(rows)),
+            ).lastrowid
+            self._conn.executemany("INSERT INTO samples (run_id, scenario, metric, value, n) VALUES (?, ?, ?, ?, ?)",
+                                   [(run_id,) + row for row in rows])
+        return run_id, len(rows)
+
+    @staticmethod
+    def sample_rows(values_by_scenario, run_counts=None):
+        """The (scenario, metric, value, n) rows record() would append for these values."""
+        run_counts = run_counts or {}
+        return [(scenario, metric, value, run_counts.get(scenario, 1))
+                for scenario, values in values_by_scenario.items()
+                for metric, value in ((m, _number(v)) for m, v in values.items())
+                if value is not None]
+
+    def last_run(self, source, reports_root):
+        """(run id, git revision, sorted sample rows) of the newest run of source over reports_root, or None."""
+        row = self._conn.execute("SELECT id, git_revision FROM runs WHERE source = ? AND reports_root IS ?"
+                                 " ORDER BY id DESC LIMIT 1", (source, reports_root)).fetchone()
+        if row is None:
+            return None
+        samples = self._conn.execute("SELECT scenario, metric, value, n FROM samples WHERE run_id = ?"
+                                     " ORDER BY scenario, metric", (row[0],)).fetchall()
+        return row[0], row[1], samples
+
+    def runs(self, source=None, last=None, since=None):
+        """[{id, recorded_at, git_revision, source, reports_root, samples}], oldest first."""
+        where, params = self._run_filter(source, since)
+        sql = ("SELECT r.id, r.recorded_at, r.git_revision, r.source, r.reports_root, r.samples"
+               f" FROM runs r {where} ORDER BY r.id DESC")
+        if last:
+            sql += f" LIMIT {int(last)}"
+        keys = ("id", "recorded_at", "git_revision", "source", "reports_root", "samples")
+        return [dict(zip(keys, row)) for row in reversed(self._conn.execute(sql, params).fetchall())]
+
+    @staticmethod
+    def _run_filter(source, since):
+        clauses, params = [], []
+        if source:
+            clauses.append("r.source = ?")
+            params.append(source)
+        if since is not None:
+            clauses.append("r.recorded_at >= ?")
+            params.append(since)
+        return ("WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def metrics(self):
+        """Every recorded metric name, sorted."""
+        return [row[0] for row in self._conn.execute("SELECT DISTINCT metric FROM samples ORDER BY metric")]
+
+    def trend(self, metric, scenarios=None, last=None, since=None):
+        """
+        dict[scenario] -> [(recorded_at, git_revision, value), ...] oldest first, over the
+        newest `last` runs that recorded metric (and/or the runs since a unix time).
+        scenarios are GLOB patterns ("react-*").
+        """
+        params = [metric]
+        sql = ("SELECT s.scenario, r.recorded_at, r.git_revision, s.value FROM samples s"
+               " JOIN runs r ON r.id = s.run_id WHERE s.metric = ?")
+        if scenarios:
+            sql += " AND (" + " OR ".join("s.scenario GLOB ?" for _ in scenarios) + ")"
+            params += list(scenarios)
+        if since is not None:
+            sql += " AND r.recorded_at >= ?"
+            params.append(since)
+        if last:
+            # The newest runs with this metric, found through the (metric, scenario, run_id) index.
+            sql += (" AND s.run_id >= (SELECT MIN(run_id) FROM (SELECT DISTINCT run_id FROM samples"
+                    f" WHERE metric = ? ORDER BY run_id DESC LIMIT {int(last)}))")
+            params.append(metric)
+        sql += " ORDER BY s.scenario, s.run_id"
+        trends = {}
+        for scenario, recorded_at, revision, value in self._conn.execute(sql, params):
+            trends.setdefault(scenario, []).append((recorded_at, revision, value))
+        return trends
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def add_history_arguments(parser):
+    parser.add_argument("--history", metavar="PATH",
+                        help=f"history store to append this run's metrics to (default: {HISTORY_FILENAME} "
+                             "next to reports/)")
+    parser.add_argument("--no-history", action="store_true", help="do not record this run in the history store")
+
+
+def record_history(args, source, values_by_scenario, run_counts=None):
+    """
+    Append a pipeline run to the history selected by add_history_arguments options (unless
+    disabled). Values identical to the newest run of the same source, reports root and
+    revision are not recorded again, so re-running a command adds no extra trend point.
+    """
+    if args.no_history or not values_by_scenario:
+        return None
+    path = args.history or default_history_path(args.reports)
+    revision = git_revision(os.path.dirname(os.path.abspath(args.reports)))
+    reports_root = os.path.abspath(args.reports)
+    with stage("history"), HistoryStore(path) as store:
+        last = store.last_run(source, reports_root)
+        rows = sorted(store.sample_rows(values_by_scenario, run_counts), key=lambda r: (r[0], r[1]))
+        if last is not None and last[1] == revision and last[2] == rows:
+            print(f"[HIST] {source} values unchanged since run {last[0]} (revision {revision or 'unknown'}), "
+                  f"not recorded again -> {path}")
+            return last[0]
+        run_id, n = store.record(source, values_by_scenario, run_counts, revision, reports_root=reports_root)
+    print(f"[HIST] run {run_id}: {n} {source} values (revision {revision or 'unknown'}) -> {path}")
+    return run_id
+
+
+def _when(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d %H:%M")
+
+
+def _date_arg(text):
+    """--since value: an ISO date/time (UTC unless it has an offset) or a number of days back ("30d")."""
+    if text.endswith("d") and text[:-1].isdigit():
+        return time.time() - int(text[:-1]) * 86400
+    when = datetime.fromisoformat(text)
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return when.timestamp()
+
+
+def format_trend(metric, trends):
+    """Per scenario: runs, first and latest value, change, min and max of the selected history."""
+    header = (f"{'Scenario':35} {'Runs':>5} {'First':>10} {'Latest':>10} {'Change':>8} "
+              f"{'Min':>10} {'Max':>10}  Latest run")
+    lines = [f"{metric} history", header, "-" * len(header)]
+    for scenario in sorted(trends):
+        points = trends[scenario]
+        values = [v for _, _, v in points]
+        first, latest = values[0], values[-1]
+        change = f"{(latest - first) / first * 100:+.1f}%" if first else "-"
+        ts, revision, _ = points[-1]
+        lines.append(f"{scenario:35} {len(values):>5} {first:>10.4g} {latest:>10.4g} {change:>8} "
+                     f"{min(values):>10.4g} {max(values):>10.4g}  {_when(ts)} {revision or ''}")
+    return "\n".join(lines)
+
+
+def _plot_lines(ax, trends, ylabel):
+    from matplotlib.dates import AutoDateLocator, ConciseDateFormatter
+
+    for scenario in sorted(trends):
+        points = trends[scenario]
+        ax.plot([datetime.fromtimestamp(ts, timezone.utc) for ts, _, _ in points], [v for _, _, v in points],
+                marker="o", markersize=3, linewidth=1, label=scenario)
+    locator = AutoDateLocator()
+    ax.xaxis.set_major_locator(locator)
+    ax.xaxis.set_major_formatter(ConciseDateFormatter(locator))
+    ax.set_ylabel(ylabel)
+    ax.grid(alpha=0.3)
+
+
+def plot_trend(trends, metric, output_path):
+    """One line per scenario of metric over the recorded runs."""
+    if not trends:
+        return
+    from render_stage import pyplot
+
+    plt = pyplot()
+    fig, ax = plt.subplots(figsize=(12, 6))
+    _plot_lines(ax, trends, metric)
+    ax.set_title(f"{metric} per scenario over time")
+    ax.legend(fontsize=7, ncol=2, loc="upper left", bbox_to_anchor=(1.01, 1))
+    fig.tight_layout()
+    with stage("render.savefig"):
+        fig.savefig(output_path, dpi=150)
+    plt.close(fig)
+
+
+def plot_score_trends(trends_by_score, output_path):
+    """A 2x2 grid of category scores (0-100) over time, one line per scenario."""
+    trends_by_score = {score: t for score, t in trends_by_score.items() if t}
+    if not trends_by_score:
+        return
+    from render_stage import pyplot
+
+    plt = pyplot()
+    fig, axes = plt.subplots(2, 2, figsize=(14, 8), sharex=True)
+    for ax, (score, trends) in zip(axes.flat, trends_by_score.items()):
+        _plot_lines(ax, trends, "score")
+        ax.set_title(score)
+        ax.set_ylim(0, 105)
+    for ax in axes.flat[len(trends_by_score):]:
+        ax.axis("off")
+    handles, labels = axes.flat[0].get_legend_handles_labels()
+    fig.legend(handles, labels, fontsize=7, loc="center right")
+    fig.suptitle("Lighthouse category scores over time")
+    fig.tight_layout(rect=(0, 0, 0.82, 1))
+    with stage("render.savefig"):
+        fig.savefig(output_path, dpi=150)
+    plt.close(fig)
+
+
+def main(argv=None):
+    from collect_metrics_bootstrap import category_scores
+
+    parser = argparse.ArgumentParser(description="Query the metrics history and draw trend charts")
+    parser.add_argument("--history", metavar="PATH",
+                        help=f"history store (default: {HISTORY_FILENAME} next to --reports)")
+    parser.add_argument("--reports", default="reports", help="reports root the history sits next to (default: reports)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    runs = sub.add_parser("runs", help="list the recorded runs")
+    trend = sub.add_parser("trend", help="per-scenario summary of one metric's history")
+    trend.add_argument("metric", help="metric name, e.g. LCP or performance_score (see `metrics`)")
+    trend.add_argument("--output", metavar="FILE", help="also write every point as TSV")
+    chart = sub.add_parser("chart", help="draw history-<metric>.png per --metric and history-scores.png")
+    chart.add_argument("--metric", action="append", metavar="NAME",
+                       help=f"metric to chart (repeatable; default: {', '.join(DEFAULT_TREND_METRICS)})")
+    chart.add_argument("--no-scores", action="store_true", help="skip the category score chart")
+    sub.add_parser("metrics", help="list the recorded metric names")
+    for p in (runs, trend, chart):
+        p.add_argument("--last", type=int, default=DEFAULT_LAST,
+                       help=f"only the newest N runs (default: {DEFAULT_LAST}; 0 = all)")
+        p.add_argument("--since", type=_date_arg, metavar="DATE",
+                       help="only runs at or after DATE (ISO date/time, or e.g. 90d for the last 90 days)")
+    for p in (trend, chart):
+        p.add_argument("--scenario", action="append", metavar="PATTERN",
+                       help="only scenarios matching this glob, e.g. 'react-*' (repeatable)")
+    runs.add_argument("--source", choices=(WEBVITALS_SOURCE, LIGHTHOUSE_SOURCE))
+    args = parser.parse_args(argv)
+
+    path = args.history or default_history_path(args.reports)
+    if not os.path.exists(path):
+        print(f"[MISS] {path} not found; run collect_metrics.py or collect_metrics_bootstrap.py first")
+        return 1
+    with HistoryStore(path) as store:
+        if args.command == "metrics":
+            print("\n".join(store.metrics()))
+        elif args.command == "runs":
+            for run in store.runs(args.source, args.last, args.since):
+                print(f"{run['id']:>6}  {_when(run['recorded_at'])}  {run['git_revision'] or '-':10} "
+                      f"{run['source']:10} {run['samples']:>5} values  {run['reports_root'] or ''}")
+        elif args.command == "trend":
+            trends = store.trend(args.metric, args.scenario, args.last, args.since)
+            if not trends:
+                print(f"No history for {args.metric}.")
+                return 1
+            print(format_trend(args.metric, trends))
+            if args.output:
+                with open(args.output, "w", encoding="utf-8") as f:
+                    f.write("Scenario\tRecorded (UTC)\tRevision\tValue\n")
+                    for scenario in sorted(trends):
+                        for ts, revision, value in trends[scenario]:
+                            f.write(f"{scenario}\t{_when(ts)}\t{revision or ''}\t{value}\n")
+                print(f"Saved trend table -> {args.output}")
+        else:
+            for metric in args.metric or DEFAULT_TREND_METRICS:
+                trends = store.trend(metric, args.scenario, args.last, args.since)
+                if not trends:
+                    print(f"[SKIP] no history for {metric}")
+                    continue
+                output_path = f"history-{metric}.png"
+                plot_trend(trends, metric, output_path)
+                print(f"Saved trend chart -> {output_path}")
+            if not args.no_scores:
+                by_score = {score: store.trend(score, args.scenario, args.last, args.since)
+                            for score in category_scores}
+                if any(by_score.values()):
+                    plot_score_trends(by_score, "history-scores.png")
+                    print("Saved trend chart -> history-scores.png")
+                else:
+                    print("[SKIP] no category score history")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,224 @@
+import json
+import re
+
+from compressed import open_text
+
+CHUNK_SIZE = 1 << 16
+
+_WS = re.compile(r"[ \t\n\r]*")
+# Everything up to the next bracket, with complete strings consumed as a whole so
+# brackets inside strings are not counted.
+_RUN = re.compile(r'[^"{}\[\]]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"{}\[\]]*)*', re.S)
+# One step of container skipping: the run above followed by the bracket that ends it.
+_TO_BRACKET = re.compile(_RUN.pattern + r"[{}\[\]]", re.S)
+_STRING_END = re.compile(r'["\\]')
+_SCALAR_END = re.compile(r"[,}\]\s]")
+
+
+class JsonScanner:
+    """
+    Incremental, event-based reader over a JSON text stream.
+
+    The document is walked once, object by object. Values the caller does not ask for
+    are skipped by scanning for their closing bracket/quote without being decoded, so
+    large blobs (screenshots, i18n strings) never become Python objects. Only values
+    passed to read_value() are materialized. Memory stays at roughly one read chunk
+    plus the largest materialized value.
+    """
+
+    def __init__(self, stream, chunk_size=CHUNK_SIZE):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._buf = ""
+        self._pos = 0
+        self._base = 0  # absolute offset of _buf[0], for error messages
+        self._mark = None  # start of a value being captured; its text must be kept
+
+    def _fill(self):
+        keep = self._pos if self._mark is None else self._mark
+        if keep:
+            self._buf = self._buf[keep:]
+            self._base += keep
+            self._pos -= keep
+            if self._mark is not None:
+                self._mark = 0
+        # Grow geometrically while capturing so large values are not re-copied per chunk.
+        size = self._chunk_size if self._mark is None else max(self._chunk_size, len(self._buf))
+        chunk = self._stream.read(size)
+        if not chunk:
+            return False
+        self._buf += chunk
+        return True
+
+    def _error(self, msg):
+        return ValueError(f"{msg} at offset {self._base + self._pos}")
+
+    def peek(self):
+        """Skip whitespace and return the next significant character ('' at end of input)."""
+        while True:
+            self._pos = _WS.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, ch):
+        c = self.peek()
+        if c != ch:
+            raise self._error(f"expected {ch!r}, got {c!r}")
+        self._pos += 1
+
+    def _skip_string(self):
+        self._pos += 1
+        while True:
+            m = _STRING_END.search(self._buf, self._pos)
+            if m is None:
+                self._pos = len(self._buf)
+                if not self._fill():
+                    raise self._error("unterminated string")
+                continue
+            if m.group() == '"':
+                self._pos = m.end()
+                return
+            if m.end() < len(self._buf):
+                self._pos = m.end() + 1
+                continue
+            # Backslash is the last buffered character; re-scan it once more input is in.
+            self._pos = m.start()
+            if not self._fill():
+                raise self._error("unterminated string")
+
+    def _skip_container(self):
+        depth = 0
+        while True:
+            buf = self._buf
+            pos = self._pos
+            match = _TO_BRACKET.match
+            while True:
+                m = match(buf, pos)
+                if m is None:
+                    break
+                pos = m.end()
+                if buf[pos - 1] in "{[":
+                    depth += 1
+                else:
+                    depth -= 1
+                    if depth == 0:
+                        self._pos = pos
+                        return
+            # No further bracket in the buffer, or a string is cut by the chunk boundary.
+            self._pos = _RUN.match(buf, pos).end()
+            if self._pos >= len(buf):
+                if not self._fill():
+                    raise self._error("unexpected end of document")
+                continue
+            # String cut by the chunk boundary; finish it with refills.
+            self._skip_string()
+
+    def _skip_scalar(self):
+        while True:
+            m = _SCALAR_END.search(self._buf, self._pos)
+            if m is not None:
+                self._pos = m.start()
+                return
+            self._pos = len(self._buf)
+            if not self._fill():
+                return
+
+    def skip_value(self):
+        c = self.peek()
+        if c == '"':
+            self._skip_string()
+        elif c in ("{", "["):
+            self._skip_container()
+        elif c:
+            self._skip_scalar()
+        else:
+            raise self._error("unexpected end of document")
+
+    def read_value(self):
+        """Materialize the value at the cursor."""
+        self.peek()
+        self._mark = self._pos
+        try:
+            self.skip_value()
+            text = self._buf[self._mark:self._pos]
+        finally:
+            self._mark = None
+        return json.loads(text)
+
+    def _read_key(self):
+        if self.peek() != '"':
+            raise self._error("expected object key")
+        self._mark = self._pos
+        try:
+            self._skip_string()
+            raw = self._buf[self._mark:self._pos]
+        finally:
+            self._mark = None
+        return json.loads(raw) if "\\" in raw else raw[1:-1]
+
+    def iter_object(self):
+        """
+        Yield the keys of the object at the cursor. The caller must consume each value
+        (read_value, skip_value or a nested iteration) before asking for the next key.
+        """
+        self._expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._read_key()
+            self._expect(":")
+            yield key
+            c = self.peek()
+            self._pos += 1
+            if c == "}":
+                return
+            if c != ",":
+                self._pos -= 1
+                raise self._error(f"expected ',' or '}}', got {c!r}")
+
+    def iter_array(self):
+        """Yield the index of each element of the array at the cursor; same contract as iter_object."""
+        self._expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        i = 0
+        while True:
+            yield i
+            i += 1
+            c = self.peek()
+            self._pos += 1
+            if c == "]":
+                return
+            if c != ",":
+                self._pos -= 1
+                raise self._error(f"expected ',' or ']', got {c!r}")
+
+
+def select(scanner, spec):
+    """
+    Walk the object at the cursor and return only the parts named in spec.
+
+    spec is a nested dict mirroring the document: a key mapped to True materializes that
+    value, a key mapped to a dict descends into it, and "*" matches any key not listed
+    explicitly. Everything else is skipped without decoding.
+    """
+    out = {}
+    wildcard = spec.get("*")
+    for key in scanner.iter_object():
+        sub = spec.get(key, wildcard)
+        if sub is True:
+            out[key] = scanner.read_value()
+        elif sub and scanner.peek() == "{":
+            out[key] = select(scanner, sub)
+        else:
+            scanner.skip_value()
+    return out
+
+
+def load_selected(path, spec, chunk_size=CHUNK_SIZE):
+    with open_text(path) as f:
+        return select(JsonScanner(f, chunk_size), spec)
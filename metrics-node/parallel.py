@@ -0,0 +1,78 @@
+import os
+
+import profiling
+
+
+def add_jobs_argument(parser):
+    parser.add_argument("-j", "--jobs", type=int, default=1, metavar="N",
+                        help="worker processes for parsing reports and drawing figures (0 = one per CPU, default: 1)")
+
+
+def resolve_jobs(jobs):
+    if jobs is None or jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def map_ordered(fn, items, jobs=1):
+    """
+    fn applied to every item, in item order. With jobs > 1 the calls run in a process
+    pool, so fn and the items must be picklable (module-level functions, partials of them).
+    """
+    items = list(items)
+    jobs = min(resolve_jobs(jobs), len(items))
+    if jobs <= 1:
+        return [fn(item) for item in items]
+    # Imported here: concurrent.futures.process is a noticeable share of a cold start.
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(fn, items))
+
+
+class _Guarded:
+    # Turns exceptions into values so one broken report cannot abort the whole pool.
+    def __init__(self, fn):
+        self.fn = fn
+
+    def __call__(self, item):
+        try:
+            return self.fn(item), None
+        except Exception as e:
+            return None, e
+
+
+def ingest(paths, extract, kind, cache=None, jobs=1):
+    """
+    Extract every path, reusing cache entries and fanning the rest out over `jobs` processes.
+    Returns [(payload, error), ...] in the order of paths; error is the exception raised by
+    extract, if any. Cache reads and writes stay in the calling process. While profiling,
+    every parse is measured where it runs and recorded per file.
+    """
+    results = [None] * len(paths)
+    identities = {}
+    pending = []
+    for i, path in enumerate(paths):
+        if cache is not None:
+            try:
+                payload, identities[i] = cache.lookup(kind, path)
+            except Exception as e:
+                results[i] = (None, e)
+                continue
+            if payload is not None:
+                results[i] = (payload, None)
+                continue
+        pending.append(i)
+
+    profiler = profiling.active()
+    worker = _Guarded(extract) if profiler is None else profiler.measured(_Guarded(extract))
+    parsed = map_ordered(worker, [paths[i] for i in pending], jobs)
+    for i, item in zip(pending, parsed):
+        if profiler is not None:
+            item, cost = item
+            profiler.record_file(kind, paths[i], cost)
+        payload, error = item
+        results[i] = (payload, error)
+        if cache is not None and error is None:
+            cache.put(kind, paths[i], payload, identities[i])
+    return results
@@ -0,0 +1,215 @@
+import contextlib
+import json
+import os
+import sys
+import time
+
+# The running Profiler while --profile is on; None otherwise, which makes stage() a no-op.
+_active = None
+# Open measurement frames of this process, innermost last (see _Frame).
+_frames = []
+# The tracemalloc module once memory tracing has been started; imported on demand so that
+# runs without --profile do not load it.
+_tracemalloc = None
+
+_NULL = contextlib.nullcontext()
+
+
+class _Frame:
+    """
+    Wall time, CPU time and tracemalloc peak of one block. tracemalloc keeps a single
+    process-wide peak, so a frame hands the peak seen so far to its parent before resetting
+    it, and its own peak to the parent when it closes; nested frames then all stay correct.
+    """
+
+    __slots__ = ("wall", "cpu", "mem0", "peak")
+
+    def __enter__(self):
+        self.mem0 = self.peak = 0
+        if _tracing():
+            current, peak = _tracemalloc.get_traced_memory()
+            if _frames:
+                _frames[-1].peak = max(_frames[-1].peak, peak)
+            _tracemalloc.reset_peak()
+            self.mem0 = self.peak = current
+        _frames.append(self)
+        self.cpu = time.process_time()
+        self.wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.wall = time.perf_counter() - self.wall
+        self.cpu = time.process_time() - self.cpu
+        _frames.pop()
+        if _tracing():
+            self.peak = max(self.peak, _tracemalloc.get_traced_memory()[1])
+            if _frames:
+                _frames[-1].peak = max(_frames[-1].peak, self.peak)
+        return False
+
+    def cost(self):
+        """peak_kb is the highest traced allocation above the level at entry (None without tracemalloc)."""
+        return {
+            "wall_s": round(self.wall, 6),
+            "cpu_s": round(self.cpu, 6),
+            "peak_kb": round((self.peak - self.mem0) / 1024.0, 1) if _tracing() else None,
+        }
+
+
+def _tracing():
+    return _tracemalloc is not None and _tracemalloc.is_tracing()
+
+
+def _start_tracing():
+    global _tracemalloc
+    import tracemalloc
+
+    _tracemalloc = tracemalloc
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def _merge_stage(stages, name, cost, calls=1):
+    s = stages.get(name)
+    if s is None:
+        stages[name] = dict(cost, calls=calls)
+        return
+    s["calls"] += calls
+    s["wall_s"] = round(s["wall_s"] + cost["wall_s"], 6)
+    s["cpu_s"] = round(s["cpu_s"] + cost["cpu_s"], 6)
+    if cost["peak_kb"] is not None:
+        s["peak_kb"] = max(s["peak_kb"] or 0.0, cost["peak_kb"])
+
+
+class Profiler:
+    """
+    Collects named stage costs (summed over calls, peak = largest single call), per-file
+    parse costs and per-figure render costs for one command run.
+    """
+
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self.files = []
+        self.figures = []
+        self.total = None
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        frame = _Frame()
+        with frame:
+            yield
+        _merge_stage(self.stages, name, frame.cost())
+
+    def measured(self, fn):
+        return Measured(fn, self.trace_memory)
+
+    def _merge_child(self, cost):
+        for name, s in cost.pop("stages").items():
+            _merge_stage(self.stages, name, {k: s[k] for k in ("wall_s", "cpu_s", "peak_kb")}, s["calls"])
+
+    def record_file(self, kind, path, cost):
+        self._merge_child(cost)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = None
+        self.files.append(dict(cost, kind=kind, path=path, bytes=size))
+
+    def record_figure(self, output_path, function, cost):
+        stages = dict(cost["stages"])
+        self._merge_child(cost)
+        self.figures.append(dict(cost, output=output_path, function=function, stages=stages))
+
+
+class Measured:
+    """
+    fn wrapped to return (result, cost); cost also carries the stages entered during the
+    call. Picklable, so it works the same inside a worker process of parallel.map_ordered.
+    """
+
+    def __init__(self, fn, trace_memory=True):
+        self.fn = fn
+        self.trace_memory = trace_memory
+
+    def __call__(self, *args):
+        global _active
+        if self.trace_memory:
+            _start_tracing()
+        outer, _active = _active, Profiler(self.trace_memory)
+        collector = _active
+        try:
+            with _Frame() as frame:
+                result = self.fn(*args)
+        finally:
+            _active = outer
+        cost = frame.cost()
+        cost["stages"] = collector.stages
+        return result, cost
+
+
+def active():
+    return _active
+
+
+def stage(name):
+    """Context manager timing a pipeline stage under name; does nothing unless profiling is on."""
+    if _active is None:
+        return _NULL
+    return _active.stage(name)
+
+
+def add_profile_arguments(parser):
+    parser.add_argument("--profile", metavar="FILE",
+                        help="write a JSON profile (wall/CPU time and tracemalloc peak per stage, per parsed "
+                             "file and per figure) to FILE")
+    parser.add_argument("--profile-top", type=int, default=10, metavar="N",
+                        help="slowest report files listed in the profile (default: 10)")
+    parser.add_argument("--profile-no-memory", action="store_true",
+                        help="skip tracemalloc; timings are closer to an unprofiled run but peaks are not reported")
+
+
+def start_profile(args):
+    """Start profiling when --profile was given; returns the Profiler or None."""
+    global _active
+    if not args.profile:
+        return None
+    _active = Profiler(trace_memory=not args.profile_no_memory)
+    if _active.trace_memory:
+        _start_tracing()
+    _active.total = _Frame()
+    _active.total.__enter__()
+    return _active
+
+
+def finish_profile(profiler, args, command):
+    """Stop profiling and write the JSON profile to args.profile."""
+    global _active
+    if profiler is None:
+        return
+    profiler.total.__exit__(None, None, None)
+    _active = None
+    total = profiler.total.cost()
+    if profiler.trace_memory:
+        total["traced_peak_kb"] = round(profiler.total.peak / 1024.0, 1)
+        _tracemalloc.stop()
+
+    files = profiler.files
+    profile = {
+        "command": command,
+        "argv": sys.argv[1:],
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "trace_memory": profiler.trace_memory,
+        "total": total,
+        "stages": profiler.stages,
+        "files": {
+            "parsed": len(files),
+            "wall_s": round(sum(f["wall_s"] for f in files), 6),
+            "bytes": sum(f["bytes"] or 0 for f in files),
+            "slowest": sorted(files, key=lambda f: -f["wall_s"])[:args.profile_top],
+        },
+        "figures": sorted(profiler.figures, key=lambda f: -f["wall_s"]),
+    }
+    with open(args.profile, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2)
+    print(f"Saved profile -> {args.profile}")
@@ -0,0 +1,226 @@
+import contextlib
+import hashlib
+import io
+import json
+import os
+import shutil
+from collections import namedtuple
+
+import profiling
+import table_render
+from parallel import map_ordered
+
+# Bump to invalidate every cached figure, e.g. after a change outside the plotting modules.
+RENDER_VERSION = 2
+
+# Drawing helpers that plotting functions in other modules call; their source is part of
+# every figure key, so editing them redraws the figures they produced.
+SHARED_DRAWING_MODULES = (table_render,)
+
+RENDER_CACHE_DIRNAME = ".render-cache"
+MANIFEST_FILENAME = "manifest.json"
+
+# fn(*args, **kwargs) writes its image to output_path (a keyword argument of fn), plus
+# <stem>-p2<ext>, <stem>-p3<ext>, ... when it spans several pages (table_render.page_paths).
+RenderJob = namedtuple("RenderJob", ["fn", "args", "kwargs"])
+
+
+def pyplot():
+    """matplotlib.pyplot on the non-interactive Agg backend, imported on first use."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+def default_render_cache_dir(reports_root="reports"):
+    """The figure cache lives next to the reports/ directory, like the extraction cache."""
+    return os.path.join(os.path.dirname(os.path.abspath(reports_root)), RENDER_CACHE_DIRNAME)
+
+
+def _jsonable(v):
+    if hasattr(v, "tolist"):  # numpy arrays and scalars
+        return v.tolist()
+    if isinstance(v, (set, frozenset)):
+        return sorted(v, key=repr)
+    return repr(v)
+
+
+def _source_digest(fn, _memo={}):
+    import inspect
+
+    path = fn.__file__ if inspect.ismodule(fn) else inspect.getsourcefile(fn)
+    if path not in _memo:
+        with open(path, "rb") as f:
+            _memo[path] = hashlib.sha256(f.read()).hexdigest()
+    return _memo[path]
+
+
+def _matplotlib_version(_memo=[]):
+    # Read from the package metadata: importing matplotlib just for its version would cost
+    # as much as the cache hit saves.
+    if not _memo:
+        from importlib.metadata import PackageNotFoundError, version
+
+        try:
+            _memo.append(version("matplotlib"))
+        except PackageNotFoundError:
+            _memo.append(None)
+    return _memo[0]
+
+
+def job_key(job):
+    """
+    Content address of a figure: a hash of its input data and everything that affects the
+    drawing -- the plotting function, the source of its module and of
+    SHARED_DRAWING_MODULES, the matplotlib version and every argument except output_path, whose extension (the output format) is kept. The
+    same inputs always map to the same image.
+    """
+    settings = {k: v for k, v in job.kwargs.items() if k != "output_path"}
+    settings["format"] = os.path.splitext(job.kwargs["output_path"])[1].lower()
+    text = json.dumps(
+        [RENDER_VERSION, job.fn.__module__, job.fn.__qualname__, _source_digest(job.fn),
+         [_source_digest(m) for m in SHARED_DRAWING_MODULES], _matplotlib_version(), job.args, settings],
+        default=_jsonable,
+        allow_nan=True,
+    )
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def _render(job):
+    # Runs in a worker: draw the figure and hand its console output back to the parent,
+    # which prints it in job order. Plotting functions return early without an image when
+    # there is nothing to draw, so "written" is judged by the output file itself.
+    out = io.StringIO()
+    output_path = job.kwargs["output_path"]
+    before = _stat(output_path)
+    try:
+        with contextlib.redirect_stdout(out):
+            job.fn(*job.args, **job.kwargs)
+    except Exception as e:
+        return out.getvalue(), f"{type(e).__name__}: {e}", False
+    after = _stat(output_path)
+    return out.getvalue(), None, after is not None and after != before
+
+
+class RenderCache:
+    """
+    Content-addressed store of rendered figures: <dir>/<key><ext> (and <key>-pN<ext> for
+    further pages) plus a manifest of which key each output path was last written from. An
+    output whose manifest key still matches (and whose pages are untouched) is skipped
+    outright; a known key for a changed output is restored by copying the stored pages;
+    only unknown keys are drawn.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._manifest_path = os.path.join(path, MANIFEST_FILENAME)
+        try:
+            with open(self._manifest_path, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {}
+
+    def blob(self, key, output_path):
+        return os.path.join(self.path, key + os.path.splitext(output_path)[1])
+
+    def is_current(self, output_path, key):
+        entry = self.manifest.get(os.path.abspath(output_path))
+        if not entry or entry["key"] != key:
+            return False
+        stats = [_stat(p) for p in table_render.existing_pages(output_path)]
+        return None not in stats and [list(st) for st in stats] == entry.get("pages")
+
+    def restore(self, output_path, key):
+        blobs = table_render.existing_pages(self.blob(key, output_path))
+        if not os.path.isfile(blobs[0]):
+            return False
+        for blob, path in zip(blobs, table_render.page_paths(output_path, len(blobs))):
+            shutil.copyfile(blob, path)
+        table_render.remove_stale_pages(output_path, len(blobs))
+        self.record(output_path, key)
+        return True
+
+    def store(self, output_path, key):
+        pages = table_render.existing_pages(output_path)
+        for path, blob in zip(pages, table_render.page_paths(self.blob(key, output_path), len(pages))):
+            tmp = f"{blob}.tmp{os.getpid()}"
+            shutil.copyfile(path, tmp)
+            os.replace(tmp, blob)
+        table_render.remove_stale_pages(self.blob(key, output_path), len(pages))
+        self.record(output_path, key)
+
+    def record(self, output_path, key):
+        pages = [list(_stat(p)) for p in table_render.existing_pages(output_path)]
+        self.manifest[os.path.abspath(output_path)] = {"key": key, "pages": pages}
+
+    def save(self):
+        tmp = f"{self._manifest_path}.tmp{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp, self._manifest_path)
+
+
+def render_all(jobs, cache=None, workers=1):
+    """
+    Render independent figures, in parallel with workers > 1 (each job runs in its own
+    process, so jobs must be picklable). With a RenderCache, figures whose key is unchanged
+    are skipped or restored instead of drawn. Console output of the plotting functions is
+    printed in job order. While profiling, each drawn figure is measured and recorded.
+    Returns the number of figures actually drawn.
+    """
+    keys = [job_key(job) for job in jobs] if cache is not None else [None] * len(jobs)
+    pending = []
+    for i, (job, key) in enumerate(zip(jobs, keys)):
+        output_path = job.kwargs["output_path"]
+        if cache is not None and (cache.is_current(output_path, key) or cache.restore(output_path, key)):
+            continue
+        pending.append(i)
+
+    profiler = profiling.active()
+    render = _render if profiler is None else profiler.measured(_render)
+    results = dict(zip(pending, map_ordered(render, [jobs[i] for i in pending], workers)))
+    reused = 0
+    for i, (job, key) in enumerate(zip(jobs, keys)):
+        output_path = job.kwargs["output_path"]
+        if i not in results:
+            reused += 1
+            print(f"[CACHE] {output_path} up to date")
+            continue
+        if profiler is not None:
+            results[i], cost = results[i]
+            profiler.record_figure(output_path, job.fn.__name__, cost)
+        text, error, written = results[i]
+        if text:
+            print(text, end="")
+        if error is not None:
+            print(f"[ERR ] rendering {output_path} failed: {error}")
+        elif cache is not None and written:
+            cache.store(output_path, key)
+    if cache is not None:
+        cache.save()
+        print(f"[CACHE] figures: {reused} reused, {len(pending)} drawn -> {cache.path}")
+    return len(pending)
+
+
+def add_render_arguments(parser):
+    parser.add_argument("--render-cache", metavar="DIR",
+                        help=f"figure cache directory (default: {RENDER_CACHE_DIRNAME} next to reports/)")
+    parser.add_argument("--no-render-cache", action="store_true", help="redraw every figure")
+
+
+def open_render_cache(args, reports_root="reports"):
+    if args.no_render_cache:
+        return None
+    return RenderCache(args.render_cache or default_render_cache_dir(reports_root))
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import sqlite3
+
+# Bump whenever the shape of a cached payload changes; a mismatching cache file is wiped.
+SCHEMA_VERSION = 6
+
+CACHE_FILENAME = ".metrics-cache.sqlite"
+
+
+def default_cache_path(reports_root="reports"):
+    """The cache lives next to the reports/ directory it describes."""
+    return os.path.join(os.path.dirname(os.path.abspath(reports_root)), CACHE_FILENAME)
+
+
+def _file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ExtractionCache:
+    """
+    Persistent store of extracted report data, keyed by (kind, path).
+
+    An entry is reused only while the file still has the same size and mtime (and, with
+    use_hash, the same sha256), so only new or changed reports are parsed again. kind
+    separates the different extractions made from the same tree ("metrics", "lighthouse").
+    """
+
+    def __init__(self, path, use_hash=False):
+        self.path = path
+        self.use_hash = use_hash
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(path)
+        self._init_schema()
+
+    def _init_schema(self):
+        conn = self._conn
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if row is None or row[0] != str(SCHEMA_VERSION):
+            conn.execute("DROP TABLE IF EXISTS entries")
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)",
+                         (str(SCHEMA_VERSION),))
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " kind TEXT NOT NULL,"
+            " path TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " digest TEXT,"
+            " payload TEXT NOT NULL,"
+            " PRIMARY KEY (kind, path))"
+        )
+        conn.commit()
+
+    def _identity(self, path):
+        st = os.stat(path)
+        digest = _file_digest(path) if self.use_hash else None
+        return st.st_size, st.st_mtime_ns, digest
+
+    def get(self, kind, path, identity=None):
+        """Return the cached payload for path, or None when missing or stale."""
+        size, mtime_ns, digest = identity or self._identity(path)
+        row = self._conn.execute(
+            "SELECT size, mtime_ns, digest, payload FROM entries WHERE kind = ? AND path = ?",
+            (kind, os.path.realpath(path)),
+        ).fetchone()
+        if row is None or row[0] != size or row[1] != mtime_ns:
+            return None
+        if digest is not None and row[2] != digest:
+            return None
+        return json.loads(row[3])
+
+    def put(self, kind, path, payload, identity=None):
+        size, mtime_ns, digest = identity or self._identity(path)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO entries (kind, path, size, mtime_ns, digest, payload) VALUES (?, ?, ?, ?, ?, ?)",
+            (kind, os.path.realpath(path), size, mtime_ns, digest, json.dumps(payload)),
+        )
+
+    def lookup(self, kind, path):
+        """
+        Return (payload, identity) for path; payload is None on a miss. identity is taken
+        before any parsing, so a file rewritten mid-parse is picked up again next run.
+        """
+        identity = self._identity(path)
+        payload = self.get(kind, path, identity)
+        if payload is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return payload, identity
+
+    def fetch(self, kind, path, extract):
+        """Return the cached payload for path, calling extract(path) and storing the result on a miss."""
+        payload, identity = self.lookup(kind, path)
+        if payload is None:
+            payload = extract(path)
+            self.put(kind, path, payload, identity)
+        return payload
+
+    def invalidate(self, kind=None, paths=None):
+        """Drop entries by kind and/or path; with no arguments the whole cache is cleared."""
+        clauses, params = [], []
+        if kind is not None:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if paths is not None:
+            paths = [os.path.realpath(p) for p in paths]
+            if not paths:
+                return 0
+            clauses.append(f"path IN ({', '.join('?' * len(paths))})")
+            params.extend(paths)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        cur = self._conn.execute(f"DELETE FROM entries{where}", params)
+        self._conn.commit()
+        return cur.rowcount
+
+    def close(self):
+        self._conn.commit()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def add_cache_arguments(parser):
+    parser.add_argument("--cache", metavar="PATH",
+                        help=f"extraction cache file (default: {CACHE_FILENAME} next to reports/)")
+    parser.add_argument("--no-cache", action="store_true", help="parse every report from scratch")
+    parser.add_argument("--clear-cache", action="store_true", help="drop all cached entries before running")
+    parser.add_argument("--hash", dest="cache_hash", action="store_true",
+                        help="also compare the sha256 of each report, not only its size and mtime")
+
+
+def open_cache(args, reports_root="reports"):
+    """Open the cache selected by add_cache_arguments options, or return None when disabled."""
+    if args.no_cache:
+        return None
+    cache = ExtractionCache(args.cache or default_cache_path(reports_root), use_hash=args.cache_hash)
+    if args.clear_cache:
+        removed = cache.invalidate()
+        print(f"[CACHE] cleared {removed} entr{'y' if removed == 1 else 'ies'}")
+    return cache
+
+
+def report_cache_stats(cache):
+    if cache is not None:
+        print(f"[CACHE] {cache.hits} hit(s), {cache.misses} parsed -> {cache.path}")
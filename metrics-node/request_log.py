@@ -0,0 +1,223 @@
+import argparse
+import json
+import math
+import os
+from collections import OrderedDict
+
+from collect_metrics import merge_content_types
+from columnar import normalize_content_type, to_float, to_int
+from compressed import SUFFIXES, open_text, strip_suffix
+from json_stream import JsonScanner
+from sketches import LogHistogram
+
+# reports/<scenario>[/run-XXX]/requests.ndjson[.gz|.zst]: one networkRequests item per line,
+# plus an optional {"webVitals": {...}} line. Looked up in this order.
+REQUEST_LOG_NAMES = ("requests.ndjson",) + tuple("requests.ndjson" + s for s in SUFFIXES)
+
+
+def iter_ndjson(stream):
+    """Yield the object on each non-empty line of an NDJSON stream."""
+    for lineno, line in enumerate(stream, 1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"line {lineno}: {e}") from None
+
+
+def iter_metrics_json_requests(stream):
+    """Yield the networkRequests items of a metrics.json stream one at a time, skipping everything else."""
+    scanner = JsonScanner(stream)
+    for key in scanner.iter_object():
+        if key != "networkRequests" or scanner.peek() != "[":
+            scanner.skip_value()
+            continue
+        for _ in scanner.iter_array():
+            yield scanner.read_value()
+
+
+def iter_requests(path):
+    """
+    Yield the network requests of a request log or a metrics.json, one dict at a time
+    (main.js field names). Compressed files are decompressed on the fly.
+    """
+    with open_text(path) as f:
+        if strip_suffix(path).endswith(".ndjson"):
+            for record in iter_ndjson(f):
+                if "webVitals" not in record:
+                    yield record
+        else:
+            yield from iter_metrics_json_requests(f)
+
+
+def _number(v):
+    # Same conversion as columnar.float_column, so both paths bucket the same requests.
+    v = to_float(v)
+    return math.nan if v is None else v
+
+
+class ContentTypeAggregator:
+    """
+    Running per-content-type totals with the semantics of
+    collect_metrics.aggregate_by_content_type: duration falls back to endTime - startTime,
+    requests without a known duration are left out, content types are normalized. Memory
+    grows with the number of distinct content types (plus a log-binned duration sketch per
+    type), not with the number of requests.
+    """
+
+    def __init__(self):
+        self.buckets = {}
+        self.sketches = {}
+        self._types = {}  # raw contentType -> normalized, to normalize each distinct value once
+
+    def add(self, req):
+        duration = _number(req.get("duration"))
+        if math.isnan(duration):
+            duration = _number(req.get("endTime")) - _number(req.get("startTime"))
+            if math.isnan(duration):
+                return
+        raw = req.get("contentType") or ""
+        ct = self._types.get(raw)
+        if ct is None:
+            ct = self._types[raw] = normalize_content_type(raw)
+        bucket = self.buckets.get(ct)
+        if bucket is None:
+            bucket = self.buckets[ct] = {"count": 0, "total_duration_ms": 0.0, "total_size_bytes": 0}
+            self.sketches[ct] = LogHistogram()
+        bucket["count"] += 1
+        bucket["total_duration_ms"] += duration
+        bucket["total_size_bytes"] += to_int(req.get("size", 0) or 0)
+        self.sketches[ct].add(duration)
+
+    def result(self):
+        """OrderedDict[contentType] -> {count, total_duration_ms, total_size_bytes, duration_sketch}, by total duration."""
+        for ct, bucket in self.buckets.items():
+            bucket["duration_sketch"] = self.sketches[ct].to_dict()
+        return OrderedDict(sorted(self.buckets.items(), key=lambda kv: (-kv[1]["total_duration_ms"], kv[0])))
+
+
+def aggregate_requests_stream(requests):
+    agg = ContentTypeAggregator()
+    for req in requests:
+        agg.add(req)
+    return agg.result()
+
+
+def aggregate_request_file(path):
+    """Content-type aggregates of one request log or metrics.json, computed while streaming it."""
+    return aggregate_requests_stream(iter_requests(path))
+
+
+def request_log_files(index, name):
+    """The request log of every run of a scenario: per run, the first of REQUEST_LOG_NAMES present."""
+    runs = {}
+    for filename in REQUEST_LOG_NAMES:
+        for path in index.run_files(name, filename):
+            runs.setdefault(os.path.dirname(path), path)
+    return list(runs.values())
+
+
+def read_request_log_aggregates(dirs, reports_root="reports", cache=None, jobs=1, index=None):
+    """
+    read_network_aggregates() in constant memory per file: dict[folder] -> OrderedDict[contentType]
+    -> {count, total_duration_ms, total_size_bytes}, summed over runs. A run's request log is
+    used when there is one, its metrics.json otherwise.
+    """
+    from parallel import ingest
+    from scenario_index import ScenarioIndex
+
+    index = index or ScenarioIndex.scan(reports_root)
+    run_files = {}
+    for d in dirs:
+        logs = request_log_files(index, d)
+        logged = {os.path.dirname(p) for p in logs}
+        run_files[d] = sorted(logs + [p for p in index.run_files(d, "metrics.json")
+                                      if os.path.dirname(p) not in logged])
+    all_paths = [path for d in dirs for path in run_files[d]]
+    loaded = dict(zip(all_paths, ingest(all_paths, aggregate_request_file, "request-aggregates", cache, jobs)))
+
+    agg_by_folder = {}
+    for d in dirs:
+        runs = []
+        for path in run_files[d]:
+            by_ct, error = loaded[path]
+            if error is not None:
+                print(f"[ERR ] failed reading {path}: {error}")
+                continue
+            runs.append(by_ct)
+        if runs:
+            agg_by_folder[d] = merge_content_types(runs)
+    return agg_by_folder
+
+
+def write_request_log(path, requests, web_vitals=None, level=None):
+    """Write requests (any iterable) as NDJSON, compressed by suffix; returns the number of requests."""
+    n = 0
+    with open_text(path, "w", level) as f:
+        if web_vitals is not None:
+            f.write(json.dumps({"webVitals": web_vitals}, separators=(",", ":")) + "\n")
+        for req in requests:
+            f.write(json.dumps(req, separators=(",", ":")) + "\n")
+            n += 1
+    return n
+
+
+def convert_metrics_json(path, suffix=""):
+    """Write <dir>/requests.ndjson<suffix> next to a metrics.json; returns the new path."""
+    web_vitals = None
+    with open_text(path) as f:
+        scanner = JsonScanner(f)
+        for key in scanner.iter_object():
+            if key == "webVitals":
+                web_vitals = scanner.read_value()
+            else:
+                scanner.skip_value()
+    out = os.path.join(os.path.dirname(path), REQUEST_LOG_NAMES[0] + suffix)
+    n = write_request_log(out, iter_requests(path), web_vitals)
+    print(f"Saved request log ({n} requests) -> {out}")
+    return out
+
+
+def main(argv=None):
+    from collect_metrics import write_aggregates_table
+    from parallel import add_jobs_argument
+    from report_cache import add_cache_arguments, open_cache, report_cache_stats
+    from scenario_index import add_scenario_arguments, scenario_filters, ScenarioIndex
+
+    parser = argparse.ArgumentParser(description="NDJSON request logs: convert metrics.json and aggregate in constant memory")
+    sub = parser.add_subparsers(dest="command", required=True)
+    convert = sub.add_parser("convert", help="write requests.ndjson[.gz|.zst] next to each metrics.json")
+    convert.add_argument("--compress", choices=("none", "gzip", "zstd"), default="none")
+    aggregate = sub.add_parser("aggregate", help="content-type aggregates from request logs (metrics.json as fallback)")
+    aggregate.add_argument("--output", default="network-aggregates-all.txt",
+                           help="aggregates TSV (default: network-aggregates-all.txt)")
+    add_jobs_argument(aggregate)
+    add_cache_arguments(aggregate)
+    for p in (convert, aggregate):
+        p.add_argument("--reports", default="reports", help="reports root directory (default: reports)")
+        add_scenario_arguments(p)
+    args = parser.parse_args(argv)
+
+    index = ScenarioIndex.scan(args.reports)
+    filters = scenario_filters(args)
+    if args.command == "convert":
+        suffix = {"none": "", "gzip": ".gz", "zstd": ".zst"}[args.compress]
+        for name in index.names(has="metrics.json", **filters):
+            for path in index.run_files(name, "metrics.json"):
+                convert_metrics_json(path, suffix)
+        return
+
+    dirs = sorted(set(index.names(has="metrics.json", **filters)).union(
+        *(index.names(has=filename, **filters) for filename in REQUEST_LOG_NAMES)))
+    cache = open_cache(args, args.reports)
+    try:
+        agg = read_request_log_aggregates(dirs, args.reports, cache, args.jobs, index)
+    finally:
+        if cache is not None:
+            cache.close()
+    report_cache_stats(cache)
+    write_aggregates_table(agg, output_path=args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import functools
+import glob
+import math
+import os
+
+from compressed import existing
+
+RUN_DIR_PATTERN = "run-*"
+N_BOOTSTRAP = 2000
+CONFIDENCE = 0.95
+# Largest n1 * n2 for which mann_whitney_u enumerates the exact U distribution.
+EXACT_U_MAX_CELLS = 400
+
+
+def run_paths(reports_root, scenario, filename):
+    """
+    Report files of one scenario, in run order: reports/<scenario>/<filename> for a single
+    run and/or reports/<scenario>/run-XXX/<filename> for repeated runs. A run without
+    <filename> but with <filename>.gz or <filename>.zst contributes the compressed file.
+    """
+    base = os.path.join(reports_root, scenario)
+    paths = []
+    for directory in [base] + sorted(glob.glob(os.path.join(base, RUN_DIR_PATTERN))):
+        path = existing(os.path.join(directory, filename))
+        if path is not None:
+            paths.append(path)
+    return paths
+
+
+def _number(v):
+    if isinstance(v, (int, float)) and not isinstance(v, bool) and not math.isnan(v):
+        return float(v)
+    return math.nan
+
+
+def _single(v):
+    return {"n": 1, "median": v, "p75": v, "p95": v, "std": 0.0, "ci_low": v, "ci_high": v}
+
+
+def summarize_runs(runs, keys, n_boot=N_BOOTSTRAP, confidence=CONFIDENCE, seed=0):
+    """
+    Reduce repeated runs (one dict per run) to per-key statistics:
+      {key: {n, median, p75, p95, std, ci_low, ci_high}} (None when no run has a number)
+    ci_low/ci_high is a percentile bootstrap confidence interval of the median. Keys
+    present in every run share one resampling draw and are reduced in a single
+    vectorized pass; keys with gaps fall back to a per-key pass over their own samples.
+    """
+    if len(runs) <= 1:
+        # A single run is its own statistic; no need to load numpy for it.
+        values = {k: _number(runs[0].get(k)) if runs else math.nan for k in keys}
+        return {k: (None if math.isnan(v) else _single(v)) for k, v in values.items()}
+
+    import numpy as np
+
+    x = np.array([[_number(run.get(k)) for k in keys] for run in runs], dtype=float).reshape(len(runs), len(keys))
+    rng = np.random.default_rng(seed)
+    alpha = (1.0 - confidence) / 2.0
+    out = {}
+
+    complete = ~np.isnan(x).any(axis=0)
+    if len(runs) > 1 and complete.any():
+        cols = np.flatnonzero(complete)
+        xc = x[:, cols]
+        n = len(runs)
+        # The k-th order statistic of a resample of sorted data is the data at the k-th
+        # smallest resampled index, so one partition of the index draws yields the
+        # bootstrap medians of every metric at once.
+        xs = np.sort(xc, axis=0)
+        lo, hi = (n - 1) // 2, n // 2
+        draws = np.partition(rng.integers(0, n, size=(n_boot, n)), [lo, hi], axis=1)
+        medians = (xs[draws[:, lo]] + xs[draws[:, hi]]) / 2.0
+        ci_low, ci_high = np.quantile(medians, [alpha, 1.0 - alpha], axis=0)
+        p50, p75, p95 = np.percentile(xc, [50, 75, 95], axis=0)
+        std = xc.std(axis=0, ddof=1)
+        for i, j in enumerate(cols):
+            out[keys[j]] = {
+                "n": n,
+                "median": float(p50[i]),
+                "p75": float(p75[i]),
+                "p95": float(p95[i]),
+                "std": float(std[i]),
+                "ci_low": float(ci_low[i]),
+                "ci_high": float(ci_high[i]),
+            }
+
+    for j, key in enumerate(keys):
+        if key in out:
+            continue
+        samples = x[:, j][~np.isnan(x[:, j])]
+        if samples.size == 0:
+            out[key] = None
+        elif samples.size == 1:
+            out[key] = _single(float(samples[0]))
+        else:
+            out[key] = summarize_runs([{key: v} for v in samples], [key], n_boot, confidence, seed)[key]
+    return out
+
+
+def medians(stats):
+    """Point estimate per key from summarize_runs output."""
+    return {k: (s["median"] if s else None) for k, s in stats.items()}
+
+
+def has_repeats(stats_by_scenario):
+    return any(s and s["n"] > 1 for stats in stats_by_scenario.values() for s in stats.values())
+
+
+def error_bar(s):
+    """(below, above) distance from the median to the CI bounds, NaN when there is nothing to draw."""
+    if not s or s["n"] < 2:
+        return math.nan, math.nan
+    return s["median"] - s["ci_low"], s["ci_high"] - s["median"]
+
+
+def _rankdata(v):
+    # Average ranks (1-based) with ties sharing the mean of their positions.
+    import numpy as np
+
+    sorter = np.argsort(v, kind="mergesort")
+    inv = np.empty_like(sorter)
+    inv[sorter] = np.arange(len(v))
+    vs = v[sorter]
+    first = np.r_[True, vs[1:] != vs[:-1]]
+    dense = first.cumsum()[inv]
+    bounds = np.r_[np.flatnonzero(first), len(v)]
+    return 0.5 * (bounds[dense] + bounds[dense - 1] + 1), np.diff(bounds)
+
+
+@functools.lru_cache(maxsize=None)
+def _u_counts(n1, n2):
+    # Number of orderings of n1 + n2 distinct values giving each U = 0 .. n1 * n2.
+    if n1 == 0 or n2 == 0:
+        return (1,)
+    with_last_a = _u_counts(n1 - 1, n2)  # largest value from a: it beats all of b
+    with_last_b = _u_counts(n1, n2 - 1)
+    counts = [0] * (n1 * n2 + 1)
+    for u, c in enumerate(with_last_a):
+        counts[u + n2] += c
+    for u, c in enumerate(with_last_b):
+        counts[u] += c
+    return tuple(counts)
+
+
+def mann_whitney_min_p(n1, n2):
+    """Smallest two-sided p-value the exact Mann-Whitney U test can reach with n1 vs n2 runs."""
+    if n1 == 0 or n2 == 0:
+        return 1.0
+    return min(1.0, 2.0 / math.comb(n1 + n2, n1))
+
+
+def mann_whitney_u(a, b):
+    """
+    Two-sided Mann-Whitney U test of samples a vs b. Exact for small samples without ties
+    (n1 * n2 <= EXACT_U_MAX_CELLS), otherwise the normal approximation with tie and
+    continuity correction. Returns (U of a, p-value).
+    """
+    import numpy as np
+
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    n1, n2 = len(a), len(b)
+    if n1 == 0 or n2 == 0:
+        return math.nan, 1.0
+    ranks, ties = _rankdata(np.concatenate([a, b]))
+    u = ranks[:n1].sum() - n1 * (n1 + 1) / 2.0
+    n = n1 + n2
+    if n1 * n2 <= EXACT_U_MAX_CELLS and ties.max() == 1:
+        counts = _u_counts(n1, n2)
+        tail = sum(counts[:int(min(u, n1 * n2 - u)) + 1])
+        return float(u), min(1.0, 2.0 * tail / math.comb(n, n1))
+    tie_term = float((ties ** 3 - ties).sum()) / (n * (n - 1))
+    sigma = math.sqrt(n1 * n2 / 12.0 * ((n + 1) - tie_term))
+    if sigma == 0:
+        return float(u), 1.0
+    mu = n1 * n2 / 2.0
+    z = (abs(u - mu) - 0.5) / sigma
+    return float(u), min(1.0, math.erfc(max(z, 0.0) / math.sqrt(2.0)))
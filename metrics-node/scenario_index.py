@@ -0,0 +1,257 @@
+import argparse
+import fnmatch
+import os
+import re
+from collections import OrderedDict, namedtuple
+
+from compressed import SUFFIXES
+from run_stats import RUN_DIR_PATTERN
+
+# Scenario folders are named <framework>-<device>-<page> by main.js / main_bootstrap.js.
+SCENARIO_NAME = re.compile(r"^(?P<framework>[^-]+)-(?P<device>[^-]+)-(?P<page>.+)$")
+FIELDS = ("framework", "device", "page")
+
+Scenario = namedtuple("Scenario", ["name", "framework", "device", "page"])
+
+
+def parse_scenario_name(name):
+    """Scenario for a <framework>-<device>-<page> folder name, or None when it does not follow the scheme."""
+    m = SCENARIO_NAME.match(name)
+    if m is None:
+        return None
+    return Scenario(name, m.group("framework"), m.group("device"), m.group("page"))
+
+
+def scenario_matches(name, **filters):
+    """Whether folder name follows the naming scheme and matches filters (ScenarioIndex.select semantics)."""
+    scenario = parse_scenario_name(name)
+    if scenario is None:
+        return False
+    for field, wanted in filters.items():
+        if wanted is None:
+            continue
+        if getattr(scenario, field) not in ([wanted] if isinstance(wanted, str) else wanted):
+            return False
+    return True
+
+
+def _lookup_names(filenames):
+    """
+    (lookup name, file name) pairs of one folder: every file under its own name, plus
+    report.json.gz (or .zst) as report.json when the folder has no plain report.json.
+    """
+    names = set(filenames)
+    pairs = [(f, f) for f in filenames]
+    for suffix in SUFFIXES:
+        for f in filenames:
+            plain = f[:-len(suffix)]
+            if f.endswith(suffix) and plain not in names:
+                names.add(plain)
+                pairs.append((plain, f))
+    return pairs
+
+
+def _files_in(path):
+    try:
+        with os.scandir(path) as it:
+            return [e.name for e in it if e.is_file()]
+    except OSError:
+        return []
+
+
+class ScenarioIndex:
+    """
+    In-memory index of the scenario folders under a reports root.
+
+    The tree is scanned once (one scandir per scenario folder and run-XXX folder). After
+    that, filtering and grouping work on per-field postings (field value -> scenario
+    positions), so a query never touches the filesystem again, however many scenarios
+    there are. Scenarios are kept sorted by name.
+    """
+
+    def __init__(self, reports_root, scenarios, files, skipped=()):
+        self.reports_root = reports_root
+        self.scenarios = sorted(scenarios, key=lambda s: s.name)
+        self.skipped = list(skipped)
+        self._files = files  # name -> {filename: [path per run, in run order]}
+        self._by_name = {s.name: i for i, s in enumerate(self.scenarios)}
+        self._postings = {field: {} for field in FIELDS}
+        for i, s in enumerate(self.scenarios):
+            for field in FIELDS:
+                self._postings[field].setdefault(getattr(s, field), []).append(i)
+        self._by_file = {}
+        for i, s in enumerate(self.scenarios):
+            for filename in files[s.name]:
+                self._by_file.setdefault(filename, []).append(i)
+
+    @classmethod
+    def scan(cls, reports_root="reports"):
+        """
+        Discover every <framework>-<device>-<page> folder of reports_root together with the
+        report files of its runs: <folder>/<file> and/or <folder>/run-XXX/<file>. Compressed
+        files are also found under their plain name (report.json -> report.json.gz).
+        Folders that do not follow the naming scheme are listed in .skipped.
+        """
+        scenarios, files, skipped = [], {}, []
+        try:
+            with os.scandir(reports_root) as it:
+                entries = sorted((e for e in it if e.is_dir()), key=lambda e: e.name)
+        except FileNotFoundError:
+            entries = []
+        for entry in entries:
+            scenario = parse_scenario_name(entry.name)
+            if scenario is None:
+                skipped.append(entry.name)
+                continue
+            by_file = {}
+            top, runs = [], []
+            with os.scandir(entry.path) as it:
+                for e in it:
+                    if e.is_file():
+                        top.append(e.name)
+                    elif e.is_dir() and fnmatch.fnmatch(e.name, RUN_DIR_PATTERN):
+                        runs.append(e)
+            for key, filename in _lookup_names(top):
+                by_file[key] = [os.path.join(reports_root, entry.name, filename)]
+            for run in sorted(runs, key=lambda e: e.name):
+                for key, filename in _lookup_names(_files_in(run.path)):
+                    by_file.setdefault(key, []).append(os.path.join(reports_root, entry.name, run.name, filename))
+            scenarios.append(scenario)
+            files[entry.name] = by_file
+        return cls(reports_root, scenarios, files, skipped)
+
+    def __len__(self):
+        return len(self.scenarios)
+
+    def __iter__(self):
+        return iter(self.scenarios)
+
+    def __contains__(self, name):
+        return name in self._by_name
+
+    def get(self, name):
+        i = self._by_name.get(name)
+        return None if i is None else self.scenarios[i]
+
+    def values(self, field):
+        """Distinct values of framework/device/page, sorted."""
+        return sorted(self._postings[field])
+
+    def run_files(self, name, filename):
+        """Paths of filename for every run of scenario name, in run order (same order as run_stats.run_paths)."""
+        return list(self._files.get(name, {}).get(filename, ()))
+
+    def run_count(self, name):
+        """Number of runs of the scenario's most complete report file."""
+        return max((len(paths) for paths in self._files.get(name, {}).values()), default=0)
+
+    def _positions(self, has=None, **filters):
+        selected = None
+        for field, wanted in filters.items():
+            if field not in self._postings:
+                raise ValueError(f"unknown scenario field {field!r} (expected one of {', '.join(FIELDS)})")
+            if wanted is None:
+                continue
+            wanted = [wanted] if isinstance(wanted, str) else wanted
+            hits = set()
+            for value in wanted:
+                hits.update(self._postings[field].get(value, ()))
+            selected = hits if selected is None else selected & hits
+        if has is not None:
+            hits = set(self._by_file.get(has, ()))
+            selected = hits if selected is None else selected & hits
+        return range(len(self.scenarios)) if selected is None else sorted(selected)
+
+    def select(self, has=None, **filters):
+        """
+        Scenarios matching every given field, e.g. select(device="mobile") or
+        select(has="report.json", framework=["react", "blazor"]). A field value may be a
+        string or a list of alternatives; has= keeps scenarios with at least one run of that file.
+        """
+        return [self.scenarios[i] for i in self._positions(has, **filters)]
+
+    def names(self, has=None, **filters):
+        return [self.scenarios[i].name for i in self._positions(has, **filters)]
+
+    def group_by(self, fields, has=None, **filters):
+        """
+        OrderedDict[key] -> [Scenario, ...] of the selected scenarios, keys sorted. fields is
+        one field name ("page" -> key "members") or a sequence of them (key is then a tuple),
+        so group_by("page") lines up react and blazor per page.
+        """
+        single = isinstance(fields, str)
+        fields = (fields,) if single else tuple(fields)
+        groups = {}
+        for s in self.select(has, **filters):
+            key = tuple(getattr(s, f) for f in fields)
+            groups.setdefault(key[0] if single else key, []).append(s)
+        return OrderedDict(sorted(groups.items()))
+
+    def missing(self, filename, **filters):
+        """
+        Scenario names that would complete the framework x device x page grid of the
+        scenarios having filename but have no such file themselves. Catches a run that
+        silently failed for one combination.
+        """
+        present = self.select(has=filename, **filters)
+        if not present:
+            return []
+        have = {(s.framework, s.device, s.page) for s in present}
+        frameworks = sorted({s.framework for s in present})
+        devices = sorted({s.device for s in present})
+        pages = sorted({s.page for s in present})
+        return [
+            f"{fw}-{dev}-{page}"
+            for fw in frameworks for dev in devices for page in pages
+            if (fw, dev, page) not in have
+        ]
+
+
+def add_scenario_arguments(parser):
+    parser.add_argument("--framework", action="append", metavar="NAME",
+                        help="only scenarios of this framework (repeatable)")
+    parser.add_argument("--device", action="append", metavar="NAME",
+                        help="only scenarios of this device, e.g. desktop or mobile (repeatable)")
+    parser.add_argument("--page", action="append", metavar="NAME", help="only scenarios of this page (repeatable)")
+
+
+def scenario_filters(args):
+    return {field: getattr(args, field) for field in FIELDS}
+
+
+def discover(reports_root, filename, filters=None):
+    """
+    Scan reports_root and return (index, names): the scenarios with at least one run of
+    filename that match filters. Expected-but-absent scenarios are reported as [MISS].
+    """
+    index = ScenarioIndex.scan(reports_root)
+    filters = filters or {}
+    for name in index.missing(filename, **filters):
+        print(f"[MISS] {os.path.join(reports_root, name, filename)} not found")
+    return index, index.names(has=filename, **filters)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List the scenarios found under a reports root")
+    parser.add_argument("--reports", default="reports", help="reports root directory (default: reports)")
+    parser.add_argument("--has", metavar="FILE", help="only scenarios with this report file, e.g. metrics.json")
+    parser.add_argument("--group-by", nargs="+", choices=FIELDS, default=[], metavar="FIELD",
+                        help=f"group the listing by one or more of: {', '.join(FIELDS)}")
+    add_scenario_arguments(parser)
+    args = parser.parse_args(argv)
+
+    index = ScenarioIndex.scan(args.reports)
+    filters = scenario_filters(args)
+    for name in index.skipped:
+        print(f"[SKIP] {os.path.join(args.reports, name)} is not named <framework>-<device>-<page>")
+    if args.group_by:
+        for key, members in index.group_by(args.group_by, has=args.has, **filters).items():
+            label = key if isinstance(key, str) else " / ".join(key)
+            print(f"{label}: {', '.join(s.name for s in members)}")
+    else:
+        for s in index.select(has=args.has, **filters):
+            print(f"{s.name}\t{s.framework}\t{s.device}\t{s.page}\t{index.run_count(s.name)} run(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import math
+
+# Relative accuracy of every quantile estimate: the reported value is within 1% of the true
+# sample value at that rank. Sketches with different accuracies cannot be merged.
+RELATIVE_ACCURACY = 0.01
+# Values at or below this (ms) share one "zero" bin: 0 ms requests are common and log(0) is not defined.
+MIN_VALUE = 1e-3
+
+QUANTILES = (50, 90, 99)
+
+
+class LogHistogram:
+    """
+    Mergeable quantile sketch: counts per logarithmic bin, bin i covering (gamma^(i-1), gamma^i]
+    with gamma = (1 + a) / (1 - a), a = relative accuracy (the DDSketch layout). Size grows
+    with the log of the value range, not with the number of values: 1 ms to 10 min at 1% is
+    under 700 bins. Merging two sketches adds their bin counts, so per-run sketches can be
+    combined across runs and scenarios without the raw values.
+    """
+
+    __slots__ = ("accuracy", "gamma", "_log_gamma", "bins", "zero", "count", "min", "max")
+
+    def __init__(self, accuracy=RELATIVE_ACCURACY):
+        self.accuracy = accuracy
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins = {}
+        self.zero = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        if value != value:  # NaN
+            return
+        if value <= MIN_VALUE:
+            self.zero += 1
+        else:
+            i = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[i] = self.bins.get(i, 0) + 1
+        self.count += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def add_many(self, values):
+        """Add a numpy array (or list) of values at once; NaN is ignored."""
+        import numpy as np
+
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if not values.size:
+            return
+        positive = values[values > MIN_VALUE]
+        self.zero += int(values.size - positive.size)
+        if positive.size:
+            keys, counts = np.unique(np.ceil(np.log(positive) / self._log_gamma).astype(np.int64), return_counts=True)
+            for i, n in zip(keys.tolist(), counts.tolist()):
+                self.bins[i] = self.bins.get(i, 0) + n
+        self.count += int(values.size)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def merge(self, other):
+        if other.accuracy != self.accuracy:
+            raise ValueError(f"cannot merge sketches of accuracy {other.accuracy} into {self.accuracy}")
+        for i, n in other.bins.items():
+            self.bins[i] = self.bins.get(i, 0) + n
+        self.zero += other.zero
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q):
+        """Estimate of the q-th percentile (0-100), nearest-rank; NaN for an empty sketch."""
+        if not self.count:
+            return math.nan
+        rank = max(math.ceil(q / 100.0 * self.count) - 1, 0)
+        if rank < self.zero:
+            return max(self.min, 0.0)
+        seen = self.zero
+        for i in sorted(self.bins):
+            seen += self.bins[i]
+            if seen > rank:
+                # Midpoint of the bin in relative terms: within `accuracy` of any value in it.
+                value = 2.0 * self.gamma ** i / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def to_dict(self):
+        """JSON-friendly form, as stored in scenario records and the extraction cache."""
+        keys = sorted(self.bins)
+        return {
+            "accuracy": self.accuracy,
+            "count": self.count,
+            "zero": self.zero,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "bins": keys,
+            "counts": [self.bins[i] for i in keys],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["accuracy"])
+        sketch.bins = dict(zip(data["bins"], data["counts"]))
+        sketch.zero = data["zero"]
+        sketch.count = data["count"]
+        if sketch.count:
+            sketch.min, sketch.max = data["min"], data["max"]
+        return sketch
+
+
+def sketch_of(values):
+    """Serialized sketch of an array of values."""
+    sketch = LogHistogram()
+    sketch.add_many(values)
+    return sketch.to_dict()
+
+
+def merge_sketches(sketches):
+    """Serialized merge of serialized sketches; None entries (no data) are skipped."""
+    merged = LogHistogram()
+    for data in sketches:
+        if data is not None:
+            merged.merge(LogHistogram.from_dict(data))
+    return merged.to_dict()
+
+
+def sketch_quantiles(data, quantiles=QUANTILES):
+    """[estimate per percentile] of a serialized sketch; NaN when it is missing or empty."""
+    if not data:
+        return [math.nan] * len(quantiles)
+    sketch = LogHistogram.from_dict(data)
+    return [sketch.quantile(q) for q in quantiles]
@@ -0,0 +1,21 @@
+import sys
+import time
+
+# Modules whose import dominates a cold start; the text-only commands should not load them.
+HEAVY_MODULES = ("numpy", "matplotlib", "matplotlib.pyplot")
+
+
+def add_timings_argument(parser):
+    parser.add_argument("--timings", action="store_true",
+                        help="report cold-start (import) time, command time and which heavy modules were loaded")
+
+
+def report_timings(started, imported, command):
+    """
+    started: time.perf_counter() taken as the script's first statement, imported: right after
+    its imports. Interpreter start-up itself (before the first statement) is not included.
+    """
+    done = time.perf_counter()
+    loaded = ", ".join(f"{m}={'yes' if m in sys.modules else 'no'}" for m in HEAVY_MODULES)
+    print(f"[TIME] imports {imported - started:.3f} s, {command} {done - imported:.3f} s, "
+          f"total {done - started:.3f} s ({loaded})")
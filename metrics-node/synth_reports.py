@@ -0,0 +1,277 @@
+import argparse
+import base64
+import csv
+import json
+import os
+import random
+import uuid
+
+FRAMEWORKS = ["blazor", "react"]
+DEVICES = ["desktop", "mobile"]
+
+# (contentType, url pattern, typical size in bytes, typical duration in ms)
+_RESOURCE_KINDS = [
+    ("application/json; charset=utf-8", "http://localhost:7004/api/v1/group/{guid}/members", 300, 80),
+    ("application/json; charset=utf-8", "http://localhost:7004/api/v1/user/select-group/{guid}", 150, 40),
+    ("application/json; charset=utf-8", "http://localhost:7004/api/v1/group/{guid}/anniversaries/{id}", 450, 60),
+    ("application/javascript", "http://localhost:7004/assets/chunk-{hex}.js", 40000, 30),
+    ("text/css", "http://localhost:7004/assets/style-{hex}.css", 8000, 15),
+    ("image/png", "http://localhost:7004/img/{id}.png", 12000, 20),
+    ("font/woff2", "http://localhost:7004/fonts/{hex}.woff2", 20000, 25),
+    ("application/wasm", "http://localhost:7004/_framework/{hex}.wasm", 250000, 120),
+]
+
+_MAINTHREAD_GROUPS = [
+    ("scriptEvaluation", "Script Evaluation"),
+    ("other", "Other"),
+    ("styleLayout", "Style & Layout"),
+    ("paintCompositeRender", "Rendering"),
+    ("parseHTML", "Parse HTML & CSS"),
+    ("scriptParseCompile", "Script Parsing & Compilation"),
+    ("garbageCollection", "Garbage Collection"),
+]
+
+
+def scenario_names(n):
+    """n scenario names <framework>-<device>-page<k>, cycling frameworks and devices fastest."""
+    per_page = len(FRAMEWORKS) * len(DEVICES)
+    return [
+        f"{FRAMEWORKS[k % len(FRAMEWORKS)]}-{DEVICES[(k // len(FRAMEWORKS)) % len(DEVICES)]}-page{k // per_page:05d}"
+        for k in range(n)
+    ]
+
+
+def _url(rng, pattern):
+    return pattern.format(
+        guid=uuid.UUID(int=rng.getrandbits(128), version=4),
+        id=rng.randint(1, 10 ** 6),
+        hex=f"{rng.getrandbits(40):010x}",
+    )
+
+
+def synth_requests(rng, n, t0=1755702916000):
+    """n metrics.json networkRequests; bursts of parallel requests separated by short idle gaps."""
+    requests = []
+    t = float(t0)
+    while len(requests) < n:
+        burst = min(rng.randint(1, 6), n - len(requests))
+        for _ in range(burst):
+            ct, pattern, size, duration = rng.choice(_RESOURCE_KINDS)
+            start = t + rng.uniform(0, 5)
+            dur = round(rng.lognormvariate(0, 0.5) * duration, 1)
+            requests.append({
+                "url": _url(rng, pattern),
+                "method": "GET" if rng.random() < 0.9 else "POST",
+                "type": "fetch" if ct.startswith("application/json") else "script",
+                "startTime": start,
+                "status": 200,
+                "contentType": ct,
+                "endTime": start + dur,
+                "duration": dur,
+                "size": int(rng.lognormvariate(0, 0.4) * size),
+            })
+        t = max(r["endTime"] for r in requests[-burst:]) + rng.uniform(0, 20)
+    return requests
+
+
+def synth_metrics(rng, n_requests):
+    fcp = rng.uniform(150, 3500)
+    return {
+        "webVitals": {
+            "FCP": round(fcp),
+            "TTFB": round(rng.uniform(100, 500), 1),
+            "LCP": round(fcp * rng.uniform(1.0, 2.5)),
+            "FID": round(rng.uniform(0.1, 3.0), 1),
+        },
+        "networkRequests": synth_requests(rng, n_requests),
+    }
+
+
+def _audit(audit_id, numeric, unit="millisecond", details=None):
+    audit = {
+        "id": audit_id,
+        "title": audit_id.replace("-", " ").title(),
+        "description": "Synthetic audit.",
+        "score": 0.5,
+        "scoreDisplayMode": "numeric",
+        "numericValue": numeric,
+        "numericUnit": unit,
+        "displayValue": f"{numeric / 1000:.1f} s" if unit == "millisecond" else f"{numeric:.3f}",
+    }
+    if details is not None:
+        audit["details"] = details
+    return audit
+
+
+def synth_report(rng, n_requests, filler_kb=0, n_filler_audits=150):
+    """
+    A Lighthouse-shaped report.json: the audits and categories collect_metrics_bootstrap.py
+    reads, network-requests/bootup-time/mainthread-work-breakdown details, and filler audits
+    plus a base64 screenshot of filler_kb kilobytes so files have a realistic share of
+    data the pipeline never looks at.
+    """
+    fcp = rng.uniform(800, 4000)
+    audits = {
+        "first-contentful-paint": _audit("first-contentful-paint", fcp),
+        "largest-contentful-paint": _audit("largest-contentful-paint", fcp * rng.uniform(1.0, 2.0)),
+        "total-blocking-time": _audit("total-blocking-time", rng.uniform(0, 600)),
+        "cumulative-layout-shift": _audit("cumulative-layout-shift", rng.uniform(0, 0.3), unit="unitless"),
+        "speed-index": _audit("speed-index", fcp * rng.uniform(1.0, 1.5)),
+        "interactive": _audit("interactive", fcp * rng.uniform(1.0, 8.0)),
+    }
+
+    items, t = [], 0.0
+    for _ in range(n_requests):
+        ct, pattern, size, duration = rng.choice(_RESOURCE_KINDS)
+        start = t + rng.uniform(0, 10)
+        end = start + rng.lognormvariate(0, 0.5) * duration
+        items.append({
+            "url": _url(rng, pattern),
+            "networkRequestTime": start,
+            "networkEndTime": end,
+            "finished": True,
+            "transferSize": int(rng.lognormvariate(0, 0.4) * size),
+            "resourceSize": int(size * 2.5),
+            "statusCode": 200,
+            "mimeType": ct.split(";", 1)[0],
+            "resourceType": "Script" if "javascript" in ct else "Fetch",
+        })
+        t = start
+    audits["network-requests"] = {"id": "network-requests", "title": "Network Requests", "score": None,
+                                  "scoreDisplayMode": "informative",
+                                  "details": {"type": "table", "headings": [], "items": items}}
+
+    scripts = sorted({it["url"] for it in items if it["mimeType"] == "application/javascript"})[:20]
+    bootup = [{"url": url, "total": rng.uniform(5, 300), "scripting": rng.uniform(1, 250),
+               "scriptParseCompile": rng.uniform(0, 20)} for url in scripts + ["Unattributable"]]
+    bootup.sort(key=lambda it: -it["total"])
+    audits["bootup-time"] = _audit("bootup-time", sum(it["total"] for it in bootup),
+                                   details={"type": "table", "headings": [], "items": bootup,
+                                            "summary": {"wastedMs": sum(it["total"] for it in bootup)}})
+    groups = [{"group": g, "groupLabel": label, "duration": rng.uniform(1, 400)} for g, label in _MAINTHREAD_GROUPS]
+    groups.sort(key=lambda it: -it["duration"])
+    audits["mainthread-work-breakdown"] = _audit("mainthread-work-breakdown", sum(it["duration"] for it in groups),
+                                                 details={"type": "table", "headings": [], "items": groups})
+
+    for k in range(n_filler_audits):
+        audits[f"synthetic-audit-{k:03d}"] = {
+            "id": f"synthetic-audit-{k:03d}", "title": "Filler", "description": "x" * rng.randint(50, 400),
+            "score": 1, "scoreDisplayMode": "binary",
+            "details": {"type": "table", "items": [{"node": {"snippet": "<div>" + "y" * 80 + "</div>"}}] * 3},
+        }
+    if filler_kb:
+        audits["final-screenshot"] = {
+            "id": "final-screenshot", "title": "Final Screenshot", "score": 1, "scoreDisplayMode": "informative",
+            "details": {"type": "screenshot",
+                        "data": "data:image/jpeg;base64," + base64.b64encode(rng.randbytes(filler_kb * 768)).decode()},
+        }
+
+    categories = {
+        cat: {"id": cat, "title": cat.title(), "score": round(rng.uniform(0.3, 1.0), 2), "auditRefs": []}
+        for cat in ("performance", "accessibility", "best-practices", "seo")
+    }
+    return {"lighthouseVersion": "12.0.0-synthetic", "requestedUrl": "http://localhost:7004/",
+            "audits": audits, "categories": categories, "i18n": {"rendererFormattedStrings": {}}}
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def _write_report_csv(path, report):
+    """The report.csv Lighthouse writes next to report.json: meta, category scores, then one row per audit."""
+    quoted = csv.QUOTE_ALL
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write('"requestedUrl","finalDisplayedUrl","fetchTime","gatherMode"\n')
+        csv.writer(f, quoting=quoted).writerow([report["requestedUrl"], report["requestedUrl"],
+                                                "2025-08-16T15:52:56.371Z", "navigation"])
+        f.write("\ncategory,score\n")
+        csv.writer(f, quoting=quoted).writerows([cat, str(c["score"])] for cat, c in report["categories"].items())
+        f.write("\ncategory,audit,score,displayValue,description\n")
+        csv.writer(f, quoting=quoted).writerows(
+            ["best-practices" if audit_id.startswith("synthetic-") else "performance", audit_id,
+             "null" if a.get("score") is None else str(a["score"]), a.get("displayValue", ""), a.get("description", "")]
+            for audit_id, a in report["audits"].items())
+
+
+def generate(out_dir, scenarios=16, requests=20, lighthouse=4, lighthouse_requests=40, runs=1, filler_kb=16,
+             total_requests=None, seed=0):
+    """
+    Write a synthetic reports tree into out_dir:
+      <scenario>/metrics.json for `scenarios` page scenarios (<framework>-<device>-pageNNNNN)
+      <framework>-<device>-bootstrap<k>/report.json (+ report.csv) for `lighthouse` Lighthouse scenarios
+    With runs > 1 every file goes to run-XXX/ sub folders instead. total_requests spreads
+    that many metrics.json requests over all scenarios and runs (overrides requests).
+    Returns a summary dict of what was written.
+    """
+    rng = random.Random(seed)
+    names = scenario_names(scenarios)
+    n_files = max(len(names) * runs, 1)
+    if total_requests is not None:
+        requests = max(total_requests // n_files, 1)
+
+    def targets(name, filename):
+        if runs == 1:
+            return [os.path.join(out_dir, name, filename)]
+        return [os.path.join(out_dir, name, f"run-{r:03d}", filename) for r in range(runs)]
+
+    written_requests = 0
+    for name in names:
+        for path in targets(name, "metrics.json"):
+            _write_json(path, synth_metrics(rng, requests))
+            written_requests += requests
+
+    lighthouse_names = [
+        f"{FRAMEWORKS[k % len(FRAMEWORKS)]}-{DEVICES[(k // len(FRAMEWORKS)) % len(DEVICES)]}-bootstrap"
+        + (f"{k // (len(FRAMEWORKS) * len(DEVICES)):04d}" if lighthouse > len(FRAMEWORKS) * len(DEVICES) else "")
+        for k in range(lighthouse)
+    ]
+    for name in lighthouse_names:
+        for path in targets(name, "report.json"):
+            report = synth_report(rng, lighthouse_requests, filler_kb)
+            _write_json(path, report)
+            _write_report_csv(os.path.join(os.path.dirname(path), "report.csv"), report)
+
+    return {
+        "out_dir": out_dir,
+        "scenarios": len(names),
+        "lighthouse_scenarios": len(lighthouse_names),
+        "runs": runs,
+        "metrics_requests": written_requests,
+        "requests_per_file": requests,
+        "lighthouse_requests_per_file": lighthouse_requests,
+        "seed": seed,
+    }
+
+
+def add_generator_arguments(parser):
+    parser.add_argument("--scenarios", type=int, default=16, help="page scenarios with metrics.json (default: 16)")
+    parser.add_argument("--requests", type=int, default=20, help="network requests per metrics.json (default: 20)")
+    parser.add_argument("--total-requests", type=int, metavar="N",
+                        help="spread N requests over all metrics.json files instead of --requests per file")
+    parser.add_argument("--lighthouse", type=int, default=4, help="Lighthouse scenarios with report.json (default: 4)")
+    parser.add_argument("--lighthouse-requests", type=int, default=40,
+                        help="network-requests items per report.json (default: 40)")
+    parser.add_argument("--runs", type=int, default=1, help="runs per scenario; > 1 writes run-XXX/ folders")
+    parser.add_argument("--filler-kb", type=int, default=16,
+                        help="size of the unused screenshot blob per report.json in KB (default: 16)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed; the same seed writes the same tree")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Write a synthetic reports tree (metrics.json and Lighthouse report.json) for scale testing, "
+                    "e.g. --scenarios 10000 or --total-requests 1000000"
+    )
+    parser.add_argument("out_dir", help="reports root to create")
+    add_generator_arguments(parser)
+    args = parser.parse_args(argv)
+    summary = generate(args.out_dir, args.scenarios, args.requests, args.lighthouse, args.lighthouse_requests,
+                       args.runs, args.filler_kb, args.total_requests, args.seed)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import html
+import os
+
+from profiling import stage
+
+ROWS_PER_PAGE = 80
+TABLE_FORMATS = ("png", "html", "svg")
+
+FONT_SIZE = 8  # pt
+ROW_HEIGHT = 0.2  # inches per table row
+CHAR_WIDTH = 0.6 * FONT_SIZE / 72  # inches per character of the monospace font
+CELL_PAD = 2  # characters of padding per column
+HEADER_COLOR = "#f0f0f0"
+STRIPE_COLOR = "#fafafa"
+GRID_COLOR = "#cccccc"
+MARGIN = 0.1  # inches around PNG pages
+
+
+def column_widths(headers, rows):
+    """Width in characters of every column over the header and all rows, so every page lines up."""
+    widths = [len(str(h)) for h in headers]
+    for row in rows:
+        for j, cell in enumerate(row):
+            n = len(str(cell))
+            if n > widths[j]:
+                widths[j] = n
+    return [w + CELL_PAD for w in widths]
+
+
+def page_paths(output_path, n_pages):
+    """output_path for the first page; <stem>-p2<ext>, <stem>-p3<ext>, ... for the rest."""
+    stem, ext = os.path.splitext(output_path)
+    return [output_path] + [f"{stem}-p{k}{ext}" for k in range(2, n_pages + 1)]
+
+
+def existing_pages(output_path):
+    """output_path followed by the <stem>-pN<ext> pages after it that exist on disk."""
+    stem, ext = os.path.splitext(output_path)
+    paths = [output_path]
+    while os.path.exists(f"{stem}-p{len(paths) + 1}{ext}"):
+        paths.append(f"{stem}-p{len(paths) + 1}{ext}")
+    return paths
+
+
+def remove_stale_pages(output_path, n_pages):
+    """Delete pages past n_pages left over from an earlier, longer table, which would otherwise look current."""
+    stem, ext = os.path.splitext(output_path)
+    k = n_pages + 1
+    while os.path.exists(f"{stem}-p{k}{ext}"):
+        os.remove(f"{stem}-p{k}{ext}")
+        k += 1
+
+
+def paginate(rows, rows_per_page=ROWS_PER_PAGE):
+    """rows in pages of at most rows_per_page rows; an empty table is one empty page."""
+    return [rows[i:i + rows_per_page] for i in range(0, len(rows), rows_per_page)] or [[]]
+
+
+def _edges(widths):
+    edges, x = [0], 0
+    for w in widths:
+        x += w
+        edges.append(x)
+    return edges
+
+
+def _draw_page(headers, rows, widths, output_path, title, dpi):
+    from render_stage import pyplot
+    plt = pyplot()
+
+    total = sum(widths)
+    height = (len(rows) + 1) * ROW_HEIGHT
+    title_h = 0.3 if title else 0.0
+    fig = plt.figure(figsize=(total * CHAR_WIDTH + 2 * MARGIN, height + title_h + 2 * MARGIN))
+    # The axes cover exactly the table area, so fixed column widths are the same on every page.
+    ax = fig.add_axes([MARGIN / fig.get_figwidth(), MARGIN / fig.get_figheight(),
+                       total * CHAR_WIDTH / fig.get_figwidth(), height / fig.get_figheight()])
+    ax.axis("off")
+    cells = [[str(c) for c in row] for row in rows] or [[""] * len(headers)]
+    table = ax.table(cellText=cells, colLabels=headers, colWidths=[w / total for w in widths],
+                     cellLoc="left", colLoc="left", bbox=[0, 0, 1, 1])
+    table.auto_set_font_size(False)
+    table.set_fontsize(FONT_SIZE)
+    for (row, col), cell in table.get_celld().items():
+        cell.PAD = 0.5 / widths[col]  # half a character, as a fraction of the cell width
+        cell.set_edgecolor(GRID_COLOR)
+        cell.get_text().set_fontfamily("monospace")
+        if row == 0:
+            cell.set_text_props(weight="bold")
+            cell.set_facecolor(HEADER_COLOR)
+        elif row % 2 == 0:
+            cell.set_facecolor(STRIPE_COLOR)
+    if title:
+        fig.suptitle(title, y=1 - MARGIN / fig.get_figheight(), va="top", fontsize=FONT_SIZE + 1, weight="bold")
+    with stage("render.savefig"):
+        fig.savefig(output_path, dpi=dpi)
+    plt.close(fig)
+
+
+def render_table_png(headers, rows, output_path, title=None, rows_per_page=ROWS_PER_PAGE, dpi=150):
+    """
+    Draw rows as one or more PNG pages of at most rows_per_page rows (page_paths naming)
+    with ax.table. Column widths come from the whole table and the text is monospace, so
+    the pages line up. Returns the page paths.
+    """
+    widths = column_widths(headers, rows)
+    pages = paginate(rows, rows_per_page)
+    paths = page_paths(output_path, len(pages))
+    for k, (page, path) in enumerate(zip(pages, paths), 1):
+        page_title = f"{title} ({k}/{len(pages)})" if title and len(pages) > 1 else title
+        _draw_page(headers, page, widths, path, page_title, dpi)
+    remove_stale_pages(output_path, len(pages))
+    return paths
+
+
+def write_table_html(headers, rows, output_path, title=None):
+    """The table as a standalone HTML page; written line by line, no matplotlib involved."""
+    esc = html.escape
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write("<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\">")
+        f.write(f"<title>{esc(title or os.path.basename(output_path))}</title>\n<style>"
+                "body{font:13px sans-serif}table{border-collapse:collapse}"
+                f"th{{background:{HEADER_COLOR};position:sticky;top:0}}"
+                "th,td{border:1px solid #ccc;padding:2px 6px;text-align:left;white-space:nowrap}"
+                f"tr:nth-child(even) td{{background:{STRIPE_COLOR}}}</style></head><body>\n")
+        if title:
+            f.write(f"<h3>{esc(title)}</h3>\n")
+        f.write("<table><thead><tr>" + "".join(f"<th>{esc(str(h))}</th>" for h in headers) + "</tr></thead><tbody>\n")
+        for row in rows:
+            f.write("<tr>" + "".join(f"<td>{esc(str(c))}</td>" for c in row) + "</tr>\n")
+        f.write("</tbody></table></body></html>\n")
+    return [output_path]
+
+
+def write_table_svg(headers, rows, output_path, title=None):
+    """The table as one SVG with the same column widths as the PNG pages, unpaginated."""
+    esc = html.escape
+    widths = column_widths(headers, rows)
+    char_px, row_px = CHAR_WIDTH * 96, ROW_HEIGHT * 96
+    edges = [e * char_px for e in _edges(widths)]
+    top = row_px if title else 0
+    width, height = edges[-1], top + (len(rows) + 1) * row_px
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" height="{height:.0f}" '
+                f'font-family="monospace" font-size="{FONT_SIZE * 96 / 72:.1f}">\n')
+        if title:
+            f.write(f'<text x="2" y="{row_px * 0.7:.1f}" font-weight="bold">{esc(title)}</text>\n')
+        f.write(f'<rect x="0" y="{top:.1f}" width="{width:.1f}" height="{row_px:.1f}" fill="{HEADER_COLOR}"/>\n')
+        for i, row in enumerate([headers] + list(rows)):
+            y = top + i * row_px
+            if i and i % 2 == 0:
+                f.write(f'<rect x="0" y="{y:.1f}" width="{width:.1f}" height="{row_px:.1f}" fill="{STRIPE_COLOR}"/>\n')
+            weight = ' font-weight="bold"' if i == 0 else ""
+            f.write(f'<g{weight}>' + "".join(
+                f'<text x="{edges[j] + char_px / 2:.1f}" y="{y + row_px * 0.7:.1f}">{esc(str(c))}</text>'
+                for j, c in enumerate(row)) + "</g>\n")
+        f.write(f'<path stroke="{GRID_COLOR}" stroke-width="0.5" d="'
+                + "".join(f"M0 {top + i * row_px:.1f}H{width:.1f}" for i in range(len(rows) + 2))
+                + "".join(f"M{x:.1f} {top:.1f}V{height:.1f}" for x in edges) + '"/>\n</svg>\n')
+    return [output_path]
+
+
+def render_table(headers, rows, output_path, title=None, rows_per_page=ROWS_PER_PAGE):
+    """Write the table in the format given by output_path's extension (.png, .html or .svg); returns the files."""
+    ext = os.path.splitext(output_path)[1].lower()
+    if ext == ".html":
+        return write_table_html(headers, rows, output_path, title)
+    if ext == ".svg":
+        return write_table_svg(headers, rows, output_path, title)
+    return render_table_png(headers, rows, output_path, title, rows_per_page)
+
+
+def add_table_format_argument(parser):
+    parser.add_argument("--table-format", choices=TABLE_FORMATS, default="png",
+                        help="table outputs as paginated PNG images (default), one HTML page or one SVG")
+
+
+def table_output(path, table_format):
+    """path with its extension replaced by table_format's."""
+    return os.path.splitext(path)[0] + "." + table_format
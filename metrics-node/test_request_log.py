@@ -0,0 +1,30 @@
+import pytest
+
+from request_log import aggregate_requests_stream
+
+REQUESTS = [
+    {"contentType": "application/json", "duration": 10, "size": "1.5"},
+    {"contentType": "application/json", "duration": "20", "size": 2.7},
+    {"contentType": "application/json; charset=utf-8", "startTime": "5", "endTime": 9, "size": "3"},
+    {"contentType": "text/css", "duration": None, "size": 100},
+    {"contentType": "text/css", "duration": 1.5, "size": "x"},
+]
+
+
+def totals(by_ct):
+    return {ct: (b["count"], b["total_duration_ms"], b["total_size_bytes"]) for ct, b in by_ct.items()}
+
+
+def test_stream_accepts_string_and_float_sizes():
+    assert totals(aggregate_requests_stream(REQUESTS)) == {
+        "application/json": (3, 34.0, 6),
+        "text/css": (1, 1.5, 0),
+    }
+
+
+def test_stream_matches_batch_aggregation():
+    pytest.importorskip("numpy")
+    from collect_metrics import aggregate_by_content_type, request_columns
+
+    batch = aggregate_by_content_type(request_columns(REQUESTS))
+    assert totals(aggregate_requests_stream(REQUESTS)) == totals(batch)
@@ -0,0 +1,39 @@
+import os
+
+import pytest
+
+from table_render import CELL_PAD, column_widths, page_paths, paginate, render_table_png
+
+HEADERS = ["Folder", "Content-Type", "Count"]
+
+
+def test_paginate_splits_rows_into_full_pages_and_a_remainder():
+    rows = [[i] for i in range(7)]
+    assert paginate(rows, 3) == [[[0], [1], [2]], [[3], [4], [5]], [[6]]]
+    assert paginate(rows, 7) == [rows]
+    assert paginate([], 3) == [[]]
+
+
+def test_page_paths_keep_the_first_name():
+    assert page_paths("t.png", 3) == ["t.png", "t-p2.png", "t-p3.png"]
+
+
+def test_column_widths_span_header_and_every_row():
+    rows = [["a", "application/javascript", 1], ["react-long-name", "text/css", 12345]]
+    assert column_widths(HEADERS, rows) == [15 + CELL_PAD, 22 + CELL_PAD, 5 + CELL_PAD]
+
+
+def test_pages_share_column_widths(tmp_path):
+    pytest.importorskip("matplotlib")
+    from PIL import Image
+
+    rows = [["f", "text/css", i] for i in range(5)] + [["a-much-longer-folder", "application/json", 99]]
+    output = str(tmp_path / "t.png")
+    paths = render_table_png(HEADERS, rows, output, title="t", rows_per_page=4)
+    assert paths == page_paths(output, 2)
+    assert all(os.path.exists(p) for p in paths)
+    widths = {Image.open(p).size[0] for p in paths}
+    assert len(widths) == 1
+
+    render_table_png(HEADERS, rows[:2], output, rows_per_page=4)
+    assert not os.path.exists(paths[1])
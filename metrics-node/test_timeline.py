@@ -0,0 +1,41 @@
+from timeline import analyze_timeline, request_intervals, _longest_chain
+
+
+def columns(*spans):
+    return {
+        "start": [s for s, _e in spans],
+        "end": [e for _s, e in spans],
+        "duration": [e - s for s, e in spans],
+    }
+
+
+def test_zero_length_requests_at_same_timestamp():
+    a = analyze_timeline(columns((5, 5), (5, 5)))
+    assert a["peak_in_flight"] == 2
+    assert a["span_ms"] == 0
+    assert sorted(a["chain"]) == [0, 1]
+
+
+def test_duplicate_timestamps_chain_and_concurrency():
+    cols = columns((0, 5), (5, 5), (5, 5), (5, 20), (30, 40), (30, 40))
+    a = analyze_timeline(cols)
+    assert a["peak_in_flight"] == 3
+    assert a["gaps"] == [(20, 10)]
+    assert len(a["chain"]) == 5
+    intervals = request_intervals(cols)
+    path = _longest_chain(intervals, 25.0)
+    for p, q in zip(path, path[1:]):
+        assert p < q
+
+
+def test_touching_requests_do_not_overlap():
+    a = analyze_timeline(columns((0, 10), (10, 20)))
+    assert a["peak_in_flight"] == 1
+    assert a["span_ms"] == 20
+
+
+def test_idle_time_is_float_without_gaps():
+    a = analyze_timeline(columns((0, 10), (5, 20)))
+    assert a["gaps"] == []
+    assert isinstance(a["idle_ms"], float)
+    assert isinstance(a["summed_ms"], float)
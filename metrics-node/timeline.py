@@ -0,0 +1,302 @@
+import argparse
+import math
+import os
+import statistics
+from collections import OrderedDict, deque
+
+from endpoints import url_template
+from profiling import stage
+
+# A request starting at most this long after another one ended is taken to depend on it.
+CHAIN_GAP_MS = 25.0
+
+WATERFALL_DIR = "waterfalls"
+
+
+def request_intervals(columns):
+    """
+    (start, end, index) of every request with a known start, ordered by start. end falls back
+    to start + duration; requests with neither end nor duration, or ending before they
+    start, are left out.
+    """
+    intervals = []
+    for i, (start, end, duration) in enumerate(zip(columns["start"], columns["end"], columns["duration"])):
+        if start is None or math.isnan(start):
+            continue
+        if end is None or math.isnan(end):
+            if duration is None or math.isnan(duration):
+                continue
+            end = start + duration
+        if end >= start:
+            intervals.append((start, end, i))
+    intervals.sort()
+    return intervals
+
+
+def _longest_chain(intervals, gap_ms):
+    # Longest sequence of requests each starting within gap_ms after the previous one ended.
+    # Requests are visited by start; finished requests enter a window ordered by end and
+    # leave it once they ended more than gap_ms before the current start. Both happen in end
+    # order, so a monotonic deque gives the best chain in the window in O(1) amortized.
+    # Only requests visited before j may precede it; with (end, start, position) order the
+    # first one that was not is a zero-length request at j's start, as is everything after
+    # it that already ended, so admission stops there until that request has been visited.
+    n = len(intervals)
+    by_end = sorted(range(n), key=lambda k: (intervals[k][1], intervals[k][0], k))
+    chain = [1] * n
+    prev = [None] * n
+    window = deque()  # positions with decreasing chain length
+    pending = deque()  # positions entered, in end order, for expiry
+    nxt = 0
+    for j, (start, _end, _i) in enumerate(intervals):
+        while nxt < n and intervals[by_end[nxt]][1] <= start:
+            k = by_end[nxt]
+            if k >= j:
+                break
+            nxt += 1
+            pending.append(k)
+            while window and chain[window[-1]] <= chain[k]:
+                window.pop()
+            window.append(k)
+        while pending and intervals[pending[0]][1] < start - gap_ms:
+            k = pending.popleft()
+            if window and window[0] == k:
+                window.popleft()
+        if window:
+            chain[j] = chain[window[0]] + 1
+            prev[j] = window[0]
+    if not n:
+        return []
+    j = max(range(n), key=lambda k: (chain[k], -intervals[k][0]))
+    path = []
+    while j is not None:
+        path.append(j)
+        j = prev[j]
+    return path[::-1]
+
+
+def analyze_timeline(columns, gap_ms=CHAIN_GAP_MS):
+    """
+    Sweep over the request intervals of one run (collect_metrics.request_columns output):
+      span_ms          wall-clock time with at least one request in flight
+      window_ms        first request start to last request end
+      summed_ms        plain sum of durations (what content-type totals add up)
+      peak_in_flight   maximum number of overlapping requests
+      avg_in_flight    summed_ms / span_ms, mean concurrency while the network is busy
+      gaps             [(start offset ms, length ms)] idle periods inside the window
+      chain            request indices of the longest back-to-back chain (see CHAIN_GAP_MS)
+      chain_ms         first start to last end of that chain
+    Sorting dominates, so the whole pass is O(n log n).
+    """
+    intervals = request_intervals(columns)
+    if not intervals:
+        return None
+    # At equal t: ends (0) before starts (1), so a request ending exactly when another starts
+    # does not overlap it; zero-length requests end last (2), after they started.
+    events = sorted([(s, 1, 1) for s, _e, _i in intervals]
+                    + [(e, 0 if e > s else 2, -1) for s, e, _i in intervals])
+    origin = intervals[0][0]
+    in_flight = peak = 0
+    busy_since = None
+    span = 0.0
+    gaps = []
+    last_idle = None
+    for t, _order, delta in events:
+        if delta > 0:
+            if in_flight == 0:
+                busy_since = t
+                if last_idle is not None and t > last_idle:
+                    gaps.append((last_idle - origin, t - last_idle))
+            in_flight += 1
+            peak = max(peak, in_flight)
+        else:
+            in_flight -= 1
+            if in_flight == 0:
+                span += t - busy_since
+                last_idle = t
+    summed = sum((e - s for s, e, _i in intervals), 0.0)
+    chain = _longest_chain(intervals, gap_ms)
+    return {
+        "requests": len(intervals),
+        "origin": origin,
+        "span_ms": span,
+        "window_ms": max(e for _s, e, _i in intervals) - origin,
+        "summed_ms": summed,
+        "peak_in_flight": peak,
+        "avg_in_flight": summed / span if span else float(peak),
+        "gaps": gaps,
+        "idle_ms": sum((g for _t, g in gaps), 0.0),
+        "longest_gap_ms": max((g for _t, g in gaps), default=0.0),
+        "chain": [intervals[k][2] for k in chain],
+        "chain_ms": intervals[chain[-1]][1] - intervals[chain[0]][0] if chain else 0.0,
+    }
+
+
+SUMMARY_FIELDS = [
+    ("requests", "Requests"),
+    ("span_ms", "Span (ms)"),
+    ("window_ms", "Window (ms)"),
+    ("summed_ms", "Summed Duration (ms)"),
+    ("peak_in_flight", "Peak In-Flight"),
+    ("avg_in_flight", "Avg In-Flight"),
+    ("idle_ms", "Idle (ms)"),
+    ("longest_gap_ms", "Longest Gap (ms)"),
+    ("chain_len", "Chain Length"),
+    ("chain_ms", "Chain (ms)"),
+]
+
+
+def timeline_index(scenarios, gap_ms=CHAIN_GAP_MS):
+    """
+    dict[scenario] -> {"runs": [analyze_timeline() per run], "summary": {field: median over runs},
+    "representative": position of the run with the median span (drawn as the waterfall),
+    "representative_analysis": that run's analyze_timeline()}.
+    """
+    out = OrderedDict()
+    for d, runs in scenarios.items():
+        analyses = [(k, analyze_timeline(run["network_requests"], gap_ms)) for k, run in enumerate(runs)]
+        analyses = [(k, a) for k, a in analyses if a is not None]
+        if not analyses:
+            continue
+        for _k, a in analyses:
+            a["chain_len"] = len(a["chain"])
+        summary = {f: statistics.median(a[f] for _k, a in analyses) for f, _label in SUMMARY_FIELDS}
+        representative, analysis = sorted(analyses, key=lambda ka: ka[1]["span_ms"])[(len(analyses) - 1) // 2]
+        out[d] = {
+            "runs": [a for _k, a in analyses],
+            "summary": summary,
+            "representative": representative,
+            "representative_analysis": analysis,
+        }
+    return out
+
+
+def write_timeline_table(index, output_path="network-timeline.txt"):
+    lines = ["# Network timeline per folder (median over runs)"]
+    lines.append("Folder\tRuns\t" + "\t".join(label for _f, label in SUMMARY_FIELDS))
+    for folder, t in index.items():
+        values = [round(t["summary"][f], 2) for f, _label in SUMMARY_FIELDS]
+        lines.append(f"{folder}\t{len(t['runs'])}\t" + "\t".join(str(v) for v in values))
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    print(f"Saved timeline table -> {output_path}")
+
+
+def print_timeline(index, scenarios):
+    header = (f"{'Directory':35} {'Req':>4} {'Span':>8} {'Summed':>8} {'Peak':>5} {'Avg':>5} "
+              f"{'Idle':>8} {'Chain':>6} {'Chain ms':>9}")
+    print("\nNetwork timeline (ms, median over runs)")
+    print(header)
+    print("-" * len(header))
+    for d, t in index.items():
+        s = t["summary"]
+        print(f"{d:35} {s['requests']:>4.0f} {s['span_ms']:>8.1f} {s['summed_ms']:>8.1f} "
+              f"{s['peak_in_flight']:>5.0f} {s['avg_in_flight']:>5.2f} {s['idle_ms']:>8.1f} "
+              f"{s['chain_len']:>6.0f} {s['chain_ms']:>9.1f}")
+    print("\nLongest request chain (representative run)")
+    for d, t in index.items():
+        run = scenarios[d][t["representative"]]["network_requests"]
+        chain = t["representative_analysis"]["chain"]
+        if len(chain) > 1:
+            steps = " -> ".join(f"{run['method'][i] or 'GET'} {url_template(run['url'][i] or '')}" for i in chain)
+            print(f"  {d}: {steps}")
+
+
+def generate_waterfall_chart(columns, output_path, title="", gap_ms=CHAIN_GAP_MS):
+    """Horizontal bar per request (offset from the first start), coloured by content type; the longest chain is outlined."""
+    import numpy as np
+
+    from render_stage import pyplot
+    plt = pyplot()
+
+    analysis = analyze_timeline(columns, gap_ms)
+    if analysis is None:
+        print(f"No timed requests for waterfall {output_path}")
+        return
+    intervals = request_intervals(columns)
+    chain = set(analysis["chain"])
+    origin = analysis["origin"]
+    types = sorted({columns["content_type"][i] for _s, _e, i in intervals})
+    cmap = plt.get_cmap("tab10")
+    colors = {ct: cmap(k % 10) for k, ct in enumerate(types)}
+
+    n = len(intervals)
+    fig, ax = plt.subplots(figsize=(12, max(2.5, 0.28 * n + 1.5)))
+    y = np.arange(n)
+    lefts = [s - origin for s, _e, _i in intervals]
+    widths = [max(e - s, 0.5) for s, e, _i in intervals]
+    bars = ax.barh(y, widths, left=lefts, height=0.6,
+                   color=[colors[columns["content_type"][i]] for _s, _e, i in intervals])
+    for bar, (_s, _e, i) in zip(bars, intervals):
+        if i in chain and len(chain) > 1:
+            bar.set_edgecolor("black")
+            bar.set_linewidth(1.2)
+    for gap_start, gap_len in analysis["gaps"]:
+        ax.axvspan(gap_start, gap_start + gap_len, color="#dddddd", alpha=0.6, zorder=0)
+
+    labels = [url_template(columns["url"][i] or "")[-48:] for _s, _e, i in intervals]
+    ax.set_yticks(y)
+    ax.set_yticklabels(labels, fontsize=7)
+    ax.invert_yaxis()
+    ax.set_xlabel("ms since first request")
+    ax.set_title(f"{title}  (span {analysis['span_ms']:.0f} ms, peak {analysis['peak_in_flight']} in flight, "
+                 f"chain {len(analysis['chain'])} / {analysis['chain_ms']:.0f} ms)", fontsize=10)
+    handles = [plt.Rectangle((0, 0), 1, 1, color=colors[ct]) for ct in types]
+    ax.legend(handles, types, fontsize=7, loc="upper left", bbox_to_anchor=(1.0, 1.0))
+    ax.grid(axis="x", linestyle="--", alpha=0.3)
+    fig.tight_layout()
+    with stage("render.savefig"):
+        fig.savefig(output_path, dpi=150)
+    plt.close(fig)
+    print(f"Saved waterfall -> {output_path}")
+
+
+def waterfall_jobs(index, scenarios, output_dir=WATERFALL_DIR, gap_ms=CHAIN_GAP_MS):
+    """RenderJobs drawing one waterfall per scenario (its representative run) into output_dir."""
+    from render_stage import RenderJob
+
+    os.makedirs(output_dir, exist_ok=True)
+    return [
+        RenderJob(generate_waterfall_chart, (scenarios[d][t["representative"]]["network_requests"],),
+                  {"output_path": os.path.join(output_dir, f"{d}.png"), "title": d, "gap_ms": gap_ms})
+        for d, t in index.items()
+    ]
+
+
+def main(argv=None):
+    from collect_metrics import load_scenarios
+    from render_stage import add_render_arguments, open_render_cache, render_all
+    from report_cache import add_cache_arguments, open_cache, report_cache_stats
+    from scenario_index import add_scenario_arguments, discover, scenario_filters
+
+    parser = argparse.ArgumentParser(description="Network concurrency, idle gaps and request chains per scenario")
+    parser.add_argument("--reports", default="reports", help="reports root directory (default: reports)")
+    parser.add_argument("--gap", type=float, default=CHAIN_GAP_MS,
+                        help=f"max ms between one request's end and the next one's start to count as a chain "
+                             f"(default: {CHAIN_GAP_MS})")
+    parser.add_argument("--output", metavar="FILE", help="also write the table as TSV")
+    parser.add_argument("--waterfall", action="store_true", help=f"draw one waterfall chart per scenario into {WATERFALL_DIR}/")
+    add_scenario_arguments(parser)
+    add_cache_arguments(parser)
+    add_render_arguments(parser)
+    args = parser.parse_args(argv)
+
+    index, dirs = discover(args.reports, "metrics.json", scenario_filters(args))
+    cache = open_cache(args, args.reports)
+    try:
+        scenarios = load_scenarios(dirs, args.reports, cache=cache, index=index)
+    finally:
+        if cache is not None:
+            cache.close()
+    report_cache_stats(cache)
+
+    timelines = timeline_index(scenarios, args.gap)
+    print_timeline(timelines, scenarios)
+    if args.output:
+        write_timeline_table(timelines, args.output)
+    if args.waterfall:
+        render_all(waterfall_jobs(timelines, scenarios, gap_ms=args.gap), open_render_cache(args, args.reports))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,395 @@
+import argparse
+import ctypes
+import ctypes.util
+import fnmatch
+import os
+import select
+import struct
+import sys
+import time
+from collections import OrderedDict
+
+from compressed import strip_suffix, with_suffixes
+from run_stats import RUN_DIR_PATTERN
+
+METRICS_FILE = "metrics.json"
+REPORT_FILE = "report.json"
+WATCHED_FILES = (METRICS_FILE, REPORT_FILE)
+
+DEFAULT_INTERVAL = 2.0  # seconds between polling scans
+# A batch of changes is processed once the tree has been quiet this long, so a matrix step
+# writing several files (or one file in pieces, seen by the poller) is picked up once.
+DEFAULT_SETTLE = 1.0
+
+# <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len; followed by len bytes of NUL-padded name
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+
+
+def _run_dirs(scenario_dir):
+    try:
+        with os.scandir(scenario_dir) as it:
+            return [e.path for e in it if e.is_dir() and fnmatch.fnmatch(e.name, RUN_DIR_PATTERN)]
+    except OSError:
+        return []
+
+
+def _report_dirs(reports_root):
+    """Every directory a report file can appear in: the root, the scenario folders and their run-XXX folders."""
+    dirs = [reports_root]
+    try:
+        with os.scandir(reports_root) as it:
+            scenarios = [e.path for e in it if e.is_dir()]
+    except FileNotFoundError:
+        return dirs
+    for scenario in scenarios:
+        dirs.append(scenario)
+        dirs.extend(_run_dirs(scenario))
+    return dirs
+
+
+def _report_files(dirs, filenames):
+    files = {}
+    for d in dirs:
+        for filename in filenames:
+            path = os.path.join(d, filename)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            files[path] = (st.st_size, st.st_mtime_ns)
+    return files
+
+
+class PollingWatcher:
+    """Portable fallback: rescans the report tree every `interval` seconds and diffs (size, mtime) per file."""
+
+    name = "polling"
+
+    def __init__(self, reports_root, filenames=WATCHED_FILES, interval=DEFAULT_INTERVAL):
+        self.reports_root = reports_root
+        self.filenames = filenames
+        self.interval = interval
+        self._files = _report_files(_report_dirs(reports_root), filenames)
+
+    def changes(self, timeout):
+        """Paths created, modified or removed since the previous call; waits up to max(timeout, interval)."""
+        time.sleep(max(timeout, self.interval))
+        files = _report_files(_report_dirs(self.reports_root), self.filenames)
+        changed = {p for p, identity in files.items() if self._files.get(p) != identity}
+        changed.update(p for p in self._files if p not in files)
+        self._files = files
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """
+    Linux inotify on the reports root, every scenario folder and every run-XXX folder, so
+    only the directories that changed are looked at. A file counts once it is closed after
+    writing or moved into place; new scenario and run folders are watched as they appear.
+    """
+
+    name = "inotify"
+
+    def __init__(self, reports_root, filenames=WATCHED_FILES):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self._libc = libc
+        self.reports_root = os.path.normpath(reports_root)
+        self.filenames = filenames
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs = {}  # wd -> directory
+        for d in _report_dirs(self.reports_root):
+            self._watch(d)
+
+    def _watch(self, directory):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(err, f"inotify_add_watch {directory}: {os.strerror(err)}")
+        self._dirs[wd] = directory
+
+    def _depth(self, directory):
+        rel = os.path.relpath(directory, self.reports_root)
+        return 0 if rel == "." else rel.count(os.sep) + 1
+
+    def _added_dir(self, directory, changed):
+        # Files (and run folders) can land in a new folder before its watch exists.
+        self._watch(directory)
+        dirs = [directory]
+        if self._depth(directory) == 1:
+            dirs += _run_dirs(directory)
+            for d in dirs[1:]:
+                self._watch(d)
+        changed.update(_report_files(dirs, self.filenames))
+
+    def changes(self, timeout):
+        """Paths created, modified or removed since the previous call; waits up to timeout seconds for the first."""
+        changed = set()
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return changed
+        data = os.read(self._fd, 1 << 16)
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0")
+            offset += _EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped: report every file, the caller re-reads them from the cache.
+                changed.update(_report_files(_report_dirs(self.reports_root), self.filenames))
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                del self._dirs[wd]
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & IN_ISDIR:
+                depth = self._depth(directory)
+                if mask & (IN_CREATE | IN_MOVED_TO) and (depth == 0 or (
+                        depth == 1 and fnmatch.fnmatch(os.fsdecode(name), RUN_DIR_PATTERN))):
+                    self._added_dir(path, changed)
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    changed.add(path)
+            elif os.path.basename(path) in self.filenames and mask & (IN_CLOSE_WRITE | IN_MOVED_TO | IN_DELETE |
+                                                                      IN_MOVED_FROM):
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+def open_watcher(reports_root, filenames=WATCHED_FILES, poll=False, interval=DEFAULT_INTERVAL):
+    """inotify on Linux unless poll is set; polling wherever inotify cannot be used. Compressed variants count too."""
+    filenames = tuple(name for filename in filenames for name in with_suffixes(filename))
+    if not poll and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(reports_root, filenames)
+        except OSError as e:
+            print(f"[WATCH] inotify unavailable ({e}); polling every {interval:g} s")
+    return PollingWatcher(reports_root, filenames, interval)
+
+
+def changed_scenarios(reports_root, paths):
+    """dict[scenario folder] -> set of report file names touched (None = the whole folder or a run folder)."""
+    touched = {}
+    root = os.path.normpath(reports_root)
+    for path in paths:
+        rel = os.path.relpath(path, root)
+        if rel.startswith(os.pardir):
+            continue
+        parts = rel.split(os.sep)
+        filename = strip_suffix(parts[-1]) if len(parts) > 1 else None
+        filename = filename if filename in WATCHED_FILES else None
+        touched.setdefault(parts[0], set()).add(filename)
+    return touched
+
+
+class LiveMetrics:
+    """
+    The outputs of collect_metrics.py kept in memory per scenario. update() reloads only the
+    given scenarios (unchanged runs come from the extraction cache), recomputes their
+    stats, aggregates, endpoints and timelines, and returns the render jobs that depend on
+    them: the cross-scenario figures plus the changed scenarios' waterfalls.
+    """
+
+    def __init__(self, reports_root, cache, table_format):
+        self.reports_root = reports_root
+        self.cache = cache
+        self.table_format = table_format
+        self.scenarios, self.stats, self.wv = {}, {}, {}
+        self.agg, self.endpoints, self.timelines = {}, {}, {}
+
+    def update(self, names):
+        import collect_metrics
+        from endpoints import endpoint_index
+        from timeline import timeline_index, waterfall_jobs
+
+        loaded = collect_metrics.load_scenarios(_present(self.reports_root, names, METRICS_FILE), self.reports_root,
+                                                self.cache)
+        for d in names:
+            for part in (self.scenarios, self.stats, self.wv, self.agg, self.endpoints, self.timelines):
+                part.pop(d, None)
+        if loaded:
+            self.scenarios.update(loaded)
+            self.stats.update(collect_metrics.webvitals_stats(loaded))
+            self.wv.update(collect_metrics.webvitals_from_scenarios(loaded, self.stats))
+            self.agg.update(collect_metrics.aggregate_network_requests(loaded))
+            self.endpoints.update(endpoint_index(loaded))
+            self.timelines.update(timeline_index(loaded))
+        return self._write(waterfall_jobs(_sorted({d: self.timelines[d] for d in loaded if d in self.timelines}),
+                                          self.scenarios))
+
+    def _write(self, waterfalls):
+        import collect_metrics
+        from endpoints import write_endpoints_table
+        from render_stage import RenderJob
+        from table_render import table_output
+        from timeline import write_timeline_table
+
+        agg, wv, stats = _sorted(self.agg), _sorted(self.wv), _sorted(self.stats)
+        collect_metrics.write_aggregates_table(agg, output_path="network-aggregates-all.txt")
+        write_endpoints_table(_sorted(self.endpoints), output_path="network-endpoints.txt")
+        write_timeline_table(_sorted(self.timelines), output_path="network-timeline.txt")
+        return [
+            RenderJob(collect_metrics.generate_webvitals_chart, (wv,),
+                      {"output_path": "webvitals_chart.png", "stats": stats}),
+            RenderJob(collect_metrics.plot_aggregates_heatmap, (agg,), {"output_path": "network-aggregates-all.png"}),
+            RenderJob(collect_metrics.generate_table_image, (agg,),
+                      {"output_path": table_output("network-aggregates-all-table.png", self.table_format)}),
+        ] + waterfalls
+
+
+class LiveLighthouse:
+    """The outputs of collect_metrics_bootstrap.py kept in memory per scenario, updated like LiveMetrics."""
+
+    def __init__(self, reports_root, cache, table_format, stream=False):
+        self.reports_root = reports_root
+        self.cache = cache
+        self.table_format = table_format
+        self.stream = stream
+        self.metrics, self.stats = {}, {}
+
+    def update(self, names):
+        import collect_metrics_bootstrap as bootstrap
+
+        runs_by_dir = bootstrap.load_lighthouse_runs(_present(self.reports_root, names, REPORT_FILE), self.reports_root,
+                                                     self.cache, stream=self.stream)
+        for d in names:
+            self.metrics.pop(d, None)
+            self.stats.pop(d, None)
+        for d, runs in runs_by_dir.items():
+            self.metrics[d], stats = bootstrap.reduce_runs(runs)
+            if stats is not None:
+                self.stats[d] = stats
+        if not self.metrics:
+            return []
+        return bootstrap.render_jobs(_sorted(self.metrics), _sorted(self.stats), self.table_format)
+
+
+def _sorted(by_scenario):
+    # Same scenario order as a full run, which takes the names from the sorted ScenarioIndex.
+    return OrderedDict(sorted(by_scenario.items()))
+
+
+def _present(reports_root, names, filename):
+    # Scenarios that still have the file: a removed folder only drops out of the outputs.
+    from run_stats import run_paths
+
+    return [d for d in names if run_paths(reports_root, d, filename)]
+
+
+def watch(args):
+    from render_stage import open_render_cache, render_all
+    from report_cache import open_cache
+    from scenario_index import discover, scenario_filters, scenario_matches
+
+    filters = scenario_filters(args)
+    cache = open_cache(args, args.reports)
+    render_cache = open_render_cache(args, args.reports)
+    live = {}
+    if args.source in ("metrics", "all"):
+        live[METRICS_FILE] = LiveMetrics(args.reports, cache, args.table_format)
+    if args.source in ("lighthouse", "all"):
+        live[REPORT_FILE] = LiveLighthouse(args.reports, cache, args.table_format, args.stream)
+
+    def update(names_by_file):
+        started = time.perf_counter()
+        jobs = []
+        for filename, names in names_by_file.items():
+            if names:
+                jobs += live[filename].update(names)
+        drawn = render_all(jobs, render_cache, args.jobs)
+        return drawn, time.perf_counter() - started
+
+    watcher = open_watcher(args.reports, tuple(live), args.poll, args.interval)
+    initial = {}
+    for filename in live:
+        initial[filename] = discover(args.reports, filename, filters)[1]
+    drawn, seconds = update(initial)
+    print(f"[WATCH] {sum(map(len, initial.values()))} scenario(s) loaded, {drawn} figure(s) drawn in {seconds:.2f} s; "
+          f"watching {args.reports} ({watcher.name}), Ctrl+C to stop")
+
+    pending = set()
+    updates = 0
+    try:
+        while args.max_updates is None or updates < args.max_updates:
+            changed = watcher.changes(args.settle)
+            if changed:
+                pending |= changed
+                continue
+            if not pending:
+                continue
+            touched = {d: files for d, files in changed_scenarios(args.reports, pending).items()
+                       if scenario_matches(d, **filters)}
+            pending = set()
+            if not touched:
+                continue
+            names_by_file = {
+                filename: sorted(d for d, files in touched.items() if None in files or filename in files)
+                for filename in live
+            }
+            drawn, seconds = update(names_by_file)
+            updates += 1
+            summary = ", ".join(f"{d} ({', '.join(sorted(f or 'folder' for f in files))})"
+                                for d, files in sorted(touched.items()))
+            print(f"[WATCH] update {updates}: {summary}; {drawn} figure(s) drawn in {seconds:.2f} s")
+    except KeyboardInterrupt:
+        print("\n[WATCH] stopped")
+    finally:
+        watcher.close()
+        if cache is not None:
+            cache.close()
+
+
+def main(argv=None):
+    from parallel import add_jobs_argument
+    from render_stage import add_render_arguments
+    from report_cache import add_cache_arguments
+    from scenario_index import add_scenario_arguments
+    from table_render import add_table_format_argument
+
+    parser = argparse.ArgumentParser(
+        description="Keep the collect_metrics*.py outputs current while reports land: re-read and re-render "
+                    "only the scenarios whose metrics.json / report.json changed")
+    parser.add_argument("--reports", default="reports", help="reports root directory (default: reports)")
+    parser.add_argument("--source", choices=("metrics", "lighthouse", "all"), default="all",
+                        help="metrics.json outputs, report.json outputs or both (default: all)")
+    parser.add_argument("--poll", action="store_true", help="poll the tree instead of using inotify")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL,
+                        help=f"seconds between polling scans (default: {DEFAULT_INTERVAL:g})")
+    parser.add_argument("--settle", type=float, default=DEFAULT_SETTLE,
+                        help=f"seconds without changes before a batch is processed (default: {DEFAULT_SETTLE:g})")
+    parser.add_argument("--max-updates", type=int, metavar="N", help="exit after N updates (default: run until Ctrl+C)")
+    parser.add_argument("--stream", action="store_true", help="use the streaming report.json parser")
+    add_scenario_arguments(parser)
+    add_jobs_argument(parser)
+    add_cache_arguments(parser)
+    add_render_arguments(parser)
+    add_table_format_argument(parser)
+    watch(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()